@@ -0,0 +1,732 @@
+# Array-backed convex hull
+#
+# This is the divide-and-conquer hull of main.py run on a compact
+# point store instead of on Point objects.  Coordinates are kept in
+# two contiguous array('d') buffers and the CW and CCW pointers are
+# kept as integer index arrays, so a point costs 24 bytes instead of a
+# Python object with a __dict__.
+#
+# A point is referred to by its index into the store.  A link of NONE
+# means that the point is not on any hull (like a None pointer in
+# main.py).
+#
+# The hulls built here are identical to those built by main.py's
+# buildHull() when no three points are collinear.  Collinear points
+# are also handled here: a collinear base case is made into a hull of
+# its two end points, and the tangent walks step along a collinear
+# edge to its far end, so no hull vertex is ever collinear with its
+# neighbours.  Duplicate points must be removed first, with
+# dropDuplicates().
+
+
+import operator
+from array import array
+from itertools import islice, compress
+from concurrent.futures import ProcessPoolExecutor
+
+import predicates
+
+
+NONE = -1 # link of a point that is not on any hull
+
+
+
+# PointStore
+#
+# Holds the coordinates of all points and the CW and CCW links of
+# each point on its hull.  'xs' and 'ys' can be any sequences of
+# floats that support indexing (array('d'), memoryview, list).
+
+class PointStore(object):
+
+    def __init__( self, xs, ys ):
+
+        if len(xs) != len(ys):
+            raise ValueError( 'x and y coordinate counts differ (%d and %d)' % (len(xs),len(ys)) )
+
+        self.xs = xs # coordinates
+        self.ys = ys
+
+        self.ccw = array( 'i', [NONE] ) * len(xs) # index of point CCW of each point on its hull
+        self.cw  = array( 'i', [NONE] ) * len(xs) # index of point CW of each point on its hull
+
+        self.bound = None # rounding error bound of turn tests (see turnBound())
+
+
+    def __len__(self):
+        return len(self.xs)
+
+
+    def __repr__(self):
+        return 'PointStore(%d points)' % len(self.xs)
+
+
+    # Return a bound on the rounding error of a turn determinant of
+    # any three points of the store (see predicates.staticBound())
+
+    def turnBound(self):
+
+        if self.bound is None:
+            self.bound = predicates.staticBound( self.xs, self.ys )
+
+        return self.bound
+
+
+    # Return the hull indices in CCW order, starting from 'start'.
+    # 'start' must be on the hull.
+
+    def hullFrom( self, start ):
+
+        ccw = self.ccw
+
+        verts = [ start ]
+
+        i = ccw[start]
+        while i != NONE and i != start:
+            verts.append( i )
+            i = ccw[i]
+
+        return verts
+
+
+
+# Make a store from a sequence of (x,y) pairs
+
+def storeFromPairs( pairs ):
+
+    xs = array( 'd' )
+    ys = array( 'd' )
+
+    for x,y in pairs:
+        xs.append( float(x) )
+        ys.append( float(y) )
+
+    return PointStore( xs, ys )
+
+
+
+# Return the indices of a store's points sorted by increasing x, and
+# by increasing y for equal x
+#
+# This is the permutation that buildHull() takes.  The sorts are keyed
+# on the coordinate arrays' own __getitem__, so no per-point tuple or
+# lambda call is made.  Points are first sorted by x alone; only if two
+# points share an x are they sorted by y and then (stably) by x again.
+
+def sortedOrder( store ):
+
+    xs = store.xs
+    ys = store.ys
+
+    order = sorted( range(len(xs)), key=xs.__getitem__ )
+
+    sortedXs = list( map( xs.__getitem__, order ) )
+
+    if any( map( operator.eq, sortedXs, islice( sortedXs, 1, None ) ) ): # equal x values
+        order = sorted( range(len(xs)), key=ys.__getitem__ )
+        order.sort( key=xs.__getitem__ )
+
+    return array( 'i', order )
+
+
+
+# Remove repeated points from a sorted order
+#
+# 'order' is a permutation from sortedOrder(), so equal points are
+# next to each other.  Only the first of each run of equal points is
+# kept.  If there are no repeats, 'order' itself is returned.
+
+def dropDuplicates( store, order ):
+
+    if len(order) < 2:
+        return order
+
+    sortedXs = list( map( store.xs.__getitem__, order ) )
+    sortedYs = list( map( store.ys.__getitem__, order ) )
+
+    isNew = list( map( operator.or_, map( operator.ne, islice( sortedXs, 1, None ), sortedXs ),
+                                     map( operator.ne, islice( sortedYs, 1, None ), sortedYs ) ) )
+
+    if all( isNew ):
+        return order
+
+    return array( 'i', order[:1] ) + array( 'i', compress( islice( order, 1, None ), isNew ) )
+
+
+
+# Discard points that cannot be on the hull (Akl-Toussaint heuristic)
+#
+# The extreme points in the directions -x, -(x+y), -y, x-y, x, x+y,
+# y and y-x make a convex octagon (fewer sides if some coincide) whose
+# corners are on the hull.  Every point strictly inside the octagon is
+# inside the hull, so it is dropped.  Returns the indices of the
+# remaining points in increasing order.
+#
+# Most points fall in an axis-aligned box inside the octagon and are
+# dropped after one cheap test; only the rest are tested against the
+# octagon's edges.  The edge tests are made with a small margin so
+# that floating point error can only keep extra points, never drop a
+# hull point.
+
+def cullInteriorPoints( xs, ys ):
+
+    n = len(xs)
+
+    if n < 8:
+        return array( 'i', range(n) )
+
+    indices = range(n)
+
+    sums  = list( map( operator.add, xs, ys ) )
+    diffs = list( map( operator.sub, xs, ys ) )
+
+    W  = operator.indexOf( xs, min(xs) )
+    SW = operator.indexOf( sums, min(sums) )
+    S  = operator.indexOf( ys, min(ys) )
+    SE = operator.indexOf( diffs, max(diffs) )
+    E  = operator.indexOf( xs, max(xs) )
+    NE = operator.indexOf( sums, max(sums) )
+    N  = operator.indexOf( ys, max(ys) )
+    NW = operator.indexOf( diffs, min(diffs) )
+
+    del sums, diffs
+
+    corners = [ W, SW, S, SE, E, NE, N, NW ] # in CCW order
+    corners = [ c for k,c in enumerate(corners) if (xs[c],ys[c]) != (xs[corners[k-1]],ys[corners[k-1]]) ]
+
+    if len(corners) < 3:
+        return array( 'i', indices )
+
+    # Make the edge tests: a point is inside edge (ex,ey,limit) if
+    # ex*y - ey*x > limit.  The limit includes a margin in case of
+    # rounding.
+
+    size = max( -xs[W], xs[E], -ys[S], ys[N] ) # coordinate magnitude
+    margin = 1e-9 * size
+
+    edges = []
+
+    for k in range(len(corners)):
+        a = corners[k-1]
+        b = corners[k]
+        ex = xs[b] - xs[a]
+        ey = ys[b] - ys[a]
+        edges.append( (ex, ey, ex*ys[a] - ey*xs[a] + margin * (abs(ex)+abs(ey))) )
+
+    # Find a box inside the octagon.  Its lower-left corner is up and
+    # to the right of all of W, SW and S, so it is inside the edges
+    # W->SW and SW->S, and likewise for the other corners.  It is
+    # shrunk by the margin in case rounding picked slightly wrong
+    # extreme points.
+
+    left   = max( xs[W], xs[SW], xs[NW] ) + margin
+    right  = min( xs[E], xs[SE], xs[NE] ) - margin
+    bottom = max( ys[S], ys[SW], ys[SE] ) + margin
+    top    = min( ys[N], ys[NW], ys[NE] ) - margin
+
+    boxInside = left < right and bottom < top
+
+    # Test the points outside the box against each edge in turn,
+    # keeping only those still inside
+
+    if boxInside:
+        outsideBox = [ not (left < x < right and bottom < y < top) for x,y in zip( xs, ys ) ]
+        inside   = list( compress( indices, outsideBox ) )
+        insideXs = list( compress( xs, outsideBox ) )
+        insideYs = list( compress( ys, outsideBox ) )
+        isKept   = bytearray( outsideBox )
+        del outsideBox
+    else:
+        inside   = indices
+        insideXs = xs
+        insideYs = ys
+        isKept   = bytearray( [1] ) * n
+
+    for ex, ey, limit in edges:
+
+        isInside = [ ex*y - ey*x > limit for x,y in zip( insideXs, insideYs ) ]
+
+        inside   = list( compress( inside, isInside ) )
+        insideXs = list( compress( insideXs, isInside ) )
+        insideYs = list( compress( insideYs, isInside ) )
+
+    # Keep the points outside the octagon
+
+    for i in inside:
+        isKept[i] = 0
+
+    return array( 'i', compress( indices, isKept ) )
+
+
+
+# Determine whether three points make a left or right turn
+#
+# The sign is exact, even for nearly collinear points (see
+# predicates.py).
+
+LEFT_TURN  = predicates.LEFT_TURN
+RIGHT_TURN = predicates.RIGHT_TURN
+COLLINEAR  = predicates.COLLINEAR
+
+def turn( xs, ys, a, b, c ):
+
+    return predicates.orient( xs[a], ys[a], xs[b], ys[b], xs[c], ys[c] )
+
+
+
+# Build a convex hull of the points order[lo:hi]
+#
+# 'order' holds point indices sorted by increasing x (and y for equal
+# x).  This follows main.py's buildHull() step for step, with indices
+# in place of Points, but recurses on index ranges of 'order' instead
+# of on copied halves of the point list.
+
+def buildHull( store, order, lo=0, hi=None ):
+
+    if hi is None:
+        hi = len(order)
+
+    if hi-lo <= 3:
+
+        # Base case of 2 or 3 points
+
+        baseHull( store, order, lo, hi )
+
+    else:
+
+        # Recursively build hulls of the left and right halves
+
+        mid = (lo+hi) // 2
+
+        buildHull( store, order, lo, mid )
+        buildHull( store, order, mid, hi )
+
+        mergeHulls( store, order[mid-1], order[mid] )
+
+
+
+# Build a convex hull of the points order[lo:hi] without recursion
+#
+# The range is cut into runs of 3 points (with one or two runs of 2
+# points when the count is not a multiple of 3) and each run is made
+# into a hull.  The hulls are then merged bottom-up as in a binary
+# counter: a new hull is merged with the hull to its left whenever
+# both were made from the same number of merges.  This keeps the
+# points being merged close together in memory, as the recursion
+# does, with a stack of at most log n pending hulls.
+
+def buildHullIterative( store, order, lo=0, hi=None ):
+
+    if hi is None:
+        hi = len(order)
+
+    n = hi-lo
+
+    if n < 2:
+        return
+
+    # Cut into runs
+
+    starts = list( range( lo, hi - 2*(-n % 3), 3 ) ) # start of each run in 'order'
+    starts.extend( range( hi - 2*(-n % 3), hi, 2 ) )
+
+    # Make and merge hulls
+
+    stackStarts = [] # start in 'order' of each pending hull
+    stackLevels = [] # number of merge levels in each pending hull
+
+    ends = starts[1:] + [hi]
+
+    for start, end in zip( starts, ends ):
+
+        baseHull( store, order, start, end )
+
+        stackStarts.append( start )
+        stackLevels.append( 0 )
+
+        while len(stackLevels) > 1 and stackLevels[-1] == stackLevels[-2]:
+            mid = stackStarts.pop()
+            stackLevels.pop()
+            mergeHulls( store, order[mid-1], order[mid] )
+            stackLevels[-1] += 1
+
+    while len(stackStarts) > 1:
+        mid = stackStarts.pop()
+        mergeHulls( store, order[mid-1], order[mid] )
+
+
+
+# Make a hull of the 2 or 3 points order[lo:hi]
+#
+# (hullprofile.py counts the turn tests here by the local name 't'.)
+
+def baseHull( store, order, lo, hi ):
+
+    xs  = store.xs
+    ys  = store.ys
+    cw  = store.cw
+    ccw = store.ccw
+
+    if hi-lo == 3:
+
+        a = order[lo]
+        b = order[lo+1]
+        c = order[lo+2]
+
+        t = turn( xs, ys, a, b, c )
+
+        if t == LEFT_TURN:
+            cw[a]  = c
+            ccw[a] = b
+            cw[b]  = a
+            ccw[b] = c
+            cw[c]  = b
+            ccw[c] = a
+        elif t == RIGHT_TURN:
+            cw[a]  = b
+            ccw[a] = c
+            cw[b]  = c
+            ccw[b] = a
+            cw[c]  = a
+            ccw[c] = b
+        else:
+            ccw[a] = c # b is between a and c, so not on the hull
+            cw[a]  = c
+            cw[c]  = a
+            ccw[c] = a
+
+    elif hi-lo == 2:
+
+        a = order[lo]
+        b = order[lo+1]
+
+        ccw[a] = b
+        cw[a]  = b
+        cw[b]  = a
+        ccw[b] = a
+
+
+
+# Merge two hulls that are separated by a vertical line
+#
+# 'leftEnd' is the rightmost point of the left hull and 'rightStart'
+# is the leftmost point of the right hull.
+
+def mergeHulls( store, leftEnd, rightStart ):
+
+    xs  = store.xs
+    ys  = store.ys
+    cw  = store.cw
+    ccw = store.ccw
+
+    bound = store.turnBound()
+    orientSign = predicates.orientSign
+
+    # Walk downward
+    #
+    # The turn tests are written out in full (see turn()) since they
+    # are the inner loop of the whole build.  A determinant that might
+    # be within rounding error of zero (by the store's turnBound()) has
+    # its sign found again by predicates.orientSign(), so the sign is
+    # always exact.  Each step first tries to move the left point CW,
+    # then the right point CCW.  A step to a point that is collinear
+    # with the bridge is taken only if the point is farther out along
+    # it, so the bridge ends on the outermost of any collinear points.
+    #
+    # hullprofile.py counts the turn tests and links set to NONE here by
+    # the local names 'det', 'cw' and 'ccw', so keep those names.
+
+    lowerLeft  = leftEnd
+    lowerRight = rightStart
+
+    lx = xs[lowerLeft]
+    ly = ys[lowerLeft]
+    rx = xs[lowerRight]
+    ry = ys[lowerRight]
+
+    while True:
+
+        p  = cw[lowerLeft]
+        px = xs[p]
+        py = ys[p]
+
+        det = (px-rx) * (ly-ry) - (lx-rx) * (py-ry)
+
+        if -bound <= det <= bound: # maybe too close to call
+            det = orientSign( px, py, lx, ly, rx, ry )
+
+        if det < 0 or det == 0 and (px-lx) * (lx-rx) + (py-ly) * (ly-ry) > 0: # cw[lowerLeft], lowerLeft, lowerRight is a right turn
+            if lowerLeft != leftEnd:
+                cw[lowerLeft]  = NONE
+                ccw[lowerLeft] = NONE
+            lowerLeft = p
+            lx = px
+            ly = py
+            continue
+
+        p  = ccw[lowerRight]
+        px = xs[p]
+        py = ys[p]
+
+        det = (lx-px) * (ry-py) - (rx-px) * (ly-py)
+
+        if -bound <= det <= bound: # maybe too close to call
+            det = orientSign( lx, ly, rx, ry, px, py )
+
+        if det < 0 or det == 0 and (px-rx) * (rx-lx) + (py-ry) * (ry-ly) > 0: # lowerLeft, lowerRight, ccw[lowerRight] is a right turn
+            if lowerRight != rightStart:
+                ccw[lowerRight] = NONE
+                cw[lowerRight]  = NONE
+            lowerRight = p
+            rx = px
+            ry = py
+            continue
+
+        break
+
+    # Walk upward
+
+    upperLeft  = leftEnd
+    upperRight = rightStart
+
+    lx = xs[upperLeft]
+    ly = ys[upperLeft]
+    rx = xs[upperRight]
+    ry = ys[upperRight]
+
+    while True:
+
+        p  = ccw[upperLeft]
+        px = xs[p]
+        py = ys[p]
+
+        det = (px-rx) * (ly-ry) - (lx-rx) * (py-ry)
+
+        if -bound <= det <= bound: # maybe too close to call
+            det = orientSign( px, py, lx, ly, rx, ry )
+
+        if det > 0 or det == 0 and (px-lx) * (lx-rx) + (py-ly) * (ly-ry) > 0: # ccw[upperLeft], upperLeft, upperRight is a left turn
+            if upperLeft != leftEnd:
+                cw[upperLeft]  = NONE
+                ccw[upperLeft] = NONE
+            upperLeft = p
+            lx = px
+            ly = py
+            continue
+
+        p  = cw[upperRight]
+        px = xs[p]
+        py = ys[p]
+
+        det = (lx-px) * (ry-py) - (rx-px) * (ly-py)
+
+        if -bound <= det <= bound: # maybe too close to call
+            det = orientSign( lx, ly, rx, ry, px, py )
+
+        if det > 0 or det == 0 and (px-rx) * (rx-lx) + (py-ry) * (ry-ly) > 0: # upperLeft, upperRight, cw[upperRight] is a left turn
+            if upperRight != rightStart:
+                cw[upperRight]  = NONE
+                ccw[upperRight] = NONE
+            upperRight = p
+            rx = px
+            ry = py
+            continue
+
+        break
+
+    # Join the bottom and top of the hulls
+
+    cw[upperLeft]   = upperRight
+    ccw[lowerLeft]  = lowerRight
+    ccw[upperRight] = upperLeft
+    cw[lowerRight]  = lowerLeft
+
+    # Unlink the two inner points if the bridges left them off the hull
+
+    if upperLeft == leftEnd or lowerLeft == leftEnd or upperRight == rightStart or lowerRight == rightStart:
+        if upperRight != rightStart and lowerRight != rightStart:
+            ccw[rightStart] = NONE
+            cw[rightStart]  = NONE
+        elif upperLeft != leftEnd and lowerLeft != leftEnd:
+            ccw[leftEnd] = NONE
+            cw[leftEnd]  = NONE
+    else:
+        ccw[rightStart] = NONE
+        cw[rightStart]  = NONE
+        ccw[leftEnd] = NONE
+        cw[leftEnd]  = NONE
+
+
+
+# Build a convex hull of the points order[lo:hi] across processes
+#
+# The range is cut into one block per worker.  Each worker builds the
+# hull of its block (the top levels of the recursion, run in
+# parallel) and sends back the block's hull as an array of point
+# indices in CCW order.  The block hulls are then linked into 'store'
+# and merged here, serially, with the same tangent walks as
+# buildHull().
+#
+# The coordinates are sent to the workers as arrays.  A store holding
+# other buffers, such as memoryviews, has them copied first, since
+# memoryviews cannot be pickled, as the 'spawn' and 'forkserver' start
+# methods need.  'mpContext' is a multiprocessing
+# context for the pool, or None for the default.
+
+def buildHullParallel( store, order, workers, lo=0, hi=None, mpContext=None ):
+
+    if hi is None:
+        hi = len(order)
+
+    numBlocks = min( workers, (hi-lo) // 3 ) # each block needs at least 2 points
+
+    if numBlocks < 2:
+        buildHull( store, order, lo, hi )
+        return
+
+    starts = [ lo + k*(hi-lo)//numBlocks for k in range(numBlocks) ]
+    ends   = starts[1:] + [hi]
+
+    xs = store.xs if isinstance( store.xs, array ) else array( 'd', store.xs )
+    ys = store.ys if isinstance( store.ys, array ) else array( 'd', store.ys )
+
+    with ProcessPoolExecutor( numBlocks, mp_context=mpContext, initializer=initBlockWorker, initargs=(xs, ys, order) ) as pool:
+        blockHulls = list( pool.map( blockHull, starts, ends ) )
+
+    # Link each block's hull into the store
+
+    cw  = store.cw
+    ccw = store.ccw
+
+    for verts in blockHulls:
+        prev = verts[-1]
+        for i in verts:
+            ccw[prev] = i
+            cw[i] = prev
+            prev = i
+
+    # Merge neighbouring hulls pairwise
+
+    while len(starts) > 1:
+
+        for i in range( 1, len(starts), 2 ):
+            mid = starts[i]
+            mergeHulls( store, order[mid-1], order[mid] )
+
+        starts = starts[::2]
+
+
+
+# Points seen by a worker process
+
+workerXs    = None
+workerYs    = None
+workerOrder = None
+
+def initBlockWorker( xs, ys, order ):
+
+    global workerXs, workerYs, workerOrder
+
+    workerXs    = xs
+    workerYs    = ys
+    workerOrder = order
+
+
+
+# In a worker, build the hull of the points order[start:end]
+#
+# The block's coordinates are copied into a small store of their own,
+# so a worker never allocates links for all of the points.  Returns
+# the hull as an array of indices into the full point set, in CCW
+# order from the block's leftmost point.
+
+def blockHull( start, end ):
+
+    block = workerOrder[start:end]
+
+    local = PointStore( array( 'd', (workerXs[i] for i in block) ),
+                        array( 'd', (workerYs[i] for i in block) ) )
+
+    buildHullIterative( local, range(len(block)) )
+
+    return array( 'i', (block[i] for i in local.hullFrom(0)) )
+
+
+
+# Return the hull of some points as coordinate arrays
+#
+# The hull vertices are returned in CCW order from the leftmost one.
+# Interior points are culled first, since this is used on large
+# point sets.
+
+def hullCoords( xs, ys ):
+
+    keep = cullInteriorPoints( xs, ys )
+
+    store = PointStore( array( 'd', (xs[i] for i in keep) ),
+                        array( 'd', (ys[i] for i in keep) ) )
+
+    order = dropDuplicates( store, sortedOrder( store ) )
+
+    if len(order) == 0:
+        return array( 'd' ), array( 'd' )
+
+    buildHull( store, order )
+
+    verts = store.hullFrom( order[0] )
+
+    return ( array( 'd', (store.xs[i] for i in verts) ),
+             array( 'd', (store.ys[i] for i in verts) ) )
+
+
+
+# Return the convex hull of a sequence of (x,y) pairs
+#
+# This is the library entry point for hulls of many small point sets:
+# it keeps no state between calls and needs no window.  The hull
+# vertices are returned as a list of (x,y) tuples in CCW order from
+# the leftmost one (the lowest, if several are leftmost).  Repeated
+# points are ignored, and points on a hull edge are not vertices.
+
+def convexHull( points ):
+
+    store = storeFromPairs( points )
+    order = dropDuplicates( store, sortedOrder( store ) )
+
+    if len(order) == 0:
+        return []
+
+    buildHull( store, order )
+
+    xs = store.xs
+    ys = store.ys
+
+    return [ (xs[i],ys[i]) for i in store.hullFrom( order[0] ) ]
+
+
+
+# Build the hull of a stream of point chunks
+#
+# 'chunks' yields (xs, ys) coordinate arrays.  Only the hull vertices
+# of the points seen so far are kept between chunks: each chunk's hull
+# is built together with those vertices, so memory is bounded by the
+# chunk size plus the hull size rather than by the total input.
+#
+# Returns the hull coordinates as hullCoords() does.
+
+def streamHull( chunks ):
+
+    hullXs = array( 'd' )
+    hullYs = array( 'd' )
+
+    for xs, ys in chunks:
+
+        xs = array( 'd', xs )
+        ys = array( 'd', ys )
+
+        xs.extend( hullXs )
+        ys.extend( hullYs )
+
+        hullXs, hullYs = hullCoords( xs, ys )
+
+    return hullXs, hullYs
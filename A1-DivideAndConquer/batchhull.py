@@ -0,0 +1,199 @@
+# Convex hulls of many point sets
+#
+# Usage: python batchhull.py [-j workers] [-o outfile] points_dir_or_file
+#
+#   -j sets the number of worker processes (default: the number of cores)
+#   -o writes the hulls to a file instead of to stdout
+#
+# The input is either a directory, in which every file is a text or
+# binary points file, or a single text file holding many records.  In
+# a multi-record file each record starts with a header line giving its
+# name, followed by its points, one per line:
+#
+#   # name
+#   x y
+#   x y
+#   ...
+#
+# Points before the first header make a record named after the file.
+# Blank lines are ignored.
+#
+# The output is a multi-record file in the same format, with the hull
+# vertices of each record in CCW order, in the order of the input
+# (files of a directory are taken in order of name).
+#
+# All hulls are built in one run: the records are handed out in
+# batches to a pool of worker processes, each of which calls
+# arrayhull.convexHull() on its records, so no interpreter is started
+# and no window is opened per point set.  A record that cannot be read
+# is reported and skipped, and the exit status is then 1.
+
+
+import sys, os, re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import arrayhull, pointio
+
+
+recordHeader = re.compile( rb'^#[ \t]*(.*?)[ \t\r]*$', re.MULTILINE )
+
+
+
+# Split a multi-record file into records
+#
+# Returns a list of (name, text, lineNum) for each record, where
+# 'lineNum' is the line number of the first line of 'text'.
+
+def splitRecords( filename ):
+
+    with open( filename, 'rb' ) as f:
+        data = f.read()
+
+    records = []
+
+    name = os.path.basename( filename ).encode()
+    start = 0
+    lineNum = 1
+
+    for header in recordHeader.finditer( data ):
+
+        if start > 0 or data[:header.start()].strip():
+            records.append( (name.decode( errors='replace' ), data[start:header.start()], lineNum) )
+
+        lineNum += data.count( b'\n', start, header.end()+1 )
+
+        name = header.group( 1 )
+        start = header.end() + 1
+
+    if start > 0 or data.strip():
+        records.append( (name.decode( errors='replace' ), data[start:], lineNum) )
+
+    return records
+
+
+
+# List the files of a directory as records
+#
+# Returns a list of (name, filename, None), in order of name.
+
+def directoryRecords( dirname ):
+
+    return [ (name, os.path.join( dirname, name ), None)
+             for name in sorted( os.listdir( dirname ) )
+             if os.path.isfile( os.path.join( dirname, name ) ) ]
+
+
+
+# Build the hull of one record
+#
+# A record is (name, text, lineNum) for a record of a multi-record
+# file, or (name, filename, None) for a file of a directory.  Returns
+# (name, hull, error), where 'hull' is a list of (x,y) vertices and
+# 'error' is None, or else the message for a record that could not be
+# read.
+
+def recordHull( record ):
+
+    name, source, lineNum = record
+
+    try:
+        if lineNum is None:
+            xs, ys, isSorted = pointio.openPoints( source )
+        else:
+            xs = array( 'd' )
+            ys = array( 'd' )
+            pointio.parseChunk( source, lineNum, xs, ys )
+    except (ValueError, OSError) as e:
+        return name, [], str(e)
+
+    return name, arrayhull.convexHull( zip( xs, ys ) ), None
+
+
+
+# Build the hulls of all records, in input order
+#
+# Yields the results of recordHull().  With one worker the hulls are
+# built in this process.
+
+def buildHulls( records, numWorkers ):
+
+    if numWorkers <= 1 or len(records) <= 1:
+        for record in records:
+            yield recordHull( record )
+        return
+
+    # Hand out records in batches, so that each one costs less than a
+    # round trip to a worker
+
+    batchSize = max( 1, len(records) // (8*numWorkers) )
+
+    with ProcessPoolExecutor( max_workers=numWorkers ) as pool:
+        for result in pool.map( recordHull, records, chunksize=batchSize ):
+            yield result
+
+
+
+# Write one hull as a record of a multi-record file
+
+def writeRecord( f, name, hull ):
+
+    f.write( '# %s\n' % name )
+
+    for x,y in hull:
+        f.write( '%r %r\n' % (x,y) )
+
+    f.write( '\n' )
+
+
+
+def main():
+
+    args = sys.argv[1:]
+
+    numWorkers = os.cpu_count() or 1
+    outFile = None
+
+    while len(args) > 2:
+        if args[0] == '-j':
+            numWorkers = int( args[1] )
+        elif args[0] == '-o':
+            outFile = args[1]
+        else:
+            break
+        args = args[2:]
+
+    if len(args) != 1:
+        print( 'Usage: %s [-j workers] [-o outfile] points_dir_or_file' % sys.argv[0] )
+        sys.exit(1)
+
+    try:
+        if os.path.isdir( args[0] ):
+            records = directoryRecords( args[0] )
+        else:
+            records = splitRecords( args[0] )
+    except OSError as e:
+        print( '%s: %s' % (args[0], e) )
+        sys.exit(1)
+
+    f = sys.stdout if outFile is None else open( outFile, 'w' )
+
+    numFailed = 0
+
+    for name, hull, error in buildHulls( records, numWorkers ):
+        if error is None:
+            writeRecord( f, name, hull )
+        else:
+            sys.stderr.write( '%s: %s\n' % (name, error) )
+            numFailed += 1
+
+    if f is not sys.stdout:
+        f.close()
+
+    if numFailed > 0:
+        sys.exit(1)
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,461 @@
+# Convex hull benchmarks
+#
+# Usage: python bench.py [-o results.json] [-l label] benchmark [n ...]
+#        python bench.py compare old.json new.json
+#
+#   -o writes every timing to a JSON file, to compare runs later
+#   -l labels the run in the JSON file (e.g. a version or commit)
+#
+# Benchmarks, each run on n points (default n = 100000 1000000):
+#
+#   suite      times loading, sorting (and dropping repeated points),
+#              building the hull and writing it out, separately, on
+#              every distribution of genpoints.py
+#              (default n = 1000 10000 100000 1000000; 10000000 also
+#              works but takes several minutes per distribution)
+#   hull       times the Point-based buildHull() in main.py, the
+#              recursive index-range buildHull() in arrayhull.py and
+#              the non-recursive buildHullIterative() in arrayhull.py
+#              on uniformly random points.  The Point-based builder is
+#              skipped above 1000000 points, where it needs several GB.
+#   parallel   times buildHullParallel() with 1, 2, 4, ... workers, up
+#              to the number of cores
+#   load       times reading a points file of n points with the old
+#              readlines() path and with pointio.readPoints()
+#   sort       times sorting n points with a (x,y) lambda key and with
+#              arrayhull.sortedOrder(), on random and on integer points
+#   cull       times sorting and building the hull of n points with and
+#              without arrayhull.cullInteriorPoints() first
+#   predicates times n orientation tests with a plain floating-point
+#              determinant, with predicates.orient() and with
+#              predicates.orientBatch(), on random and on nearly
+#              collinear points, and counts the exact fallbacks
+#   chan       times sorting and arrayhull.buildHull(), and
+#              chan.chanHull() (which needs no sort), on n points of
+#              distributions with few hull vertices (square, disk,
+#              gaussian) and with every point on the hull (circle)
+#   hull3d     times hull3d.convexHull3D() on n random points in a cube
+#              (few on the hull) and on a sphere (all on the hull), and
+#              reading and building the hull of A3's femurSlices.dat
+#   query      times n containment queries against the hull of 100000
+#              points in a disk, one contains() call at a time and
+#              with containsBatch(), and the rotating-calipers
+#              diameter, width and minimum-area rectangle
+#
+# 'compare' matches the timings of two JSON files and lists each one's
+# change.  It exits with status 1 if anything got more than
+# 'regressionRatio' times slower.
+
+
+import sys, os, time, random, tempfile, json, platform
+from array import array
+
+import main, arrayhull, pointio, genpoints, predicates, hullquery, chan, hull3d
+
+
+maxPointObjects = 1000000 # largest run of the Point-based builder
+
+slicesFile = os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'A3-Dynamic Programing', 'femurSlices.dat' )
+
+regressionRatio = 1.2 # slowdown reported as a regression by 'compare'
+
+results = [] # timings of this run, for the JSON file
+
+
+
+# Make n random points in the unit square
+
+def randomStore( n, seed=0 ):
+
+    return arrayhull.PointStore( *genpoints.makePoints( 'uniform-square', n, seed ) )
+
+
+
+# Time a function call, returning seconds
+
+def timed( f, *args ):
+
+    start = time.perf_counter()
+    f( *args )
+    return time.perf_counter() - start
+
+
+
+# Print a timing and record it for the JSON file
+
+def report( benchmark, n, name, seconds, note='' ):
+
+    print( '%10d  %-28s %8.3f s  %s' % (n, name, seconds, note) )
+
+    results.append( { 'benchmark': benchmark, 'n': n, 'name': name, 'seconds': seconds } )
+
+
+
+# Time each stage of the hull pipeline on n points of every distribution
+
+def benchSuite( n ):
+
+    for distribution in genpoints.distributions:
+
+        xs, ys = genpoints.makePoints( distribution, n )
+
+        fd, inFile = tempfile.mkstemp( suffix='.txt' )
+        os.close( fd )
+        fd, outFile = tempfile.mkstemp( suffix='.txt' )
+        os.close( fd )
+
+        try:
+            genpoints.writeTextPoints( inFile, xs, ys )
+            del xs, ys
+
+            start = time.perf_counter()
+            xs, ys = pointio.readPoints( inFile )
+            loadTime = time.perf_counter() - start
+
+            store = arrayhull.PointStore( xs, ys )
+
+            start = time.perf_counter()
+            order = arrayhull.dropDuplicates( store, arrayhull.sortedOrder( store ) )
+            sortTime = time.perf_counter() - start
+
+            start = time.perf_counter()
+            arrayhull.buildHull( store, order )
+            hullTime = time.perf_counter() - start
+
+            verts = store.hullFrom( order[0] )
+
+            start = time.perf_counter()
+            main.writeHull( [ xs[i] for i in verts ], [ ys[i] for i in verts ], outFile )
+            outputTime = time.perf_counter() - start
+
+        finally:
+            os.remove( inFile )
+            os.remove( outFile )
+
+        note = '(%d hull vertices)' % len(verts)
+
+        report( 'suite', n, distribution + ' load',   loadTime )
+        report( 'suite', n, distribution + ' sort',   sortTime )
+        report( 'suite', n, distribution + ' hull',   hullTime, note )
+        report( 'suite', n, distribution + ' output', outputTime )
+
+
+
+# Time the hull builders on n points
+
+def benchHull( n ):
+
+    store = randomStore( n )
+    order = arrayhull.sortedOrder( store )
+
+    timings = []
+
+    if n <= maxPointObjects:
+        points = [ main.Point( (store.xs[i], store.ys[i]) ) for i in order ]
+        timings.append( ('Point buildHull', timed( main.buildHull, points )) )
+        del points
+
+    timings.append( ('array buildHull', timed( arrayhull.buildHull, store, order )) )
+
+    store = arrayhull.PointStore( store.xs, store.ys ) # fresh links
+    timings.append( ('array buildHullIterative', timed( arrayhull.buildHullIterative, store, order )) )
+
+    for name, t in timings:
+        report( 'hull', n, name, t )
+
+
+
+# Time the parallel hull builder on n points
+
+def benchParallel( n ):
+
+    store = randomStore( n )
+    order = arrayhull.sortedOrder( store )
+
+    workers = 1
+    while True:
+        store = arrayhull.PointStore( store.xs, store.ys )
+        t = timed( arrayhull.buildHullParallel, store, order, workers )
+        report( 'parallel', n, '%d workers' % workers, t )
+        if workers >= (os.cpu_count() or 1):
+            break
+        workers = min( 2*workers, os.cpu_count() )
+
+
+
+# Time reading a points file of n points
+
+def benchLoad( n ):
+
+    store = randomStore( n )
+
+    fd, filename = tempfile.mkstemp( suffix='.txt' )
+
+    try:
+        os.close( fd )
+        genpoints.writeTextPoints( filename, store.xs, store.ys )
+        del store
+
+        def readLines():
+            with open( filename, 'rb' ) as f:
+                return [ main.Point( line.split(b' ') ) for line in f.readlines() ]
+
+        report( 'load', n, 'readlines + Point', timed( readLines ) )
+        report( 'load', n, 'pointio.readPoints', timed( pointio.readPoints, filename ) )
+
+    finally:
+        os.remove( filename )
+
+
+
+# Time sorting n points
+
+def benchSort( n ):
+
+    rand = random.Random( 0 )
+
+    stores = [ ('random', randomStore( n )),
+               ('integer', arrayhull.storeFromPairs( (rand.randint(0,1000),rand.randint(0,1000)) for i in range(n) )) ]
+
+    for kind, store in stores:
+
+        xs = store.xs
+        ys = store.ys
+
+        def lambdaSort():
+            return sorted( range(n), key=lambda i: (xs[i],ys[i]) )
+
+        report( 'sort', n, kind + ' lambda key', timed( lambdaSort ) )
+        report( 'sort', n, kind + ' sortedOrder', timed( arrayhull.sortedOrder, store ) )
+
+
+
+# Time the hull of n points with and without discarding interior points
+
+def benchCull( n ):
+
+    store = randomStore( n )
+
+    def sortAndBuild( store ):
+        order = arrayhull.dropDuplicates( store, arrayhull.sortedOrder( store ) )
+        arrayhull.buildHull( store, order )
+
+    def cullSortAndBuild( store ):
+        keep = arrayhull.cullInteriorPoints( store.xs, store.ys )
+        sortAndBuild( arrayhull.PointStore( array( 'd', (store.xs[i] for i in keep) ),
+                                            array( 'd', (store.ys[i] for i in keep) ) ) )
+        return len(keep)
+
+    plain  = timed( sortAndBuild, store )
+    culled = timed( cullSortAndBuild, arrayhull.PointStore( store.xs, store.ys ) )
+
+    kept = len( arrayhull.cullInteriorPoints( store.xs, store.ys ) )
+
+    report( 'cull', n, 'sort + hull', plain )
+    report( 'cull', n, 'cull + sort + hull', culled, '(%d points culled, %.1fx faster)' % (n-kept, plain/culled) )
+
+
+
+# Time n orientation tests with and without the exact fallback
+
+def benchPredicates( n ):
+
+    rand = random.Random( 0 )
+
+    def floatTurn( ax, ay, bx, by, cx, cy ):
+        det = (ax-cx) * (by-cy) - (bx-cx) * (ay-cy)
+        if det > 0:
+            return predicates.LEFT_TURN
+        elif det < 0:
+            return predicates.RIGHT_TURN
+        else:
+            return predicates.COLLINEAR
+
+    # Random triples, and triples with c on or very near the line ab
+
+    randomTriples = [ [ rand.random() for i in range(n) ] for j in range(6) ]
+
+    ax, ay, bx, by = [ [ rand.random() for i in range(n) ] for j in range(4) ]
+    ts = [ rand.random() for i in range(n) ]
+    cx = [ ax[i] + ts[i]*(bx[i]-ax[i]) for i in range(n) ]
+    cy = [ ay[i] + ts[i]*(by[i]-ay[i]) for i in range(n) ]
+
+    for kind, triples in ( ('random', randomTriples), ('collinear', [ax, ay, bx, by, cx, cy]) ):
+
+        def run( f ):
+            return list( map( f, *triples ) )
+
+        numExact = sum( predicates.orient( *t ) != floatTurn( *t ) for t in zip( *triples ) )
+
+        report( 'predicates', n, kind + ' float', timed( run, floatTurn ) )
+        report( 'predicates', n, kind + ' orient', timed( run, predicates.orient ), '(%d signs corrected)' % numExact )
+        report( 'predicates', n, kind + ' orientBatch', timed( predicates.orientBatch, *triples ) )
+
+
+
+# Time the O(n log n) and output-sensitive hull builders on n points,
+# with small and large hulls
+
+def benchChan( n ):
+
+    for distribution in ( 'uniform-square', 'uniform-disk', 'gaussian', 'on-circle' ):
+
+        store = arrayhull.PointStore( *genpoints.makePoints( distribution, n ) )
+
+        start = time.perf_counter()
+        order = arrayhull.dropDuplicates( store, arrayhull.sortedOrder( store ) )
+        arrayhull.buildHull( store, order )
+        seconds = time.perf_counter() - start
+
+        note = '(h = %d)' % len( store.hullFrom( order[0] ) )
+
+        report( 'chan', n, distribution + ' sort+buildHull', seconds, note )
+
+        store = arrayhull.PointStore( store.xs, store.ys ) # fresh links
+        report( 'chan', n, distribution + ' chanHull', timed( chan.chanHull, store ), note )
+
+
+
+# Time the 3D hull of n points, and of the femur slices
+
+def bench3D( n ):
+
+    rand = random.Random( 0 )
+
+    xs, ys, zs = [ array( 'd', ( rand.random() for i in range(n) ) ) for k in range(3) ]
+
+    report( 'hull3d', n, 'cube', timed( hull3d.convexHull3D, xs, ys, zs ) )
+
+    for i in range(n): # project onto the unit sphere
+        x = rand.gauss( 0, 1 )
+        y = rand.gauss( 0, 1 )
+        z = rand.gauss( 0, 1 )
+        length = (x*x + y*y + z*z) ** 0.5
+        xs[i] = x / length
+        ys[i] = y / length
+        zs[i] = z / length
+
+    report( 'hull3d', n, 'sphere', timed( hull3d.convexHull3D, xs, ys, zs ) )
+
+    if os.path.exists( slicesFile ):
+        xs, ys, zs = pointio.readPoints3D( slicesFile )
+        report( 'hull3d', len(xs), 'femurSlices.dat load', timed( pointio.readPoints3D, slicesFile ) )
+        report( 'hull3d', len(xs), 'femurSlices.dat hull', timed( hull3d.convexHull3D, xs, ys, zs ) )
+
+
+
+# Time n point-in-hull queries and the hull measurements
+
+def benchQuery( n ):
+
+    xs, ys = genpoints.makePoints( 'uniform-disk', 100000 )
+    query = hullquery.hullQuery( xs, ys )
+
+    qxs, qys = genpoints.makePoints( 'uniform-square', n, seed=1 )
+
+    def oneByOne():
+        return [ query.contains( x, y ) for x,y in zip( qxs, qys ) ]
+
+    note = '(%d hull vertices)' % len(query)
+
+    report( 'query', n, 'contains', timed( oneByOne ), note )
+    report( 'query', n, 'containsBatch', timed( query.containsBatch, qxs, qys ), note )
+
+    report( 'query', n, 'diameter', timed( query.diameter ), note )
+    report( 'query', n, 'width', timed( query.width ), note )
+    report( 'query', n, 'minAreaRectangle', timed( query.minAreaRectangle ), note )
+
+
+
+# Compare the timings in two JSON files, returning True if any got
+# more than 'regressionRatio' times slower
+
+def compareResults( oldFile, newFile ):
+
+    with open( oldFile ) as f:
+        old = json.load( f )
+    with open( newFile ) as f:
+        new = json.load( f )
+
+    oldTimes = { (r['benchmark'], r['n'], r['name']): r['seconds'] for r in old['results'] }
+
+    print( '%s -> %s' % (old['label'], new['label']) )
+
+    regressed = False
+
+    for r in new['results']:
+
+        key = (r['benchmark'], r['n'], r['name'])
+        if key not in oldTimes or oldTimes[key] == 0:
+            continue
+
+        ratio = r['seconds'] / oldTimes[key]
+
+        if ratio > regressionRatio:
+            regressed = True
+
+        print( '%-9s %10d  %-28s %8.3f s -> %8.3f s  %5.2fx %s' %
+               (r['benchmark'], r['n'], r['name'], oldTimes[key], r['seconds'], ratio,
+                'SLOWER' if ratio > regressionRatio else '') )
+
+    return regressed
+
+
+
+# Run the benchmark named on the command line
+
+def runBenchmarks():
+
+    args = sys.argv[1:]
+
+    if len(args) == 3 and args[0] == 'compare':
+        sys.exit( 1 if compareResults( args[1], args[2] ) else 0 )
+
+    outFile = None
+    label = ''
+
+    while len(args) > 1 and args[0] in ('-o', '-l'):
+        if args[0] == '-o':
+            outFile = args[1]
+        else:
+            label = args[1]
+        args = args[2:]
+
+    if len(args) < 1 or args[0] not in benchmarks:
+        print( 'Usage: %s [-o results.json] [-l label] %s [n ...]' % (sys.argv[0], '|'.join(sorted(benchmarks))) )
+        print( '       %s compare old.json new.json' % sys.argv[0] )
+        sys.exit(1)
+
+    if args[0] == 'suite':
+        sizes = [ 1000, 10000, 100000, 1000000 ]
+    else:
+        sizes = [ 100000, 1000000 ]
+
+    sizes = [ int(float(a)) for a in args[1:] ] or sizes
+
+    for n in sizes:
+        benchmarks[ args[0] ]( n )
+
+    if outFile:
+        with open( outFile, 'w' ) as f:
+            json.dump( { 'label':    label,
+                         'python':   platform.python_version(),
+                         'platform': platform.platform(),
+                         'date':     time.strftime( '%Y-%m-%d %H:%M:%S' ),
+                         'results':  results }, f, indent=1 )
+
+
+benchmarks = { 'suite':    benchSuite,
+               'hull':     benchHull,
+               'parallel': benchParallel,
+               'load':     benchLoad,
+               'sort':     benchSort,
+               'cull':     benchCull,
+               'predicates': benchPredicates,
+               'chan':     benchChan,
+               'hull3d':   bench3D,
+               'query':    benchQuery }
+
+
+if __name__ == '__main__':
+    runBenchmarks()
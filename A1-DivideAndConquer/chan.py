@@ -0,0 +1,326 @@
+# Output-sensitive convex hull (Chan's algorithm)
+#
+# Usage: python chan.py file_of_points [outfile]
+#
+#   Writes the hull vertices in CCW order from the leftmost one, as
+#   main.py -o does.
+#
+# buildHull() takes O(n log n) time however few points are on the
+# hull, since it needs the points sorted.  Chan's algorithm takes
+# O(n log h) for a hull of h vertices, with no sort of all of the
+# points (T. M. Chan, "Optimal output-sensitive convex hull algorithms
+# in two and three dimensions", 1996):
+#
+#   For a guess m = 16, 256, 65536, ... (squaring each time), the
+#   points are cut, in the order they are given, into groups of m
+#   points.  Each group is sorted on its own and its hull is built with
+#   arrayhull's buildHull().  The hull is then gift-wrapped from its
+#   leftmost point: the next vertex is the most clockwise of the
+#   tangents from the current vertex to the group hulls, each found by
+#   a binary search in O(log m).  If the wrap does not close within m
+#   steps, h > m and the next guess is tried.
+#
+# Each guess costs O(n log m): O(m log m) to sort and build each of
+# the n/m groups, and O((n/m) log m) for each of at most m wrap steps.
+# The last guess is less than h^2, so the total is O(n log h).  Since
+# the groups of each guess are made again from the input, a larger
+# guess does not reuse the smaller one's group hulls, which costs at
+# most a constant factor as the guesses square.
+#
+# In practice the sort that this avoids is a small part of sorting and
+# building with buildHull() (sorted() runs in C), while the wrap's box
+# tests and tangent searches run in Python, so this is no faster at
+# the sizes that fit in memory (see 'python bench.py chan'): two to
+# four times slower with few hull vertices, and many times slower when
+# most points are on the hull.
+
+
+import sys
+
+import arrayhull, predicates, pointio
+
+
+
+# Build the hull of some points with Chan's algorithm
+#
+# 'indices' holds the indices of the points in the store, in any order
+# and possibly with repeated points (default: all of the store's
+# points).  Returns the hull vertices in CCW order from the leftmost
+# (lowest of the leftmost) point, and links them into the store's CW
+# and CCW links as buildHull() would; the links of points not on the
+# hull are not changed.  Of repeated points on the hull, the one in
+# the earliest group is used.
+
+def chanHull( store, indices=None ):
+
+    if indices is None:
+        indices = range( len(store) )
+
+    if len(indices) == 0:
+        return []
+
+    m = 16
+
+    while True:
+
+        verts = wrapHull( store, groupHulls( store, indices, m ), m )
+
+        if verts is not None:
+            break
+
+        m = m*m
+
+    cw  = store.cw
+    ccw = store.ccw
+
+    if len(verts) > 1:
+        prev = verts[-1]
+        for i in verts:
+            ccw[prev] = i
+            cw[i] = prev
+            prev = i
+
+    return verts
+
+
+
+# Build the hulls of groups of m points
+#
+# Group j holds indices[m*j : m*(j+1)].  Each group is sorted by x (and
+# y for equal x), has its repeated points dropped, and is built with
+# arrayhull.buildHull() in a scratch store.  Returns the vertex list
+# of each group's hull in CCW order from its leftmost point.
+
+def groupHulls( store, indices, m ):
+
+    xs = store.xs
+    ys = store.ys
+
+    scratch = arrayhull.PointStore( xs, ys )
+
+    groups = []
+
+    for start in range( 0, len(indices), m ):
+
+        order = sorted( indices[start:start+m], key=ys.__getitem__ )
+        order.sort( key=xs.__getitem__ ) # (stable, so by y for equal x)
+
+        order = arrayhull.dropDuplicates( scratch, order )
+
+        arrayhull.buildHull( scratch, order )
+
+        groups.append( scratch.hullFrom( order[0] ) )
+
+    return groups
+
+
+
+# Gift-wrap the hull of the points of some groups around the groups'
+# hulls
+#
+# Returns the hull vertices in CCW order from the leftmost point, or
+# None if there are more than m of them (unless there is only one
+# group, whose hull is the whole hull).
+#
+# Each step starts from the tangent to the group of the last vertex
+# (the vertex's CCW neighbour on its group hull).  A group whose
+# bounding box is entirely on the left of the line from the vertex to
+# the best tangent so far cannot give a better one, so most groups are
+# passed over with a few arithmetic operations instead of a binary
+# search.  The box test leaves a margin for rounding error, so it only
+# passes over groups that are clearly on the left.
+#
+# A point repeated in several groups is a vertex of each of their
+# hulls, so the wrap stops when it comes back to the coordinates of
+# its first vertex rather than to the vertex itself.
+
+def wrapHull( store, groups, m ):
+
+    xs = store.xs
+    ys = store.ys
+
+    if len(groups) == 1: # the group hull is the hull
+        return groups[0]
+
+    # Centre and half size of each group's bounding box
+
+    boxes = []
+    for hull in groups:
+        minX = xs[hull[0]]
+        maxX = max( xs[i] for i in hull )
+        minY = min( ys[i] for i in hull )
+        maxY = max( ys[i] for i in hull )
+        boxes.append( ((minX+maxX)/2, (minY+maxY)/2, (maxX-minX)/2, (maxY-minY)/2) )
+
+    margin = 64 * predicates.staticBound( [ min( box[0]-box[2] for box in boxes ), max( box[0]+box[2] for box in boxes ) ],
+                                         [ min( box[1]-box[3] for box in boxes ), max( box[1]+box[3] for box in boxes ) ] )
+
+    # Start from the leftmost of the groups' leftmost points
+
+    g = min( range( len(groups) ), key=lambda j: (xs[groups[j][0]], ys[groups[j][0]]) ) # group of p
+
+    first = groups[g][0]
+    firstX = xs[first]
+    firstY = ys[first]
+
+    verts = [ first ]
+
+    p = first
+    while len(verts) <= m:
+
+        px = xs[p]
+        py = ys[p]
+
+        best = tangent( xs, ys, groups[g], p )
+        bestGroup = g
+
+        for j, (cx, cy, halfWidth, halfHeight) in enumerate( boxes ):
+
+            if j == g:
+                continue
+
+            # Largest distance (scaled) of the box to the right of the
+            # line from p to best
+
+            nx = ys[best] - py
+            ny = px - xs[best]
+            if nx*(cx-px) + ny*(cy-py) + abs(nx)*halfWidth + abs(ny)*halfHeight < -margin:
+                continue
+
+            q = tangent( xs, ys, groups[j], p )
+            if isBetterTurn( xs, ys, p, best, q ):
+                best = q
+                bestGroup = j
+
+        if xs[best] == firstX and ys[best] == firstY:
+            return verts
+
+        verts.append( best )
+        p = best
+        g = bestGroup
+
+    return None
+
+
+
+# Determine whether q is a better next hull vertex after p than 'best'
+#
+# It is if q is clockwise of the ray from p through 'best', or on that
+# ray and farther out, so that no hull vertex is collinear with its
+# neighbours.
+
+def isBetterTurn( xs, ys, p, best, q ):
+
+    side = predicates.orientSign( xs[p], ys[p], xs[best], ys[best], xs[q], ys[q] )
+
+    if side != 0:
+        return side < 0
+
+    return ( (xs[q]-xs[p])**2 + (ys[q]-ys[p])**2 >
+             (xs[best]-xs[p])**2 + (ys[best]-ys[p])**2 )
+
+
+
+# Return the vertex of a convex polygon that is the tangent point from
+# p with the whole polygon on its left
+#
+# 'hull' lists the polygon's vertices in CCW order, with none collinear
+# with its neighbours, and p must be outside it or one of its vertices
+# (which gives p's CCW neighbour).  Seen from p, the vertices turn
+# clockwise ("down") along one run of the polygon's edges and
+# counterclockwise along the rest; the tangent point is the vertex at
+# the end of the clockwise run.  An edge pointing straight
+# at or away from p counts as clockwise, so of two vertices on the
+# tangent line the farther one is returned.
+#
+# The end of the run is found by a binary search over the vertices,
+# which compares each with vertex 0 to tell which side of the run it
+# is on, and is then checked with a walk along the edges.  The walk
+# only moves in degenerate cases, so the search is O(log n).
+
+def tangent( xs, ys, hull, p ):
+
+    n = len(hull)
+
+    if n == 1:
+        return hull[0]
+
+    px = xs[p]
+    py = ys[p]
+
+    orientSign = predicates.orientSign
+
+    def side( a, b ): # sign of the turn p -> a -> b
+        return orientSign( px, py, xs[a], ys[a], xs[b], ys[b] )
+
+    def isDown( k ): # does edge k -> k+1 turn clockwise as seen from p?
+        return side( hull[k], hull[(k+1) % n] ) <= 0
+
+    if n == 2:
+        if side( hull[0], hull[1] ) != 0:
+            return hull[1] if side( hull[0], hull[1] ) < 0 else hull[0]
+        return max( hull, key=lambda i: (xs[i]-px)**2 + (ys[i]-py)**2 )
+
+    first = hull[0]
+    firstDown = isDown( 0 )
+
+    if not firstDown and isDown( n-1 ):
+        return first
+
+    # Find the first vertex k in 1 ... n-1 past the end of the
+    # clockwise run, which is where isPast(k) becomes true
+
+    if firstDown: # the run starts at (or before) vertex 0
+        def isPast( k ):
+            return not isDown( k ) or side( first, hull[k] ) > 0
+    else: # the run is in the middle
+        def isPast( k ):
+            return not isDown( k ) and side( first, hull[k] ) < 0
+
+    lo = 1
+    hi = n-1
+    while lo < hi:
+        mid = (lo+hi) // 2
+        if isPast( mid ):
+            hi = mid
+        else:
+            lo = mid+1
+
+    # Check the result
+
+    k = lo
+    while isDown( k ):
+        k = (k+1) % n
+    while not isDown( (k-1) % n ):
+        k = (k-1) % n
+
+    return hull[k]
+
+
+
+def main():
+
+    if len(sys.argv) not in (2,3):
+        print( 'Usage: %s file_of_points [outfile]' % sys.argv[0] )
+        sys.exit(1)
+
+    try:
+        xs, ys, isSorted = pointio.openPoints( sys.argv[1] )
+    except ValueError as e:
+        print( '%s: %s' % (sys.argv[1], e) )
+        sys.exit(1)
+
+    verts = chanHull( arrayhull.PointStore( xs, ys ) )
+
+    f = sys.stdout if len(sys.argv) == 2 else open( sys.argv[2], 'w' )
+
+    for i in verts:
+        f.write( '%r %r\n' % (xs[i], ys[i]) )
+
+    if f is not sys.stdout:
+        f.close()
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+# Synthetic point sets for the convex hull
+#
+# Usage: python genpoints.py [-b] [-s seed] distribution n outfile
+#
+#   -b writes a binary points file instead of a text one
+#   -s sets the random seed (default 0)
+#
+# Distributions:
+#
+#   uniform-square   uniform in the unit square
+#   uniform-disk     uniform in the unit disk
+#   on-circle        on the unit circle, so every point is on the hull
+#   gaussian         standard normal in x and y
+#   clustered        normal clusters of radius 0.02 around about
+#                    sqrt(n)/10 uniform centres in the unit square
+
+
+import sys, math, random
+from array import array
+
+import pointio
+
+
+
+# Each distribution takes n and a random.Random and returns x and y arrays
+
+def uniformSquare( n, rand ):
+
+    xs = array( 'd', (rand.random() for i in range(n)) )
+    ys = array( 'd', (rand.random() for i in range(n)) )
+
+    return xs, ys
+
+
+def uniformDisk( n, rand ):
+
+    xs = array( 'd' )
+    ys = array( 'd' )
+
+    for i in range(n):
+        r = math.sqrt( rand.random() )
+        theta = 2 * math.pi * rand.random()
+        xs.append( r * math.cos(theta) )
+        ys.append( r * math.sin(theta) )
+
+    return xs, ys
+
+
+def onCircle( n, rand ):
+
+    thetas = [ 2 * math.pi * rand.random() for i in range(n) ]
+
+    return array( 'd', map( math.cos, thetas ) ), array( 'd', map( math.sin, thetas ) )
+
+
+def gaussian( n, rand ):
+
+    xs = array( 'd', (rand.gauss(0,1) for i in range(n)) )
+    ys = array( 'd', (rand.gauss(0,1) for i in range(n)) )
+
+    return xs, ys
+
+
+def clustered( n, rand ):
+
+    numClusters = max( 1, int( math.sqrt(n) / 10 ) )
+    centres = [ (rand.random(), rand.random()) for i in range(numClusters) ]
+
+    xs = array( 'd' )
+    ys = array( 'd' )
+
+    for i in range(n):
+        cx, cy = rand.choice( centres )
+        xs.append( rand.gauss( cx, 0.02 ) )
+        ys.append( rand.gauss( cy, 0.02 ) )
+
+    return xs, ys
+
+
+distributions = { 'uniform-square': uniformSquare,
+                  'uniform-disk':   uniformDisk,
+                  'on-circle':      onCircle,
+                  'gaussian':       gaussian,
+                  'clustered':      clustered }
+
+
+
+# Make n points from a named distribution, returning x and y arrays
+
+def makePoints( distribution, n, seed=0 ):
+
+    return distributions[ distribution ]( n, random.Random( seed ) )
+
+
+
+# Write points to a text points file
+
+def writeTextPoints( filename, xs, ys ):
+
+    with open( filename, 'w' ) as f:
+        for x,y in zip( xs, ys ):
+            f.write( '%r %r\n' % (x,y) )
+
+
+
+def main():
+
+    args = sys.argv[1:]
+
+    binary = False
+    seed = 0
+
+    while len(args) > 3:
+        if args[0] == '-b':
+            binary = True
+        elif args[0] == '-s':
+            seed = int( args[1] )
+            args = args[1:]
+        args = args[1:]
+
+    if len(args) != 3 or args[0] not in distributions:
+        print( 'Usage: %s [-b] [-s seed] %s n outfile' % (sys.argv[0], '|'.join(distributions)) )
+        sys.exit(1)
+
+    xs, ys = makePoints( args[0], int(float(args[1])), seed )
+
+    if binary:
+        pointio.writeBinaryPoints( args[2], xs, ys )
+    else:
+        writeTextPoints( args[2], xs, ys )
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,402 @@
+# 3D convex hull
+#
+# Usage: python hull3d.py [-s seed] file_of_points [outfile]
+#
+#   Reads a slice file (as read by A3's slices.py, such as
+#   femurSlices.dat) or an xyz file of 3D points (see
+#   pointio.readPoints3D()) and writes the hull as a triangle mesh in
+#   Wavefront OBJ format: a 'v x y z' line for each hull vertex and an
+#   'f i j k' line (1-based) for each triangle, with the vertices of
+#   each triangle CCW as seen from outside the hull.  -s sets the seed
+#   of the random insertion order.
+#
+# The hull is built by randomized incremental insertion with a
+# conflict graph (K. L. Clarkson and P. W. Shor, 1989; de Berg et al.,
+# "Computational Geometry", chapter 11), in O(n log n) expected time:
+#
+#   A tetrahedron of four of the points is the first hull.  The other
+#   points are added in random order.  Each face keeps a list of the
+#   points not yet added that see it (are strictly outside its plane),
+#   and each point a list of the faces it sees, so when a point is
+#   added its visible faces are already known.  They are removed, and
+#   each edge of the horizon (the boundary of the visible faces) is
+#   joined to the point by a new face.  The only points that can see a
+#   new face are those that saw one of the two old faces on its
+#   horizon edge, so only they are tested against it.
+#
+# Which side of a face's plane a point is on is first found from the
+# face's normal in floating point, and, if that is within rounding
+# error of zero, again exactly with predicates.orient3dSign().  A point
+# in the plane of a face does not see it, so points on the hull's
+# surface are not added, and coplanar points (as in each slice of a
+# slice file) never make the hull fold over.  Flat parts of the hull
+# are split into triangles.
+
+
+import sys, random
+from array import array
+
+import predicates, pointio
+
+
+
+# Hull3D
+#
+# The hull of the points (xs[i],ys[i],zs[i]).  Faces are numbered in
+# order of creation and hold their three vertices in CCW order seen
+# from outside.  Removed faces keep their numbers but are marked dead.
+# The face with directed edge a->b is found in a dict keyed by
+# a*n + b, so the face across that edge is the one with edge b->a.
+
+class Hull3D(object):
+
+    def __init__( self, xs, ys, zs ):
+
+        if not len(xs) == len(ys) == len(zs):
+            raise ValueError( 'coordinate counts differ (%d, %d and %d)' % (len(xs),len(ys),len(zs)) )
+
+        self.xs = xs
+        self.ys = ys
+        self.zs = zs
+
+        self.faceA = array( 'i' ) # vertices of each face
+        self.faceB = array( 'i' )
+        self.faceC = array( 'i' )
+
+        self.normalX = array( 'd' ) # unnormalized outward normal of each face
+        self.normalY = array( 'd' )
+        self.normalZ = array( 'd' )
+
+        self.isAlive = bytearray()
+
+        self.edgeFaces = {} # face of each directed edge
+
+        self.conflicts = [] # points not yet added that see each face
+
+        self.bound = 4 * predicates.staticBound3( xs, ys, zs ) # rounding error of a plane test
+
+
+    def __len__(self):
+        return sum( self.isAlive )
+
+
+    def __repr__(self):
+        return 'Hull3D(%d points, %d faces)' % (len(self.xs), len(self))
+
+
+    # Add a face with vertices a, b, c in CCW order seen from outside
+
+    def makeFace( self, a, b, c ):
+
+        xs = self.xs
+        ys = self.ys
+        zs = self.zs
+
+        ux = xs[b]-xs[a]; uy = ys[b]-ys[a]; uz = zs[b]-zs[a]
+        vx = xs[c]-xs[a]; vy = ys[c]-ys[a]; vz = zs[c]-zs[a]
+
+        f = len(self.faceA)
+
+        self.faceA.append( a )
+        self.faceB.append( b )
+        self.faceC.append( c )
+
+        self.normalX.append( uy*vz - uz*vy )
+        self.normalY.append( uz*vx - ux*vz )
+        self.normalZ.append( ux*vy - uy*vx )
+
+        self.isAlive.append( 1 )
+        self.conflicts.append( [] )
+
+        n = len(xs)
+        self.edgeFaces[a*n + b] = f
+        self.edgeFaces[b*n + c] = f
+        self.edgeFaces[c*n + a] = f
+
+        return f
+
+
+    # Determine whether point p is strictly outside the plane of face f
+
+    def sees( self, f, p ):
+
+        xs = self.xs
+        ys = self.ys
+        zs = self.zs
+
+        a = self.faceA[f]
+
+        side = ( self.normalX[f] * (xs[p]-xs[a]) +
+                 self.normalY[f] * (ys[p]-ys[a]) +
+                 self.normalZ[f] * (zs[p]-zs[a]) )
+
+        if side > self.bound:
+            return True
+        if side < -self.bound:
+            return False
+
+        b = self.faceB[f]
+        c = self.faceC[f]
+
+        return predicates.orient3dSign( xs[a], ys[a], zs[a], xs[b], ys[b], zs[b],
+                                        xs[c], ys[c], zs[c], xs[p], ys[p], zs[p] ) > 0
+
+
+    # Build the hull, adding the points in a random order from 'seed'
+
+    def build( self, seed=0 ):
+
+        n = len(self.xs)
+
+        first = initialTetrahedron( self.xs, self.ys, self.zs )
+
+        a, b, c, d = first
+
+        if orient3d( self.xs, self.ys, self.zs, a, b, c, d ) > 0: # make the faces point away from d
+            b, c = c, b
+
+        faces = [ self.makeFace( a, b, c ), self.makeFace( a, d, b ),
+                  self.makeFace( b, d, c ), self.makeFace( c, d, a ) ]
+
+        rest = [ i for i in range(n) if i not in first ]
+        random.Random( seed ).shuffle( rest )
+
+        seenFaces = [ None ] * n # for each point not yet added, the faces it sees (some may be dead)
+
+        for p in rest:
+            seenFaces[p] = [ f for f in faces if self.sees( f, p ) ]
+            for f in seenFaces[p]:
+                self.conflicts[f].append( p )
+
+        lastTested = array( 'i', [-1] ) * n # last new face each point was tested against
+
+        for p in rest:
+            self.addPoint( p, seenFaces, lastTested )
+
+
+    # Add point p to the hull
+    #
+    # 'seenFaces' and the faces' conflict lists are updated for the new
+    # faces.  Points that have been added have seenFaces[p] = None.
+
+    def addPoint( self, p, seenFaces, lastTested ):
+
+        isAlive = self.isAlive
+        conflicts = self.conflicts
+        edgeFaces = self.edgeFaces
+        n = len(self.xs)
+
+        visible = [ f for f in seenFaces[p] if isAlive[f] ]
+        seenFaces[p] = None
+
+        if len(visible) == 0: # inside the hull or on its surface
+            return
+
+        for f in visible:
+            isAlive[f] = 0
+
+        # Find the horizon: the edges of visible faces whose other face
+        # is not visible
+
+        horizon = []
+
+        for f in visible:
+            for u, v in faceEdges( self, f ):
+                g = edgeFaces[v*n + u]
+                if isAlive[g]:
+                    horizon.append( (u, v, f, g) )
+
+        for f in visible:
+            for u, v in faceEdges( self, f ):
+                del edgeFaces[u*n + v]
+
+        # Join each horizon edge to p, and find the points that see
+        # the new face among those that saw the faces on either side
+        # of the edge
+
+        xs = self.xs
+        ys = self.ys
+        zs = self.zs
+        bound = self.bound
+
+        for u, v, f, g in horizon:
+
+            h = self.makeFace( u, v, p )
+
+            newConflicts = conflicts[h]
+
+            # The plane test of sees() is written out here, since this
+            # is the inner loop of the build
+
+            nx = self.normalX[h]
+            ny = self.normalY[h]
+            nz = self.normalZ[h]
+            ux = xs[u]
+            uy = ys[u]
+            uz = zs[u]
+
+            for q in conflicts[f] + conflicts[g]:
+
+                if lastTested[q] == h or seenFaces[q] is None:
+                    continue
+
+                lastTested[q] = h
+
+                side = nx * (xs[q]-ux) + ny * (ys[q]-uy) + nz * (zs[q]-uz)
+
+                if side > bound or (side >= -bound and self.sees( h, q )):
+                    newConflicts.append( q )
+                    seenFaces[q].append( h )
+
+        for f in visible:
+            conflicts[f] = None
+
+
+    # Return the hull's triangles as (a, b, c) point indices, each CCW
+    # as seen from outside
+
+    def triangles( self ):
+
+        return [ (self.faceA[f], self.faceB[f], self.faceC[f])
+                 for f in range( len(self.faceA) ) if self.isAlive[f] ]
+
+
+
+# Return the directed edges of a face
+
+def faceEdges( hull, f ):
+
+    a = hull.faceA[f]
+    b = hull.faceB[f]
+    c = hull.faceC[f]
+
+    return (a, b), (b, c), (c, a)
+
+
+
+# Return the exact side of the plane through points a, b, c that
+# point d is on (see predicates.orient3dSign())
+
+def orient3d( xs, ys, zs, a, b, c, d ):
+
+    return predicates.orient3dSign( xs[a], ys[a], zs[a], xs[b], ys[b], zs[b],
+                                    xs[c], ys[c], zs[c], xs[d], ys[d], zs[d] )
+
+
+
+# Choose four points that are not coplanar
+#
+# These are the point with the smallest x, the point farthest from
+# it, the point farthest from the line through those, and the point
+# farthest from the plane through those three, so the first hull is
+# large and few points see it.  Raises a ValueError if all of the
+# points are coplanar.
+
+def initialTetrahedron( xs, ys, zs ):
+
+    n = len(xs)
+
+    if n < 4:
+        raise ValueError( 'a 3D hull needs at least 4 points, not %d' % n )
+
+    a = min( range(n), key=lambda i: (xs[i], ys[i], zs[i]) )
+
+    def dist2( i ):
+        return (xs[i]-xs[a])**2 + (ys[i]-ys[a])**2 + (zs[i]-zs[a])**2
+
+    b = max( range(n), key=dist2 )
+
+    ux = xs[b]-xs[a]; uy = ys[b]-ys[a]; uz = zs[b]-zs[a]
+
+    def lineDist2( i ): # (scaled) squared distance from the line ab
+        wx = xs[i]-xs[a]; wy = ys[i]-ys[a]; wz = zs[i]-zs[a]
+        return (uy*wz - uz*wy)**2 + (uz*wx - ux*wz)**2 + (ux*wy - uy*wx)**2
+
+    c = max( range(n), key=lineDist2 )
+
+    d = max( range(n), key=lambda i: abs( planeSide( xs, ys, zs, a, b, c, i ) ) )
+
+    if orient3d( xs, ys, zs, a, b, c, d ) == 0: # (then every point is in the plane)
+        raise ValueError( 'the points are all in one plane' )
+
+    return a, b, c, d
+
+
+
+# Return the (scaled) signed distance of point d from the plane
+# through a, b, c, in floating point
+
+def planeSide( xs, ys, zs, a, b, c, d ):
+
+    ux = xs[b]-xs[a]; uy = ys[b]-ys[a]; uz = zs[b]-zs[a]
+    vx = xs[c]-xs[a]; vy = ys[c]-ys[a]; vz = zs[c]-zs[a]
+    wx = xs[d]-xs[a]; wy = ys[d]-ys[a]; wz = zs[d]-zs[a]
+
+    return wx * (uy*vz - uz*vy) + wy * (uz*vx - ux*vz) + wz * (ux*vy - uy*vx)
+
+
+
+# Return the triangles of the convex hull of some 3D points
+#
+# The triangles are (a, b, c) indices into the coordinate arrays, CCW
+# as seen from outside.
+
+def convexHull3D( xs, ys, zs, seed=0 ):
+
+    hull = Hull3D( xs, ys, zs )
+    hull.build( seed )
+
+    return hull.triangles()
+
+
+
+# Write a triangle mesh in Wavefront OBJ format
+#
+# Only the vertices used by the triangles are written, in order of
+# index.
+
+def writeOBJ( f, xs, ys, zs, triangles ):
+
+    used = sorted( set( i for tri in triangles for i in tri ) )
+
+    number = {}
+    for k, i in enumerate( used ):
+        number[i] = k+1
+        f.write( 'v %r %r %r\n' % (xs[i], ys[i], zs[i]) )
+
+    for a, b, c in triangles:
+        f.write( 'f %d %d %d\n' % (number[a], number[b], number[c]) )
+
+
+
+def main():
+
+    args = sys.argv[1:]
+
+    seed = 0
+    if len(args) > 2 and args[0] == '-s':
+        seed = int( args[1] )
+        args = args[2:]
+
+    if len(args) not in (1,2):
+        print( 'Usage: %s [-s seed] file_of_points [outfile]' % sys.argv[0] )
+        sys.exit(1)
+
+    try:
+        xs, ys, zs = pointio.readPoints3D( args[0] )
+        triangles = convexHull3D( xs, ys, zs, seed )
+    except ValueError as e:
+        print( '%s: %s' % (args[0], e) )
+        sys.exit(1)
+
+    f = sys.stdout if len(args) == 1 else open( args[1], 'w' )
+
+    writeOBJ( f, xs, ys, zs, triangles )
+
+    if f is not sys.stdout:
+        f.close()
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+# Hull merge profiler
+#
+# Usage: python main.py -p report_file file_of_points
+#
+#   Builds the hull with arrayhull.py's buildHull(), as the headless
+#   -o mode does, and writes a report of where the time went.  The
+#   report is JSON if 'report_file' ends in '.json', and otherwise is
+#   in the folded-stack format read by flame graph tools (one line per
+#   stack, frames separated by ';', followed by a time in
+#   microseconds).
+#
+# For each recursion depth of buildHull() the report gives
+#
+#   calls          the number of buildHull() calls at that depth
+#   turns          the number of turn determinants computed at that
+#                  depth (in base cases and tangent walks)
+#   walkSteps      the number of iterations of the downward and upward
+#                  tangent walks
+#   pointerResets  the number of CW or CCW links set to NONE
+#   seconds        the time spent in those calls, including deeper calls
+#   selfSeconds    the same, excluding deeper calls (the merges)
+#
+# and the times to read the points and to sort them.
+#
+# Nothing in arrayhull.py is changed to allow this, so a normal run
+# costs exactly what it did.  Instead, profile() compiles instrumented
+# copies of buildHull(), baseHull() and mergeHulls() from their source,
+# with a counting call added after each turn determinant, at the start
+# of each walk loop and after each link set to NONE.  The copies run in
+# their own copy of arrayhull's globals, in which 'buildHull' is a
+# timing wrapper, so arrayhull itself is never rebound.  The copies
+# keep the line numbers of arrayhull.py, so tracebacks and other
+# profilers point at the right lines.
+#
+# The counted statements are found by name: turn determinants are
+# assigned to locals named 't' or 'det', and links are set to NONE
+# through locals named 'cw' and 'ccw' (as noted in arrayhull.py).  If a
+# function no longer has a statement to count that it should have,
+# profile() raises a RuntimeError rather than report zeros.
+
+
+import ast, inspect, json, textwrap, time
+
+import arrayhull
+
+
+reportFields = [ 'calls', 'turns', 'walkSteps', 'pointerResets', 'seconds', 'selfSeconds' ]
+
+profiledFunctions = { 'buildHull':  [], # fields that each function must have statements to count
+                      'baseHull':   [ 'turns' ],
+                      'mergeHulls': [ 'turns', 'walkSteps', 'pointerResets' ] }
+
+
+
+# Profile
+#
+# Holds the counts and times of each recursion depth.
+
+class Profile(object):
+
+    def __init__( self ):
+
+        self.depths = [] # for each depth, a dict of the reportFields
+
+        self.depth = -1 # depth of the buildHull() call now running
+
+        self.stages = {} # seconds spent in each stage outside buildHull()
+
+
+    def __repr__(self):
+        return 'Profile(%d depths)' % len(self.depths)
+
+
+    def count( self, field, amount=1 ):
+        self.depths[self.depth][field] += amount
+
+
+    # Return the report as a dict, ready for JSON
+
+    def report( self ):
+
+        return { 'stages': self.stages,
+                 'depths': [ dict( stats, depth=d ) for d, stats in enumerate( self.depths ) ] }
+
+
+    # Return the report in folded-stack format
+    #
+    # A depth's self time is charged to the stack of buildHull frames
+    # down to that depth.
+
+    def folded( self ):
+
+        lines = [ '%s %d' % (stage, round( 1e6*seconds )) for stage, seconds in self.stages.items() ]
+
+        for d, stats in enumerate( self.depths ):
+            stack = ';'.join( 'buildHull depth %d' % i for i in range(d+1) )
+            lines.append( '%s %d' % (stack, round( 1e6*stats['selfSeconds'] )) )
+
+        return '\n'.join( lines ) + '\n'
+
+
+
+# Return a statement that counts 'field', placed at the line of 'node'
+
+def counter( field, node ):
+
+    statement = ast.parse( '_profile.count( "%s" )' % field ).body[0]
+
+    for n in ast.walk( statement ):
+        ast.copy_location( n, node )
+
+    return statement
+
+
+
+# Add counting calls to arrayhull.py's hull functions
+
+class Instrumenter(ast.NodeTransformer):
+
+    def __init__( self ):
+
+        self.numCounters = dict.fromkeys( reportFields, 0 ) # counting calls added for each field
+
+
+    def __repr__(self):
+        return 'Instrumenter(%r)' % self.numCounters
+
+
+    # Return a counting call for a field
+
+    def counter( self, field, node ):
+
+        self.numCounters[field] += 1
+
+        return counter( field, node )
+
+
+    # Count each iteration of a walk loop
+
+    def visit_While( self, node ):
+
+        self.generic_visit( node )
+
+        node.body.insert( 0, self.counter( 'walkSteps', node ) )
+
+        return node
+
+
+    # Count each turn determinant and each link set to NONE
+
+    def visit_Assign( self, node ):
+
+        if any( isinstance( t, ast.Name ) and t.id in ('t','det') for t in node.targets ):
+            if not (isinstance( node.value, ast.Call ) and getattr( node.value.func, 'id', None ) == 'orientSign'): # a recheck, not a new determinant
+                return [ node, self.counter( 'turns', node ) ]
+
+        if ( isinstance( node.value, ast.Name ) and node.value.id == 'NONE' and
+             any( isinstance( t, ast.Subscript ) and getattr( t.value, 'id', None ) in ('cw','ccw') for t in node.targets ) ):
+            return [ node, self.counter( 'pointerResets', node ) ]
+
+        return node
+
+
+
+# Compile instrumented copies of arrayhull's hull functions into
+# 'namespace', which should be a copy of arrayhull's globals
+#
+# Each copy is compiled with the line numbers of its source in
+# arrayhull.py.  A RuntimeError is raised if a function has nothing to
+# count for a field that it should.
+
+def compileInstrumented( namespace ):
+
+    for name, fields in profiledFunctions.items():
+
+        function = getattr( arrayhull, name )
+
+        lines, firstLine = inspect.getsourcelines( function )
+
+        tree = ast.parse( textwrap.dedent( ''.join( lines ) ) )
+        ast.increment_lineno( tree, firstLine-1 )
+
+        instrumenter = Instrumenter()
+        tree = instrumenter.visit( tree )
+        ast.fix_missing_locations( tree )
+
+        for field in fields:
+            if instrumenter.numCounters[field] == 0:
+                raise RuntimeError( 'arrayhull.%s() has no statements to count as %s (see the names in hullprofile.py)' % (name, field) )
+
+        exec( compile( tree, inspect.getsourcefile( function ), 'exec' ), namespace )
+
+
+
+# Build the hull of the points 'order' of a store under the profiler
+#
+# 'order' must be sorted, with no repeated points (see
+# arrayhull.dropDuplicates()).
+
+def profile( store, order, prof ):
+
+    namespace = dict( vars( arrayhull ) )
+    namespace['_profile'] = prof
+
+    compileInstrumented( namespace )
+
+    countedBuildHull = namespace['buildHull']
+
+    def profiledBuildHull( store, order, lo=0, hi=None ):
+
+        prof.depth += 1
+        if prof.depth == len(prof.depths):
+            prof.depths.append( dict.fromkeys( reportFields, 0 ) )
+
+        stats = prof.depths[prof.depth]
+        stats['calls'] += 1
+
+        start = time.perf_counter()
+        countedBuildHull( store, order, lo, hi )
+        elapsed = time.perf_counter() - start
+
+        stats['seconds'] += elapsed
+        stats['selfSeconds'] += elapsed
+
+        prof.depth -= 1
+        if prof.depth >= 0:
+            prof.depths[prof.depth]['selfSeconds'] -= elapsed
+
+    namespace['buildHull'] = profiledBuildHull # so that the recursive calls are timed too
+
+    profiledBuildHull( store, order )
+
+
+
+# Read, sort and build the hull of a points file under the profiler,
+# and write the report
+#
+# 'readPoints' reads a points file into (xs, ys, isSorted), as
+# pointio.openPoints() does.
+
+def profileFile( readPoints, inFile, reportFile ):
+
+    prof = Profile()
+
+    start = time.perf_counter()
+    xs, ys, isSorted = readPoints( inFile )
+    prof.stages['read'] = time.perf_counter() - start
+
+    store = arrayhull.PointStore( xs, ys )
+
+    start = time.perf_counter()
+    if isSorted:
+        order = range( len(xs) )
+    else:
+        order = arrayhull.sortedOrder( store )
+    order = arrayhull.dropDuplicates( store, order )
+    prof.stages['sort'] = time.perf_counter() - start
+
+    if len(order) > 1:
+        profile( store, order, prof )
+
+    with open( reportFile, 'w' ) as f:
+        if reportFile.endswith( '.json' ):
+            json.dump( prof.report(), f, indent=1 )
+        else:
+            f.write( prof.folded() )
@@ -0,0 +1,418 @@
+# Queries on a finished convex hull
+#
+# Usage: python hullquery.py file_of_points [query_points [outfile]]
+#
+#   Builds the hull of the points and prints its diameter, width and
+#   minimum-area bounding rectangle.  If a second points file is
+#   given, also writes 1 or 0 for each of its points, one per line,
+#   according to whether the point is in the hull.
+#
+# A HullQuery is made from the hull's vertex coordinates in CCW order
+# from the leftmost one, as returned by arrayhull.hullCoords().
+#
+# Containment splits the hull at its leftmost and rightmost vertices
+# into a lower and an upper chain, each with increasing x.  A query
+# point finds the edge of each chain above or below it by a binary
+# search on the vertices' x coordinates, and is in the hull if it is
+# on or above the lower edge and on or below the upper edge, so each
+# query costs O(log n) and two turn tests.  Points on the boundary
+# are in the hull.  containsBatch() runs this for many points in one
+# loop, with the turn tests written out against precomputed edge
+# vectors and the filtered, exact sign of predicates.py.
+#
+# The diameter, width and minimum-area rectangle are found by rotating
+# calipers: for each hull edge in turn, the vertices farthest from it
+# and farthest along it in each direction are kept as pointers that
+# only move forward around the hull, so each takes O(n) in total.
+
+
+import sys, math
+from array import array
+from bisect import bisect_left, bisect_right
+
+import arrayhull, predicates, pointio
+
+
+
+# HullQuery
+#
+# Answers queries on the hull with vertices (xs[i],ys[i]), which must
+# be in CCW order from the leftmost (and lowest of those) vertex, with
+# no repeated vertices and no vertex collinear with its neighbours.
+
+class HullQuery(object):
+
+    def __init__( self, xs, ys ):
+
+        if len(xs) != len(ys):
+            raise ValueError( 'x and y coordinate counts differ (%d and %d)' % (len(xs),len(ys)) )
+
+        self.xs = xs
+        self.ys = ys
+
+        n = len(xs)
+
+        if n == 0:
+            return
+
+        self.minX = min( xs )
+        self.maxX = max( xs )
+        self.minY = min( ys )
+        self.maxY = max( ys )
+
+        self.bound = predicates.staticBound( xs, ys ) # covers any query point in the bounding box
+
+        # Split at the rightmost (and highest of those) vertex.  The
+        # lower chain ends with the right vertical edge, if there is
+        # one, and the upper chain starts with the left vertical edge.
+
+        right = max( range(n), key=lambda i: (xs[i],ys[i]) )
+
+        self.lower = list( range( 0, right+1 ) )                # vertex indices, left to right
+        self.upper = [0] + list( range( n-1, right-1, -1 ) )
+
+        self.lowerXs = array( 'd', (xs[i] for i in self.lower) )
+        self.upperXs = array( 'd', (xs[i] for i in self.upper) )
+
+        # Start and vector of the edge that ends at each chain vertex
+
+        self.lowerEdges = chainEdges( xs, ys, self.lower )
+        self.upperEdges = chainEdges( xs, ys, self.upper )
+
+
+    def __len__(self):
+        return len(self.xs)
+
+
+    def __repr__(self):
+        return 'HullQuery(%d vertices)' % len(self.xs)
+
+
+    # Determine whether (x,y) is in the hull
+
+    def contains( self, x, y ):
+
+        return self.containsBatch( (x,), (y,) )[0] == 1
+
+
+    # Determine whether each of many points is in the hull
+    #
+    # 'qxs' and 'qys' are sequences of the query points' coordinates.
+    # Returns a bytearray with 1 for each point in the hull and 0 for
+    # each point outside it.
+
+    def containsBatch( self, qxs, qys ):
+
+        if len(qxs) != len(qys):
+            raise ValueError( 'x and y coordinate counts differ (%d and %d)' % (len(qxs),len(qys)) )
+
+        inside = bytearray( len(qxs) )
+
+        if len(self.xs) < 3:
+            for q, (x,y) in enumerate( zip( qxs, qys ) ):
+                inside[q] = self.isOnSegment( x, y )
+            return inside
+
+        xs = self.xs
+        ys = self.ys
+        minX, maxX, minY, maxY = self.minX, self.maxX, self.minY, self.maxY
+        bound = self.bound
+
+        lower = self.lower
+        lowerXs = self.lowerXs
+        lowerAxs, lowerAys, lowerDxs, lowerDys = self.lowerEdges
+
+        upper = self.upper
+        upperXs = self.upperXs
+        upperAxs, upperAys, upperDxs, upperDys = self.upperEdges
+        lastUpper = len(upper) - 1
+
+        orientSign = predicates.orientSign
+
+        for q, (x,y) in enumerate( zip( qxs, qys ) ):
+
+            if not (minX <= x <= maxX and minY <= y <= maxY):
+                continue
+
+            # On or above the lower edge (a left turn or straight)
+
+            k = bisect_left( lowerXs, x ) or 1
+
+            det = lowerDxs[k] * (y-lowerAys[k]) - lowerDys[k] * (x-lowerAxs[k])
+
+            if det < -bound:
+                continue
+            if det <= bound: # maybe too close to call
+                a = lower[k-1]
+                b = lower[k]
+                if orientSign( xs[a], ys[a], xs[b], ys[b], x, y ) < 0:
+                    continue
+
+            # On or below the upper edge (a right turn or straight)
+
+            k = min( bisect_right( upperXs, x ), lastUpper )
+
+            det = upperDxs[k] * (y-upperAys[k]) - upperDys[k] * (x-upperAxs[k])
+
+            if det > bound:
+                continue
+            if det >= -bound: # maybe too close to call
+                a = upper[k-1]
+                b = upper[k]
+                if orientSign( xs[a], ys[a], xs[b], ys[b], x, y ) > 0:
+                    continue
+
+            inside[q] = 1
+
+        return inside
+
+
+    # Determine whether (x,y) is on a hull of one or two vertices
+
+    def isOnSegment( self, x, y ):
+
+        xs = self.xs
+        ys = self.ys
+
+        if len(xs) == 0:
+            return False
+
+        if not (self.minX <= x <= self.maxX and self.minY <= y <= self.maxY):
+            return False
+
+        return predicates.orientSign( xs[0], ys[0], xs[-1], ys[-1], x, y ) == 0
+
+
+    # Return the diameter of the hull and the indices of two vertices
+    # that far apart
+    #
+    # For each edge, the vertex farthest from its line is advanced
+    # around the hull.  Every pair of vertices that are farthest apart
+    # is an edge end paired with such a vertex.
+
+    def diameter( self ):
+
+        xs = self.xs
+        ys = self.ys
+        n = self.checkNotEmpty()
+
+        if n < 3:
+            return math.hypot( xs[-1]-xs[0], ys[-1]-ys[0] ), 0, n-1
+
+        best = (-1.0, 0, 0)
+
+        j = 1
+        for i in range(n):
+
+            i1 = (i+1) % n
+            dx = xs[i1] - xs[i]
+            dy = ys[i1] - ys[i]
+
+            while True: # advance to the vertex farthest from edge i
+                j1 = (j+1) % n
+                if dx * (ys[j1]-ys[j]) - dy * (xs[j1]-xs[j]) <= 0:
+                    break
+                j = j1
+
+            for a in (i, i1):
+                dist2 = (xs[j]-xs[a])**2 + (ys[j]-ys[a])**2
+                if dist2 > best[0]:
+                    best = (dist2, a, j)
+
+        return math.sqrt( best[0] ), best[1], best[2]
+
+
+    # Return the width of the hull (the smallest distance between two
+    # parallel lines enclosing it), the index i of the edge from vertex
+    # i to vertex i+1 that one of those lines is on, and the index of
+    # the vertex on the other line
+    #
+    # The narrowest strip always has one line on an edge.
+
+    def width( self ):
+
+        xs = self.xs
+        ys = self.ys
+        n = self.checkNotEmpty()
+
+        if n < 3:
+            return 0.0, 0, 0
+
+        best = (float('inf'), 0, 0)
+
+        j = 1
+        for i in range(n):
+
+            i1 = (i+1) % n
+            dx = xs[i1] - xs[i]
+            dy = ys[i1] - ys[i]
+
+            while True: # advance to the vertex farthest from edge i
+                j1 = (j+1) % n
+                if dx * (ys[j1]-ys[j]) - dy * (xs[j1]-xs[j]) <= 0:
+                    break
+                j = j1
+
+            height = (dx * (ys[j]-ys[i]) - dy * (xs[j]-xs[i])) / math.hypot( dx, dy )
+
+            if height < best[0]:
+                best = (height, i, j)
+
+        return best
+
+
+    # Return the area and corners of the smallest rectangle enclosing
+    # the hull
+    #
+    # The corners are (x,y) pairs in CCW order.  The smallest rectangle
+    # always has one side on an edge, so for each edge the vertices
+    # farthest along the edge, farthest from it, and farthest back
+    # along it are advanced around the hull in that order.
+
+    def minAreaRectangle( self ):
+
+        xs = self.xs
+        ys = self.ys
+        n = self.checkNotEmpty()
+
+        if n < 3:
+            corners = [ (xs[0],ys[0]), (xs[-1],ys[-1]), (xs[-1],ys[-1]), (xs[0],ys[0]) ]
+            return 0.0, corners
+
+        best = None
+
+        k = j = m = 1
+        for i in range(n):
+
+            i1 = (i+1) % n
+            length = math.hypot( xs[i1]-xs[i], ys[i1]-ys[i] )
+            ux = (xs[i1]-xs[i]) / length # unit vector along the edge
+            uy = (ys[i1]-ys[i]) / length
+
+            if i == 0:
+                k = 1
+
+            while ux*xs[(k+1)%n] + uy*ys[(k+1)%n] > ux*xs[k] + uy*ys[k]: # farthest along
+                k = (k+1) % n
+
+            if i == 0:
+                j = k
+
+            while -uy*xs[(j+1)%n] + ux*ys[(j+1)%n] > -uy*xs[j] + ux*ys[j]: # farthest from
+                j = (j+1) % n
+
+            if i == 0:
+                m = j
+
+            while ux*xs[(m+1)%n] + uy*ys[(m+1)%n] < ux*xs[m] + uy*ys[m]: # farthest back
+                m = (m+1) % n
+
+            s0 = ux*xs[m] + uy*ys[m]
+            s1 = ux*xs[k] + uy*ys[k]
+            t0 = -uy*xs[i] + ux*ys[i]
+            t1 = -uy*xs[j] + ux*ys[j]
+
+            area = (s1-s0) * (t1-t0)
+
+            if best is None or area < best[0]:
+                best = (area, ux, uy, s0, s1, t0, t1)
+
+        area, ux, uy, s0, s1, t0, t1 = best
+
+        corners = [ (s*ux - t*uy, s*uy + t*ux) for s,t in ((s0,t0), (s1,t0), (s1,t1), (s0,t1)) ]
+
+        return area, corners
+
+
+    def checkNotEmpty( self ):
+
+        if len(self.xs) == 0:
+            raise ValueError( 'the hull has no vertices' )
+
+        return len(self.xs)
+
+
+
+# Return the start and vector of the edge ending at each vertex of a
+# chain, as four arrays (the entries for the first vertex are unused)
+
+def chainEdges( xs, ys, chain ):
+
+    axs = array( 'd', [0.0] ) * len(chain)
+    ays = array( 'd', [0.0] ) * len(chain)
+    dxs = array( 'd', [0.0] ) * len(chain)
+    dys = array( 'd', [0.0] ) * len(chain)
+
+    for k in range( 1, len(chain) ):
+        a = chain[k-1]
+        b = chain[k]
+        axs[k] = xs[a]
+        ays[k] = ys[a]
+        dxs[k] = xs[b] - xs[a]
+        dys[k] = ys[b] - ys[a]
+
+    return axs, ays, dxs, dys
+
+
+
+# Build the hull of some points and return a HullQuery on it
+
+def hullQuery( xs, ys ):
+
+    return HullQuery( *arrayhull.hullCoords( xs, ys ) )
+
+
+
+def readPointsOrExit( filename ):
+
+    try:
+        xs, ys, isSorted = pointio.openPoints( filename )
+    except ValueError as e:
+        print( '%s: %s' % (filename, e) )
+        sys.exit(1)
+
+    return xs, ys
+
+
+
+def main():
+
+    if len(sys.argv) not in (2,3,4):
+        print( 'Usage: %s file_of_points [query_points [outfile]]' % sys.argv[0] )
+        sys.exit(1)
+
+    xs, ys = readPointsOrExit( sys.argv[1] )
+
+    if len(xs) == 0:
+        print( '%s: no points' % sys.argv[1] )
+        sys.exit(1)
+
+    query = hullQuery( xs, ys )
+
+    diameter, a, b = query.diameter()
+    width, i, j = query.width()
+    area, corners = query.minAreaRectangle()
+
+    print( 'hull vertices: %d' % len(query) )
+    print( 'diameter: %r from (%r, %r) to (%r, %r)' % (diameter, query.xs[a], query.ys[a], query.xs[b], query.ys[b]) )
+    print( 'width: %r' % width )
+    print( 'min-area rectangle: area %r, corners %s' % (area, ' '.join( '(%r, %r)' % c for c in corners )) )
+
+    if len(sys.argv) >= 3:
+
+        qxs, qys = readPointsOrExit( sys.argv[2] )
+
+        inside = query.containsBatch( qxs, qys )
+
+        f = sys.stdout if len(sys.argv) == 3 else open( sys.argv[3], 'w' )
+
+        for flag in inside:
+            f.write( '%d\n' % flag )
+
+        if f is not sys.stdout:
+            f.close()
+
+
+
+if __name__ == '__main__':
+    main()
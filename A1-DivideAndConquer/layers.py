@@ -0,0 +1,371 @@
+# Convex layers (onion peeling)
+#
+# Usage: python layers.py file_of_points [outfile]
+#
+#   Writes the layer of each point, one per line in the order of the
+#   file: 0 for the vertices of the hull, 1 for the vertices of the
+#   hull of the remaining points, and so on.
+#
+# The layers are peeled with a hull tree instead of by building the
+# hull of the remaining points again for each layer.  The points are
+# sorted as for buildHull() and cut into small blocks, and a binary
+# tree is built over the blocks, like the recursion of buildHull().
+# Each tree node holds the lower and upper hull chains of the points
+# still present in its range, as lists of sorted positions.  A node's
+# chains are made by merging its children's chains, which are
+# separated by a vertical line: a bridge is found by walking its ends
+# along the two chains, as in buildHull()'s merge, and the parts of the
+# chains outside it are copied as list slices.  After a removal, the
+# walk starts from the node's last bridge, which has usually moved
+# only a few vertices.  The root's chains are
+# the current layer.
+#
+# When a layer is removed, only the nodes whose chains held one of its
+# points are rebuilt, bottom-up.  A point that is not on a node's chain
+# is on no chain above it, so the search up from each removed point
+# stops early.  Building the tree takes O(n log n) time, and each
+# removed point costs O(log n) rebuilt nodes, each of which walks past
+# few vertices for typical inputs, so peeling all of the layers is
+# near O(n log n) in total.
+#
+# After peeling, each point's CW and CCW links in the PointStore join
+# it to its neighbours on its layer, so store.hullFrom(i) lists the
+# layer of point i, as after buildHull().  Repeated points are given
+# the layer of their first copy and are not linked.
+
+
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+import arrayhull, predicates, pointio
+
+
+blockSize = 8 # points per leaf of the hull tree
+
+
+
+# Return the lower or upper hull chain of some sorted positions
+#
+# 'positions' index 'order', increase, and have no repeated points.
+# 'side' is 1 for the lower chain (every three consecutive points make
+# a left turn) or -1 for the upper chain.  Points on a chain edge are
+# not on the chain.
+
+def hullChain( xs, ys, order, positions, side, bound ):
+
+    chain = []
+
+    for pos in positions:
+
+        i = order[pos]
+        px = xs[i]
+        py = ys[i]
+
+        while len(chain) >= 2:
+
+            a = order[chain[-2]]
+            b = order[chain[-1]]
+
+            det = (xs[a]-px) * (ys[b]-py) - (xs[b]-px) * (ys[a]-py)
+
+            if -bound <= det <= bound: # maybe too close to call
+                det = predicates.orientSign( xs[a], ys[a], xs[b], ys[b], px, py )
+
+            if det * side > 0:
+                break
+
+            chain.pop()
+
+        chain.append( pos )
+
+    return chain
+
+
+
+# Merge two lower or upper hull chains that are separated by a
+# vertical line
+#
+# 'left' and 'right' are chains from hullChain() with every position
+# in 'left' before every position in 'right'.  The walk for the bridge
+# between them starts from 'start', a guess of the bridge as (position
+# in left, position in right), such as the bridge before some points
+# were removed.  Each end steps outward while the next vertex out is
+# not strictly on the outer side of the bridge, and inward while the
+# next vertex in is strictly on its inner side, until neither end
+# moves.  Returns the merged chain and its bridge.
+
+def mergeChains( xs, ys, order, left, right, side, bound, start ):
+
+    if len(left) == 0 or len(right) == 0:
+        return left + right, start
+
+    orientSign = predicates.orientSign
+
+    i = min( max( bisect_right( left, start[0] ) - 1, 0 ), len(left)-1 )
+    j = min( bisect_left( right, start[1] ), len(right)-1 )
+
+    # The turn tests are written out in full, as in arrayhull's
+    # mergeHulls(), since this is the inner loop of the peeling
+
+    a = order[left[i]]
+    b = order[right[j]]
+
+    moved = True
+    while moved:
+
+        moved = False
+
+        while i > 0: # step the left end out
+
+            p = order[left[i-1]]
+
+            det = (xs[p]-xs[b]) * (ys[a]-ys[b]) - (xs[a]-xs[b]) * (ys[p]-ys[b])
+            if -bound <= det <= bound: # maybe too close to call
+                det = orientSign( xs[p], ys[p], xs[a], ys[a], xs[b], ys[b] )
+
+            if det * side > 0:
+                break
+
+            i -= 1
+            a = p
+            moved = True
+
+        while i < len(left)-1: # step the left end in
+
+            p = order[left[i+1]]
+
+            det = (xs[a]-xs[p]) * (ys[b]-ys[p]) - (xs[b]-xs[p]) * (ys[a]-ys[p])
+            if -bound <= det <= bound: # maybe too close to call
+                det = orientSign( xs[a], ys[a], xs[b], ys[b], xs[p], ys[p] )
+
+            if det * side >= 0:
+                break
+
+            i += 1
+            a = p
+            moved = True
+
+        while j < len(right)-1: # step the right end out
+
+            p = order[right[j+1]]
+
+            det = (xs[a]-xs[p]) * (ys[b]-ys[p]) - (xs[b]-xs[p]) * (ys[a]-ys[p])
+            if -bound <= det <= bound: # maybe too close to call
+                det = orientSign( xs[a], ys[a], xs[b], ys[b], xs[p], ys[p] )
+
+            if det * side > 0:
+                break
+
+            j += 1
+            b = p
+            moved = True
+
+        while j > 0: # step the right end in
+
+            p = order[right[j-1]]
+
+            det = (xs[a]-xs[p]) * (ys[b]-ys[p]) - (xs[b]-xs[p]) * (ys[a]-ys[p])
+            if -bound <= det <= bound: # maybe too close to call
+                det = orientSign( xs[a], ys[a], xs[b], ys[b], xs[p], ys[p] )
+
+            if det * side >= 0:
+                break
+
+            j -= 1
+            b = p
+            moved = True
+
+    return left[:i+1] + right[j:], (left[i], right[j])
+
+
+
+# HullTree
+#
+# The hull tree of a PointStore.  Nodes are numbered as in a binary
+# heap: node 1 is the root and node k has children 2k and 2k+1.  The
+# leaves are nodes numLeaves ... 2*numLeaves-1, each holding the
+# positions blockSize*j ... blockSize*(j+1)-1 of 'order'.
+
+class HullTree(object):
+
+    def __init__( self, store, order ):
+
+        self.store = store
+        self.order = order
+
+        self.bound = store.turnBound()
+
+        numBlocks = max( 1, (len(order) + blockSize-1) // blockSize )
+
+        self.numLeaves = 1
+        while self.numLeaves < numBlocks:
+            self.numLeaves *= 2
+
+        self.isPresent = bytearray( [1] ) * len(order) # for each position
+
+        self.lower = [ [] for k in range(2*self.numLeaves) ] # chains of each node
+        self.upper = [ [] for k in range(2*self.numLeaves) ]
+
+        self.lowerBridges = [ None ] * self.numLeaves # last bridge of each inner node
+        self.upperBridges = [ None ] * self.numLeaves
+
+        for k in range( 2*self.numLeaves-1, 0, -1 ):
+            self.rebuildNode( k, self.lower, self.lowerBridges, 1 )
+            self.rebuildNode( k, self.upper, self.upperBridges, -1 )
+
+
+    def __len__(self):
+        return len(self.order)
+
+
+    def __repr__(self):
+        return 'HullTree(%d points, %d leaves)' % (len(self.order), self.numLeaves)
+
+
+    # Make one chain of a node from its points or its children
+    #
+    # 'chains' and 'bridges' are self.lower and self.lowerBridges (side
+    # 1) or self.upper and self.upperBridges (side -1).  The walk for a
+    # node's bridge starts at its last bridge, or the first time at the
+    # inner ends of its children's chains.
+
+    def rebuildNode( self, k, chains, bridges, side ):
+
+        xs = self.store.xs
+        ys = self.store.ys
+
+        if k >= self.numLeaves:
+            start = (k - self.numLeaves) * blockSize
+            positions = [ pos for pos in range( start, min( start+blockSize, len(self.order) ) ) if self.isPresent[pos] ]
+            chains[k] = hullChain( xs, ys, self.order, positions, side, self.bound )
+        else:
+            start = bridges[k] or (len(self.order), -1)
+            chains[k], bridges[k] = mergeChains( xs, ys, self.order, chains[2*k], chains[2*k+1], side, self.bound, start )
+
+
+    # Return the positions of the current layer's vertices in CCW order
+    # from the leftmost one
+
+    def layer( self ):
+
+        lower = self.lower[1]
+        upper = self.upper[1]
+
+        return lower + upper[-2:0:-1]
+
+
+    # Remove some points and rebuild the chains that held them
+    #
+    # Lower and upper chains are rebuilt separately, since a point is
+    # often on only one of them.
+
+    def remove( self, positions ):
+
+        for pos in positions:
+            self.isPresent[pos] = 0
+
+        for chains, bridges, side in ( (self.lower, self.lowerBridges, 1), (self.upper, self.upperBridges, -1) ):
+
+            dirty = set()
+
+            for pos in positions:
+
+                k = self.numLeaves + pos // blockSize
+
+                while k >= 1 and isInChain( chains[k], pos ):
+                    dirty.add( k )
+                    k //= 2
+
+            for k in sorted( dirty, reverse=True ): # children before parents
+                self.rebuildNode( k, chains, bridges, side )
+
+
+
+# Determine whether a position is in a chain (chains are sorted)
+
+def isInChain( chain, pos ):
+
+    i = bisect_left( chain, pos )
+
+    return i < len(chain) and chain[i] == pos
+
+
+
+# Find the convex layers of the points in a PointStore
+#
+# Returns an array('i') giving the layer of each point, and links each
+# point to its neighbours on its layer.
+
+def convexLayers( store ):
+
+    order = arrayhull.sortedOrder( store )
+    unique = arrayhull.dropDuplicates( store, order )
+
+    layers = array( 'i', [-1] ) * len(store)
+
+    tree = HullTree( store, unique )
+
+    cw  = store.cw
+    ccw = store.ccw
+
+    numLayers = 0
+    numLeft = len(unique)
+
+    while numLeft > 0:
+
+        positions = tree.layer()
+        verts = [ unique[pos] for pos in positions ]
+
+        for j, i in enumerate( verts ):
+            layers[i] = numLayers
+            if len(verts) > 1:
+                ccw[i] = verts[ (j+1) % len(verts) ]
+                cw[i]  = verts[ j-1 ]
+
+        tree.remove( positions )
+
+        numLayers += 1
+        numLeft -= len(positions)
+
+    # Give each repeated point the layer of its first copy
+
+    xs = store.xs
+    ys = store.ys
+
+    for j in range( 1, len(order) ):
+        i = order[j]
+        prev = order[j-1]
+        if layers[i] < 0 and xs[i] == xs[prev] and ys[i] == ys[prev]:
+            layers[i] = layers[prev]
+
+    return layers
+
+
+
+def main():
+
+    if len(sys.argv) not in (2,3):
+        print( 'Usage: %s file_of_points [outfile]' % sys.argv[0] )
+        sys.exit(1)
+
+    try:
+        xs, ys, isSorted = pointio.openPoints( sys.argv[1] )
+    except ValueError as e:
+        print( '%s: %s' % (sys.argv[1], e) )
+        sys.exit(1)
+
+    layers = convexLayers( arrayhull.PointStore( xs, ys ) )
+
+    f = sys.stdout if len(sys.argv) == 2 else open( sys.argv[2], 'w' )
+
+    for layer in layers:
+        f.write( '%d\n' % layer )
+
+    if f is not sys.stdout:
+        f.close()
+
+
+
+if __name__ == '__main__':
+    main()
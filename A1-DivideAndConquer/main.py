@@ -1,30 +1,63 @@
 # Convex hull
 #
-# Usage: python main.py [-d] [-np] file_of_points
+# Usage: python main.py [-d] [-np] [-o outfile] [-j workers] [-c chunk] [-os] [-p report] file_of_points
 #
-#   -d sets the 'discardPoints' flag
+# The file of points can be a text file or a binary points file made
+# by pointio.py.
+#
+#   -d sets the 'discardPoints' flag: points strictly inside the
+#      octagon of extreme points are discarded before the hull is built
 #   -np removes pauses
+#   -o runs headless: no window is opened and the hull vertices are
+#      written in CCW order to 'outfile' ('-' for stdout)
+#   -j builds a headless hull with this many worker processes
+#   -c builds a headless hull by streaming the file in chunks of this
+#      many points, for files larger than memory
+#   -os builds a headless hull with the output-sensitive algorithm in
+#      chan.py, which is O(n log h) for h hull vertices (with no sort)
+#   -p builds a headless hull with arrayhull.py's buildHull() under the
+#      profiler in hullprofile.py, and writes its report ('.json' for
+#      JSON, else folded stacks)
+#
+# -j, -c and -os run headless, like -o, and write to stdout if -o is
+# not given.  Only one of -j, -c, -os and -p can be given.
 #
 # You can press ESC in the window to exit.
 #
 # You'll need Python 3 and must install these packages:
 #
 #   PyOpenGL, GLFW
+#
+# (These are not needed with -o, -j, -c, -os or -p, or when this file is imported as a module.)
+
+
+import sys, os, math, time
+from array import array
+
+import arrayhull, pointio, pointindex, predicates
 
 
-import sys, os, math
+# Headless runs never import OpenGL or GLFW and never call display()
 
-try: # PyOpenGL
-  from OpenGL.GL import *
-except:
-  print( 'Error: PyOpenGL has not been installed.' )
-  sys.exit(0)
+headlessFlags = [ '-o', '-j', '-c', '-os', '-p' ]
 
-try: # GLFW
-  import glfw
-except:
-  print( 'Error: GLFW has not been installed.' )
-  sys.exit(0)
+headless = __name__ != '__main__' or any( flag in sys.argv[1:] for flag in headlessFlags )
+
+if not headless:
+
+  try: # PyOpenGL
+    from OpenGL.GL import *
+  except:
+    print( 'Error: PyOpenGL has not been installed.' )
+    sys.exit(0)
+
+  try: # GLFW
+    import glfw
+  except:
+    print( 'Error: GLFW has not been installed.' )
+    sys.exit(0)
+
+  import ctypes
 
 
 
@@ -47,6 +80,25 @@ thetas = [ i/float(numAngles)*2*3.14159 for i in range(numAngles) ] # used for c
 
 allPoints = [] # list of points
 
+pointIndex = None # grid index of allPoints, for picking with the mouse and highlighting
+pressPos   = None # window position of the last mouse press
+
+# Vertex buffers (see setupBuffers())
+
+circleBuffer = None # point outlines, numAngles vertices per point
+circleFirsts = None # first vertex of each point's outline
+circleCounts = None # numAngles for each point
+
+arrowLineBuffer   = None # arrow shafts, 4 vertices per point
+arrowHeadBuffer   = None # arrow heads, 6 vertices per point
+arrowLineColours  = None # colours of the shaft and head vertices
+arrowHeadColours  = None
+
+hullVersion      = 0    # incremented when hull pointers change
+drawnHullVersion = None # hullVersion of the arrows in the buffers
+changedStart     = None # range of allPoints whose pointers changed
+changedEnd       = None
+
 lastKey = None  # last key pressed
 
 discardPoints = False
@@ -59,7 +111,11 @@ addPauses = True
 # the point is not on any hull.
 #
 # For debugging, you can set the 'highlight' flag of a point.  This
-# will cause the point to be highlighted when it's drawn.
+# will cause the point to be highlighted when it's drawn.  The flag of
+# a point in the viewer's grid index is kept by the index (see
+# pointindex.GridIndex.setHighlight()), so that drawing the
+# highlighted points does not look at every point.  A point in no grid
+# keeps its own flag.
 
 class Point(object):
 
@@ -71,47 +127,39 @@ class Point(object):
       self.ccwPoint = None # point CCW of this on hull
       self.cwPoint  = None # point CW of this on hull
 
-      self.highlight = False # to cause drawing to highlight this point
+      self.index = None # position in allPoints, for drawing
+      self.grid  = None # GridIndex holding this point's 'highlight' flag
+
+      self.ownHighlight = False # 'highlight' flag while in no grid
 
 
     def __repr__(self):
       return 'pt(%g,%g)' % (self.x, self.y)
 
 
-    def drawPoint(self):
-
-      # Highlight with yellow fill
-      
-      if self.highlight:
-          glColor3f( 0.9, 0.9, 0.4 )
-          glBegin( GL_POLYGON )
-          for theta in thetas:
-              glVertex2f( self.x+r*math.cos(theta), self.y+r*math.sin(theta) )
-          glEnd()
-
-      # Outline the point
-      
-      glColor3f( 0, 0, 0 )
-      glBegin( GL_LINE_LOOP )
-      for theta in thetas:
-          glVertex2f( self.x+r*math.cos(theta), self.y+r*math.sin(theta) )
-      glEnd()
-
-      # Draw edges to next CCW and CW points.
-
-      if self.ccwPoint:
-        glColor3f( 0, 0, 1 )
-        drawArrow( self.x, self.y, self.ccwPoint.x, self.ccwPoint.y )
+    @property
+    def highlight(self): # to cause drawing to highlight this point
+      if self.grid is None:
+        return self.ownHighlight
+      return self.grid.isHighlighted( self.index )
 
-      if self.ccwPoint:
-        glColor3f( 1, 0, 0 )
-        drawArrow( self.x, self.y, self.cwPoint.x, self.cwPoint.y )
+    @highlight.setter
+    def highlight( self, value ):
+      if self.grid is None:
+        self.ownHighlight = value
+      else:
+        self.grid.setHighlight( self.index, value )
 
 
 
-# Draw an arrow between two points, offset a bit to the right
+# Return the vertices of an arrow between two points, offset a bit to
+# the right
+#
+# Returns the tail and head of the arrow's shaft (a and b) and the
+# outside left and right corners of its head (c and d), as
+# xa,ya, xb,yb, xc,yc, xd,yd.
 
-def drawArrow( x0,y0, x1,y1 ):
+def arrowVertices( x0,y0, x1,y1 ):
 
     d = math.sqrt( (x1-x0)*(x1-x0) + (y1-y0)*(y1-y0) )
 
@@ -133,35 +181,33 @@ def drawArrow( x0,y0, x1,y1 ):
     xd = xb - 2*r*vx - 0.5*r*vpx # arrow outside right
     yd = yb - 2*r*vy - 0.5*r*vpy
 
-    glBegin( GL_LINES )
-    glVertex2f( xa, ya )
-    glVertex2f( xb, yb )
-    glEnd()
-
-    glBegin( GL_POLYGON )
-    glVertex2f( xb, yb )
-    glVertex2f( xc, yc )
-    glVertex2f( xd, yd )
-    glEnd()
+    return xa,ya, xb,yb, xc,yc, xd,yd
       
       
 
 # Determine whether three points make a left or right turn
+#
+# This is predicates.orient() written out for Points: the sign is
+# exact even for nearly collinear points.
 
-LEFT_TURN  = 1
-RIGHT_TURN = 2
-COLLINEAR  = 3
+LEFT_TURN  = predicates.LEFT_TURN
+RIGHT_TURN = predicates.RIGHT_TURN
+COLLINEAR  = predicates.COLLINEAR
 
 def turn( a, b, c ):
 
-    det = (a.x-c.x) * (b.y-c.y) - (b.x-c.x) * (a.y-c.y)
+    detLeft  = (a.x-c.x) * (b.y-c.y)
+    detRight = (b.x-c.x) * (a.y-c.y)
 
-    if det > 0:
+    det = detLeft - detRight
+    bound = predicates.errBound * (abs(detLeft) + abs(detRight))
+
+    if det > bound:
         return LEFT_TURN
-    elif det < 0:
+    elif det < -bound:
         return RIGHT_TURN
     else:
-        return COLLINEAR
+        return predicates.exactOrient( a.x, a.y, b.x, b.y, c.x, c.y )
 
 
 # Build a convex hull from a set of point
@@ -240,9 +286,10 @@ def buildHull( points ):
         # This same highlighting can also be done immediately after you have merged to hulls
         # ... again, to see that the merged hull looks right.
 
-        for p in points:
-            p.highlight = True
-        display(wait=addPauses)
+        if not headless:
+            for p in points:
+                p.highlight = True
+            display(wait=addPauses)
 
         #Walk Downward
 
@@ -347,17 +394,39 @@ def buildHull( points ):
         # Pause to see the result, then remove the highlighting from
         # the points that you previously highlighted:
 
-        display(wait=addPauses)
-        for p in points:
-            p.highlight = False
+        if not headless:
+            markHullChanged( points )
+            display(wait=addPauses)
+            for p in points:
+                p.highlight = False
 
     # At the very end of buildHull(), you should display the result
     # after every merge, as shown below.  This call to display() does
     # not pause.
     
-    display()
+    if not headless:
+        markHullChanged( points )
+        display()
+
+
+
+# Write hull vertices, one 'x y' line per vertex, to a file or to
+# stdout ('-')
+
+def writeHull( xs, ys, outFile ):
+
+    if outFile == '-':
+        f = sys.stdout
+    else:
+        f = open( outFile, 'w' )
+
+    for x,y in zip( xs, ys ):
+        f.write( '%r %r\n' % (x,y) )
+
+    if f is not sys.stdout:
+        f.close()
+
 
-  
 
 windowLeft   = None
 windowRight  = None
@@ -402,8 +471,7 @@ def display( wait=False ):
 
     # Draw points and hull
 
-    for p in allPoints:
-        p.drawPoint()
+    drawBuffers()
 
     # Show window
 
@@ -429,6 +497,178 @@ def display( wait=False ):
 
     
 
+# Record that the hull pointers of some points have changed
+#
+# 'points' is a run of allPoints in sorted order.  Their arrows are
+# uploaded again on the next display().
+
+def markHullChanged( points ):
+
+    global hullVersion, changedStart, changedEnd
+
+    if len(points) == 0:
+        return
+
+    start = points[0].index
+    end   = points[-1].index + 1
+
+    if changedStart is None:
+        changedStart = start
+        changedEnd   = end
+    else:
+        changedStart = min( changedStart, start )
+        changedEnd   = max( changedEnd, end )
+
+    hullVersion += 1
+
+
+
+# Upload the point outlines to vertex buffers
+#
+# Every point's outline is uploaded once, as numAngles vertices made
+# from a precomputed table of offsets, and is drawn from then on with
+# one glMultiDrawArrays() call.  Each point also gets a fixed slot in
+# the arrow buffers for its CCW (blue) and CW (red) arrows; a point
+# that is not on a hull has a slot of zero-size arrows, which draw
+# nothing.  Only the slots of points whose pointers have changed are
+# uploaded again (see updateArrowBuffers()).
+
+def setupBuffers():
+
+    global circleBuffer, circleFirsts, circleCounts
+    global arrowLineBuffer, arrowHeadBuffer, arrowLineColours, arrowHeadColours
+    global drawnHullVersion, changedStart, changedEnd
+
+    n = len(allPoints)
+
+    xs = array( 'f', (p.x for p in allPoints) )
+    ys = array( 'f', (p.y for p in allPoints) )
+
+    # Outlines: vertex k of point i is at 2*(i*numAngles+k)
+
+    verts = array( 'f', [0] ) * (2*numAngles*n)
+
+    for k, theta in enumerate( thetas ):
+        verts[2*k   :: 2*numAngles] = array( 'f', map( (r*math.cos(theta)).__add__, xs ) )
+        verts[2*k+1 :: 2*numAngles] = array( 'f', map( (r*math.sin(theta)).__add__, ys ) )
+
+    circleBuffer = uploadBuffer( verts, GL_STATIC_DRAW )
+    circleFirsts = (GLint * n)( *range( 0, numAngles*n, numAngles ) )
+    circleCounts = (GLsizei * n)( *([numAngles] * n) )
+
+    # Arrows: empty until the hull is built
+
+    arrowLineBuffer = uploadBuffer( array( 'f', [0] ) * (2*4*n), GL_DYNAMIC_DRAW )
+    arrowHeadBuffer = uploadBuffer( array( 'f', [0] ) * (2*6*n), GL_DYNAMIC_DRAW )
+
+    arrowLineColours = uploadBuffer( array( 'f', [0,0,1, 0,0,1, 1,0,0, 1,0,0] ) * n, GL_STATIC_DRAW )
+    arrowHeadColours = uploadBuffer( array( 'f', [0,0,1]*3 + [1,0,0]*3 ) * n, GL_STATIC_DRAW )
+
+    drawnHullVersion = hullVersion
+    changedStart = None
+    changedEnd   = None
+
+
+
+# Make a vertex buffer holding an array('f')
+
+def uploadBuffer( data, usage ):
+
+    buf = glGenBuffers( 1 )
+
+    glBindBuffer( GL_ARRAY_BUFFER, buf )
+    glBufferData( GL_ARRAY_BUFFER, 4*len(data), (GLfloat * len(data)).from_buffer( data ), usage )
+    glBindBuffer( GL_ARRAY_BUFFER, 0 )
+
+    return buf
+
+
+
+# Upload the arrows of the points whose hull pointers have changed
+
+def updateArrowBuffers():
+
+    global drawnHullVersion, changedStart, changedEnd
+
+    if changedStart is not None:
+
+        lines = array( 'f' )
+        heads = array( 'f' )
+
+        for p in allPoints[changedStart:changedEnd]:
+
+            if p.ccwPoint and p.cwPoint:
+                ccwArrow = arrowVertices( p.x, p.y, p.ccwPoint.x, p.ccwPoint.y )
+                cwArrow  = arrowVertices( p.x, p.y, p.cwPoint.x, p.cwPoint.y )
+            else:
+                ccwArrow = cwArrow = (p.x,p.y) * 4
+
+            lines.extend( ccwArrow[0:4] )
+            lines.extend( cwArrow[0:4] )
+            heads.extend( ccwArrow[2:8] )
+            heads.extend( cwArrow[2:8] )
+
+        glBindBuffer( GL_ARRAY_BUFFER, arrowLineBuffer )
+        glBufferSubData( GL_ARRAY_BUFFER, 4*8*changedStart, 4*len(lines), (GLfloat * len(lines)).from_buffer( lines ) )
+
+        glBindBuffer( GL_ARRAY_BUFFER, arrowHeadBuffer )
+        glBufferSubData( GL_ARRAY_BUFFER, 4*12*changedStart, 4*len(heads), (GLfloat * len(heads)).from_buffer( heads ) )
+
+        glBindBuffer( GL_ARRAY_BUFFER, 0 )
+
+    drawnHullVersion = hullVersion
+    changedStart = None
+    changedEnd   = None
+
+
+
+# Draw the points and the hull from the vertex buffers
+
+def drawBuffers():
+
+    if drawnHullVersion != hullVersion:
+        updateArrowBuffers()
+
+    glEnableClientState( GL_VERTEX_ARRAY )
+
+    # Highlight with yellow fill
+
+    highlighted = [ i*numAngles for i in pointIndex.highlighted ]
+
+    glBindBuffer( GL_ARRAY_BUFFER, circleBuffer )
+    glVertexPointer( 2, GL_FLOAT, 0, None )
+
+    if highlighted:
+        glColor3f( 0.9, 0.9, 0.4 )
+        glMultiDrawArrays( GL_POLYGON, (GLint * len(highlighted))( *highlighted ), circleCounts, len(highlighted) )
+
+    # Outline the points
+
+    glColor3f( 0, 0, 0 )
+    glMultiDrawArrays( GL_LINE_LOOP, circleFirsts, circleCounts, len(allPoints) )
+
+    # Draw edges to next CCW (blue) and CW (red) points
+
+    glEnableClientState( GL_COLOR_ARRAY )
+
+    glBindBuffer( GL_ARRAY_BUFFER, arrowLineColours )
+    glColorPointer( 3, GL_FLOAT, 0, None )
+    glBindBuffer( GL_ARRAY_BUFFER, arrowLineBuffer )
+    glVertexPointer( 2, GL_FLOAT, 0, None )
+    glDrawArrays( GL_LINES, 0, 4*len(allPoints) )
+
+    glBindBuffer( GL_ARRAY_BUFFER, arrowHeadColours )
+    glColorPointer( 3, GL_FLOAT, 0, None )
+    glBindBuffer( GL_ARRAY_BUFFER, arrowHeadBuffer )
+    glVertexPointer( 2, GL_FLOAT, 0, None )
+    glDrawArrays( GL_TRIANGLES, 0, 6*len(allPoints) )
+
+    glDisableClientState( GL_COLOR_ARRAY )
+    glDisableClientState( GL_VERTEX_ARRAY )
+    glBindBuffer( GL_ARRAY_BUFFER, 0 )
+
+
+
 # Handle keyboard input
 
 def keyCallback( window, key, scancode, action, mods ):
@@ -453,31 +693,64 @@ def windowReshapeCallback( window, newWidth, newHeight ):
 
 
 # Handle mouse click/release
+#
+# A click toggles the highlight of the point under the mouse and
+# prints it.  Dragging out a rectangle toggles the highlight of every
+# point in it.
 
 def mouseButtonCallback( window, btn, action, keyModifiers ):
 
+    global pressPos
+
     if action == glfw.PRESS:
 
-        # Find point under mouse
+        pressPos = glfw.get_cursor_pos( window )
+
+    elif action == glfw.RELEASE and pressPos is not None:
+
+        x0,y0 = pressPos # mouse positions
+        x1,y1 = glfw.get_cursor_pos( window )
+
+        pressPos = None
+
+        if abs(x1-x0) <= 3 and abs(y1-y0) <= 3:
+
+            # Find point under mouse
+
+            wx,wy = windowCoords( x1, y1 )
+
+            i = pointIndex.nearest( wx, wy, r )
+
+            # print point and toggle its highlight
+
+            if i is not None:
+                pointIndex.setHighlight( i, not pointIndex.isHighlighted( i ) )
+                print( allPoints[i] )
+
+        else:
+
+            # Find points in the rectangle and toggle their highlights
+
+            wx0,wy0 = windowCoords( x0, y0 )
+            wx1,wy1 = windowCoords( x1, y1 )
 
-        x,y = glfw.get_cursor_pos( window ) # mouse position
+            selected = pointIndex.inRectangle( wx0, wy0, wx1, wy1 )
 
-        wx = (x-0)/float(windowWidth)  * (windowRight-windowLeft) + windowLeft
-        wy = (windowHeight-y)/float(windowHeight) * (windowTop-windowBottom) + windowBottom
+            for i in selected:
+                pointIndex.setHighlight( i, not pointIndex.isHighlighted( i ) )
 
-        minDist = windowRight-windowLeft
-        minPoint = None
-        for p in allPoints:
-            dist = math.sqrt( (p.x-wx)*(p.x-wx) + (p.y-wy)*(p.y-wy) )
-            if dist < r and dist < minDist:
-                minDist = dist
-                minPoint = p
+            print( '%d points selected' % len(selected) )
 
-        # print point and toggle its highlight
 
-        if minPoint:
-            minPoint.highlight = not minPoint.highlight
-            print( minPoint )
+
+# Convert a mouse position in the window to point coordinates
+
+def windowCoords( x, y ):
+
+    wx = (x-0)/float(windowWidth)  * (windowRight-windowLeft) + windowLeft
+    wy = (windowHeight-y)/float(windowHeight) * (windowTop-windowBottom) + windowBottom
+
+    return wx, wy
 
         
     
@@ -485,7 +758,7 @@ def mouseButtonCallback( window, btn, action, keyModifiers ):
 
 def main():
 
-    global window, allPoints, minX, maxX, minY, maxY, r, discardPoints, addPauses
+    global window, allPoints, minX, maxX, minY, maxY, r, discardPoints, addPauses, pointIndex
     
     # Check command-line args
 
@@ -493,14 +766,64 @@ def main():
         print( 'Usage: %s filename' % sys.argv[0] )
         sys.exit(1)
 
+    outFile = None
+    numWorkers = 1
+    chunkPoints = None
+    reportFile = None
+    outputSensitive = False
+
+    builders = [] # which of -j, -c, -os and -p were given
+
     args = sys.argv[1:]
     while len(args) > 1:
         if args[0] == '-d':
             discardPoints = True
         elif args[0] == '-np':
             addPauses = False
+        elif args[0] == '-o':
+            outFile = args[1]
+            args = args[1:]
+        elif args[0] == '-j':
+            numWorkers = int( args[1] )
+            builders.append( args[0] )
+            args = args[1:]
+        elif args[0] == '-c':
+            chunkPoints = int( args[1] )
+            builders.append( args[0] )
+            args = args[1:]
+        elif args[0] == '-os':
+            outputSensitive = True
+            builders.append( args[0] )
+        elif args[0] == '-p':
+            reportFile = args[1]
+            builders.append( args[0] )
+            args = args[1:]
         args = args[1:]
 
+    if len(builders) > 1:
+        print( 'Usage: %s: only one of -j, -c, -os and -p can be given, not %s' % (sys.argv[0], ' and '.join(builders)) )
+        sys.exit(1)
+
+    if builders and outFile is None:
+        outFile = '-' # (headless, since a builder flag was given)
+
+    if reportFile is not None:
+        import hullprofile
+        hullprofile.profileFile( readPointsOrExit, args[0], reportFile )
+        return
+
+    if chunkPoints is not None and chunkPoints < 1:
+        print( 'Usage: %s -c chunk: chunk must be at least 1 point, not %d' % (sys.argv[0], chunkPoints) )
+        sys.exit(1)
+
+    if outFile is not None and chunkPoints is not None:
+        runStreaming( args[0], outFile, chunkPoints )
+        return
+
+    if outFile is not None:
+        runHeadless( args[0], outFile, numWorkers, outputSensitive )
+        return
+
     # Set up window
   
     if not glfw.init():
@@ -522,8 +845,29 @@ def main():
 
     # Read the points
 
-    with open( args[0], 'rb' ) as f:
-      allPoints = [ Point( line.split(b' ') ) for line in f.readlines() ]
+    xs, ys, isSorted = readPointsOrExit( args[0] )
+
+    # Sort by increasing x.  For equal x, sort by increasing y.
+
+    if isSorted:
+        order = range( len(xs) )
+    else:
+        order = arrayhull.sortedOrder( arrayhull.PointStore( xs, ys ) )
+
+    allPoints = [ Point( (xs[i],ys[i]) ) for i in order ]
+
+    for i, p in enumerate( allPoints ):
+        p.index = i
+
+    # Only points that might be on the hull are given to buildHull()
+
+    if discardPoints:
+        isKept = bytearray( len(xs) )
+        for i in discardInteriorPoints( xs, ys ):
+            isKept[i] = 1
+        hullPoints = [ p for i,p in zip( order, allPoints ) if isKept[i] ]
+    else:
+        hullPoints = allPoints
 
     # Get bounding box of points
 
@@ -539,24 +883,123 @@ def main():
     else:
         r *= maxY-minY
 
-    # Sort by increasing x.  For equal x, sort by increasing y.
-    
-    allPoints.sort( key=lambda p: (p.x,p.y) )
+    # Upload the points for drawing and index them for picking
+
+    setupBuffers()
+
+    pointIndex = pointindex.GridIndex( array( 'd', (p.x for p in allPoints) ),
+                                       array( 'd', (p.y for p in allPoints) ) )
+
+    for p in allPoints:
+        p.grid = pointIndex
+        pointIndex.setHighlight( p.index, p.ownHighlight )
 
     # Run the code
     
-    buildHull( allPoints )
+    buildHull( hullPoints )
 
     # Wait to exit
 
     while not glfw.window_should_close( window ):
         glfw.wait_events()
+        display() # to show changes in highlighting
         if lastKey == glfw.KEY_ESCAPE:
             sys.exit(0)
 
     glfw.destroy_window( window )
     glfw.terminate()
-    
+
+
+
+# Read a text or binary points file, or report where it is malformed
+# and exit
+
+def readPointsOrExit( filename ):
+
+    try:
+        return pointio.openPoints( filename )
+    except ValueError as e:
+        print( '%s: %s' % (filename, e) )
+        sys.exit(1)
+
+
+
+# Find the points that might be on the hull, reporting how many were
+# discarded and, separately, how long finding them took (which is
+# what -d costs, not what it saves)
+#
+# Returns the indices of the kept points in increasing order.
+
+def discardInteriorPoints( xs, ys ):
+
+    start = time.perf_counter()
+
+    keep = arrayhull.cullInteriorPoints( xs, ys )
+
+    seconds = time.perf_counter() - start
+
+    sys.stderr.write( 'Discarded %d of %d points\n' % (len(xs)-len(keep), len(xs)) )
+    sys.stderr.write( 'Finding the points to discard took %.3f seconds\n' % seconds )
+
+    return keep
+
+
+
+# Build the hull without a window and write out its vertices
+#
+# This runs on the compact array-backed store in arrayhull.py rather
+# than on Point objects.
+
+def runHeadless( inFile, outFile, numWorkers=1, outputSensitive=False ):
+
+    xs, ys, isSorted = readPointsOrExit( inFile )
+
+    if discardPoints:
+        keep = discardInteriorPoints( xs, ys )
+        xs = array( 'd', (xs[i] for i in keep) ) # (still sorted if they were)
+        ys = array( 'd', (ys[i] for i in keep) )
+
+    store = arrayhull.PointStore( xs, ys )
+
+    if outputSensitive: # (needs no sort)
+        import chan
+        verts = chan.chanHull( store )
+        writeHull( [ store.xs[i] for i in verts ], [ store.ys[i] for i in verts ], outFile )
+        return
+
+    if isSorted:
+        order = range( len(store) ) # (a binary file needs no sorting or copying)
+    else:
+        order = arrayhull.sortedOrder( store )
+
+    order = arrayhull.dropDuplicates( store, order )
+
+    if numWorkers > 1:
+        arrayhull.buildHullParallel( store, order, numWorkers )
+    elif len(order) > 1:
+        arrayhull.buildHull( store, order )
+
+    verts = store.hullFrom( order[0] ) if len(order) > 0 else []
+
+    writeHull( [ store.xs[i] for i in verts ], [ store.ys[i] for i in verts ], outFile )
+
+
+
+# Build the hull of a file a chunk at a time without a window, and
+# write out its vertices
+#
+# Only one chunk of points and the hull so far are held in memory, so
+# this works on files that are larger than memory.
+
+def runStreaming( inFile, outFile, chunkPoints ):
+
+    try:
+        xs, ys = arrayhull.streamHull( pointio.iterPointChunks( inFile, chunkPoints ) )
+    except ValueError as e:
+        print( '%s: %s' % (inFile, e) )
+        sys.exit(1)
+
+    writeHull( xs, ys, outFile )
 
 
 if __name__ == '__main__':
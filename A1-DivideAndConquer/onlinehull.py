@@ -0,0 +1,400 @@
+# Online convex hull
+#
+# Usage: python onlinehull.py file_of_points
+#
+#   Inserts the points one at a time, in file order, and writes the
+#   final hull vertices in CCW order to stdout.
+#
+# An OnlineHull keeps the hull of all points inserted so far, so a
+# point feed can be followed without re-sorting and rebuilding.  The
+# hull is held in the same form as after main.py's buildHull(): each
+# hull Point's 'ccwPoint' and 'cwPoint' point to its neighbours on the
+# hull, and are None for points that are not on it.
+#
+# The hull vertices are also kept as two chains sorted by (x,y): the
+# lower chain from the leftmost to the rightmost vertex, and the upper
+# chain likewise.  Each chain is a treap (see Chain), so a point is
+# found, inserted or removed in O(log h) expected time for a hull of h
+# vertices.  A new point is placed in each chain by searching on its
+# (x,y).  If it is outside, it is inserted and its neighbours are
+# removed in each direction until the chain is convex again.  Each
+# point is removed at most once, so an insertion costs O(log h)
+# amortized expected time.
+
+
+import sys, random
+
+from main import Point, turn, LEFT_TURN, RIGHT_TURN, COLLINEAR
+import pointio
+
+
+
+class OnlineHull(object):
+
+    def __init__( self ):
+
+        self.lower = Chain() # lower hull chain, sorted by (x,y)
+        self.upper = Chain() # upper hull chain, sorted by (x,y)
+
+
+    def __len__(self):
+        return max( len(self.lower) + len(self.upper) - 2, len(self.lower) )
+
+
+    def __repr__(self):
+        return 'OnlineHull(%d vertices)' % len(self)
+
+
+    # Add a point to the hull, returning True if it is now a hull vertex
+    #
+    # Points that leave the hull have their CW and CCW pointers set to
+    # None.
+
+    def insert( self, point ):
+
+        changed = []
+
+        onLower = self.insertInChain( self.lower, point, LEFT_TURN, changed )
+        onUpper = self.insertInChain( self.upper, point, RIGHT_TURN, changed )
+
+        if not onLower and not onUpper:
+            return False
+
+        for p in dict.fromkeys( changed ): # (each once, in order)
+            self.relink( p )
+
+        return True
+
+
+    # Insert a point into a chain if it is outside it
+    #
+    # 'side' is the turn that every three consecutive points of the
+    # chain make from left to right.  Points whose pointers might
+    # change are appended to 'changed'.
+
+    def insertInChain( self, chain, point, side, changed ):
+
+        before, at, after = chain.around( point ) # (its neighbours once inserted)
+
+        if not isOutside( before, at, after, point, side ):
+            return False
+
+        chain.insert( point )
+
+        changed.append( point )
+
+        # Remove points to the right that are no longer convex
+
+        while after is not None:
+            nextAfter = chain.around( after )[2]
+            if nextAfter is None or turn( point, after, nextAfter ) == side:
+                break
+            chain.remove( after )
+            changed.append( after )
+            after = nextAfter
+
+        # Remove points to the left that are no longer convex
+
+        while before is not None:
+            nextBefore = chain.around( before )[0]
+            if nextBefore is None or turn( nextBefore, before, point ) == side:
+                break
+            chain.remove( before )
+            changed.append( before )
+            before = nextBefore
+
+        # The neighbours' pointers change too
+
+        if before is not None:
+            changed.append( before )
+        if after is not None:
+            changed.append( after )
+
+        return True
+
+
+    # Set a point's CW and CCW pointers from its place in the chains
+    #
+    # CCW order runs left to right along the lower chain and right to
+    # left along the upper chain.
+
+    def relink( self, point ):
+
+        lowerBefore, onLower, lowerAfter = self.lower.around( point )
+        upperBefore, onUpper, upperAfter = self.upper.around( point )
+
+        if onLower is not None and lowerAfter is not None:
+            point.ccwPoint = lowerAfter
+        elif onUpper is not None and upperBefore is not None:
+            point.ccwPoint = upperBefore
+        else:
+            point.ccwPoint = None
+
+        if onUpper is not None and upperAfter is not None:
+            point.cwPoint = upperAfter
+        elif onLower is not None and lowerBefore is not None:
+            point.cwPoint = lowerBefore
+        else:
+            point.cwPoint = None
+
+
+    # Return the hull vertices in CCW order from the leftmost vertex
+
+    def hull( self ):
+
+        return self.lower.points() + self.upper.points()[-2:0:-1]
+
+
+    # Determine whether (x,y) is inside or on the hull
+
+    def contains( self, x, y ):
+
+        q = Point( (x,y) )
+
+        return ( not isOutside( *self.lower.around( q ), q, LEFT_TURN ) and
+                 not isOutside( *self.upper.around( q ), q, RIGHT_TURN ) )
+
+
+
+# Determine whether a point is outside a hull chain
+#
+# 'before', 'at' and 'after' are the chain's points around the point,
+# from Chain.around(), and 'side' is the turn that the chain makes from
+# left to right.  The point is outside if it comes before or after the
+# whole chain, or if it is on the far side of the chain edge that it
+# falls beside.  A point that is already a vertex, or is on an edge, is
+# not outside.
+
+def isOutside( before, at, after, point, side ):
+
+    if at is not None:
+        return False
+
+    if before is None or after is None:
+        return True
+
+    return turn( before, after, point ) not in (side, COLLINEAR)
+
+
+
+# Chain
+#
+# The points of a hull chain sorted by (x,y), held in a treap: a binary
+# search tree on (x,y) in which each node also has a random priority
+# that is above those of its children.  Whatever order the points are
+# inserted in, the tree is shaped as if they had been inserted in
+# random order, so its depth is O(log h) expected for h points, and
+# around(), insert() and remove() take O(log h) expected time.
+#
+# No two points of a chain have the same (x,y).
+
+class Chain(object):
+
+    def __init__( self ):
+
+        self.root = None # top ChainNode, or None if the chain is empty
+        self.size = 0
+
+        self.rand = random.Random( 0 ) # priorities (seeded, so runs repeat)
+
+
+    def __len__(self):
+        return self.size
+
+
+    def __repr__(self):
+        return 'Chain(%d points)' % self.size
+
+
+    # Return the points of the chain just before (x,y), at (x,y), and
+    # just after (x,y) of a point, each None if there is none
+
+    def around( self, point ):
+
+        key = (point.x, point.y)
+
+        before = None
+        after  = None
+
+        node = self.root
+        while node is not None:
+            if key < node.key:
+                after = node
+                node = node.left
+            elif key > node.key:
+                before = node
+                node = node.right
+            else:
+                break
+
+        if node is None:
+            return ( before and before.point, None, after and after.point )
+
+        # The neighbours of a point in the chain are the extremes of its
+        # subtrees, if it has them
+
+        if node.left is not None:
+            before = node.left
+            while before.right is not None:
+                before = before.right
+
+        if node.right is not None:
+            after = node.right
+            while after.left is not None:
+                after = after.left
+
+        return ( before and before.point, node.point, after and after.point )
+
+
+    # Add a point, which must not be in the chain
+
+    def insert( self, point ):
+
+        self.root = insertNode( self.root, ChainNode( point, self.rand.random() ) )
+        self.size += 1
+
+
+    # Remove a point, which must be in the chain
+
+    def remove( self, point ):
+
+        self.root = removeNode( self.root, (point.x, point.y) )
+        self.size -= 1
+
+
+    # Return the points in order
+
+    def points( self ):
+
+        result = []
+        stack = []
+
+        node = self.root
+        while stack or node is not None:
+            if node is not None:
+                stack.append( node )
+                node = node.left
+            else:
+                node = stack.pop()
+                result.append( node.point )
+                node = node.right
+
+        return result
+
+
+
+# ChainNode
+#
+# A node of a Chain's treap.
+
+class ChainNode(object):
+
+    __slots__ = ( 'point', 'key', 'priority', 'left', 'right' )
+
+    def __init__( self, point, priority ):
+
+        self.point = point
+        self.key = (point.x, point.y)
+
+        self.priority = priority
+
+        self.left  = None # subtree of points before this one
+        self.right = None # subtree of points after this one
+
+
+    def __repr__(self):
+        return 'ChainNode(%r, %.3f)' % (self.point, self.priority)
+
+
+
+# Insert a node into the treap under 'node', returning the new top
+# node of that subtree
+#
+# The node goes in as a leaf and is rotated up past any parents of
+# lower priority.
+
+def insertNode( node, new ):
+
+    if node is None:
+        return new
+
+    if new.key < node.key:
+        node.left = insertNode( node.left, new )
+        if node.left.priority > node.priority: # rotate right
+            top = node.left
+            node.left = top.right
+            top.right = node
+            return top
+    else:
+        node.right = insertNode( node.right, new )
+        if node.right.priority > node.priority: # rotate left
+            top = node.right
+            node.right = top.left
+            top.left = node
+            return top
+
+    return node
+
+
+
+# Remove the node with a key from the treap under 'node', returning
+# the new top node of that subtree
+
+def removeNode( node, key ):
+
+    if key < node.key:
+        node.left = removeNode( node.left, key )
+    elif key > node.key:
+        node.right = removeNode( node.right, key )
+    else:
+        return joinNodes( node.left, node.right )
+
+    return node
+
+
+
+# Join two treaps, all of whose keys in 'left' are before those in
+# 'right', returning the top node
+
+def joinNodes( left, right ):
+
+    if left is None:
+        return right
+    if right is None:
+        return left
+
+    if left.priority > right.priority:
+        left.right = joinNodes( left.right, right )
+        return left
+    else:
+        right.left = joinNodes( left, right.left )
+        return right
+
+
+
+# Insert the points of a file one by one and write out the hull
+
+def main():
+
+    if len(sys.argv) != 2:
+        print( 'Usage: %s file_of_points' % sys.argv[0] )
+        sys.exit(1)
+
+    try:
+        xs, ys, isSorted = pointio.openPoints( sys.argv[1] )
+    except ValueError as e:
+        print( '%s: %s' % (sys.argv[1], e) )
+        sys.exit(1)
+
+    hull = OnlineHull()
+
+    for coords in zip( xs, ys ):
+        hull.insert( Point( coords ) )
+
+    for p in hull.hull():
+        sys.stdout.write( '%r %r\n' % (p.x, p.y) )
+
+
+
+if __name__ == '__main__':
+    main()
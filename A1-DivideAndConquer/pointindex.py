@@ -0,0 +1,213 @@
+# Grid index over a set of points
+#
+# A GridIndex divides the bounding box of the points into a grid of
+# equal cells, with about two points per cell, and lists the points of
+# each cell.  A nearest-point query then only looks at the cells
+# around the query point, and a rectangle query only at the cells that
+# the rectangle overlaps, so neither visits every point.
+#
+# The points of each cell are held together in one array('i') of
+# point indices, sorted by cell, with the start of each cell's run in
+# another array (like the rows of a sparse matrix).
+#
+# The index also holds which points are highlighted in the viewer, as
+# a set of point indices, so that drawing them does not look at every
+# point.
+
+
+import math
+from array import array
+
+
+
+# GridIndex
+#
+# Indexes the points (xs[i],ys[i]).  'xs' and 'ys' can be any
+# sequences of floats that support indexing.  Queries return indices
+# into them.
+
+class GridIndex(object):
+
+    def __init__( self, xs, ys ):
+
+        if len(xs) != len(ys):
+            raise ValueError( 'x and y coordinate counts differ (%d and %d)' % (len(xs),len(ys)) )
+
+        n = len(xs)
+
+        self.xs = xs
+        self.ys = ys
+
+        self.minX = min( xs ) if n > 0 else 0.0
+        self.minY = min( ys ) if n > 0 else 0.0
+        self.maxX = max( xs ) if n > 0 else 0.0
+        self.maxY = max( ys ) if n > 0 else 0.0
+
+        self.numCols = max( 1, int( math.sqrt( n/2 ) ) ) # about 2 points per cell
+        self.numRows = self.numCols
+
+        self.cellWidth  = (self.maxX - self.minX) / self.numCols or 1.0
+        self.cellHeight = (self.maxY - self.minY) / self.numRows or 1.0
+
+        # List the points cell by cell
+
+        cells = [ self.cellOf( x, y ) for x,y in zip( xs, ys ) ]
+
+        self.points = array( 'i', sorted( range(n), key=cells.__getitem__ ) ) # point indices, by cell
+
+        counts = array( 'i', [0] ) * (self.numCols*self.numRows)
+        for c in cells:
+            counts[c] += 1
+
+        self.cellStarts = array( 'i', [0] ) * (len(counts)+1) # start of each cell in 'points'
+        for c in range(len(counts)):
+            self.cellStarts[c+1] = self.cellStarts[c] + counts[c]
+
+        self.highlighted = set() # indices of the highlighted points
+
+
+    def __len__(self):
+        return len(self.points)
+
+
+    def __repr__(self):
+        return 'GridIndex(%d points, %dx%d cells)' % (len(self.points), self.numCols, self.numRows)
+
+
+    # Return the column and row of the cell containing (x,y), clamped
+    # to the grid
+
+    def colRow( self, x, y ):
+
+        col = min( max( int( (x - self.minX) / self.cellWidth ), 0 ), self.numCols-1 )
+        row = min( max( int( (y - self.minY) / self.cellHeight ), 0 ), self.numRows-1 )
+
+        return col, row
+
+
+    def cellOf( self, x, y ):
+
+        col, row = self.colRow( x, y )
+
+        return row*self.numCols + col
+
+
+    # Return the index of the point nearest to (x,y), or None if no
+    # point is within 'maxDist'
+    #
+    # The cells are searched in square rings around the cell of (x,y).
+    # Every point in ring k+1 is at least k cell sides from (x,y), or
+    # from its projection onto the grid if (x,y) is outside it (and
+    # then farther still from (x,y) by Pythagoras), so the search stops
+    # once the nearest point found is closer than that.
+
+    def nearest( self, x, y, maxDist=float('inf') ):
+
+        xs = self.xs
+        ys = self.ys
+        points = self.points
+        cellStarts = self.cellStarts
+
+        col, row = self.colRow( x, y )
+        side = min( self.cellWidth, self.cellHeight )
+
+        outX = max( self.minX - x, 0, x - self.maxX ) # distance outside the grid
+        outY = max( self.minY - y, 0, y - self.maxY )
+        outDist2 = outX*outX + outY*outY
+
+        bestPoint = None
+        bestDist2 = maxDist * maxDist
+
+        k = 0
+        while True:
+
+            for c, r in ringCells( col, row, k, self.numCols, self.numRows ):
+
+                cell = r*self.numCols + c
+
+                for i in points[ cellStarts[cell] : cellStarts[cell+1] ]:
+                    dist2 = (xs[i]-x)*(xs[i]-x) + (ys[i]-y)*(ys[i]-y)
+                    if dist2 <= bestDist2:
+                        bestDist2 = dist2
+                        bestPoint = i
+
+            if outDist2 + (k*side)*(k*side) >= bestDist2: # nothing farther out is closer
+                break
+
+            if col-k <= 0 and row-k <= 0 and col+k >= self.numCols-1 and row+k >= self.numRows-1: # ring covers the grid
+                break
+
+            k += 1
+
+        return bestPoint
+
+
+    # Highlight point i or remove its highlight
+
+    def setHighlight( self, i, value ):
+
+        if value:
+            self.highlighted.add( i )
+        else:
+            self.highlighted.discard( i )
+
+
+    # Determine whether point i is highlighted
+
+    def isHighlighted( self, i ):
+
+        return i in self.highlighted
+
+
+    # Return the indices of the points in the rectangle with corners
+    # (x0,y0) and (x1,y1), in any order
+
+    def inRectangle( self, x0, y0, x1, y1 ):
+
+        xs = self.xs
+        ys = self.ys
+        points = self.points
+        cellStarts = self.cellStarts
+
+        left, right = min( x0, x1 ), max( x0, x1 )
+        bottom, top = min( y0, y1 ), max( y0, y1 )
+
+        col0, row0 = self.colRow( left, bottom )
+        col1, row1 = self.colRow( right, top )
+
+        found = []
+
+        for r in range( row0, row1+1 ):
+            for cell in range( r*self.numCols + col0, r*self.numCols + col1+1 ):
+                for i in points[ cellStarts[cell] : cellStarts[cell+1] ]:
+                    if left <= xs[i] <= right and bottom <= ys[i] <= top:
+                        found.append( i )
+
+        return found
+
+
+
+# Yield the (column, row) of the cells in the square ring k cells out
+# from (col, row) that are inside the grid
+
+def ringCells( col, row, k, numCols, numRows ):
+
+    if k == 0:
+        yield col, row
+        return
+
+    c0 = max( col-k, 0 )
+    c1 = min( col+k, numCols-1 )
+
+    for r in (row-k, row+k): # bottom and top sides
+        if 0 <= r < numRows:
+            for c in range( c0, c1+1 ):
+                yield c, r
+
+    r0 = max( row-k+1, 0 )
+    r1 = min( row+k-1, numRows-1 )
+
+    for c in (col-k, col+k): # left and right sides
+        if 0 <= c < numCols:
+            for r in range( r0, r1+1 ):
+                yield c, r
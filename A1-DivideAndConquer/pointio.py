@@ -0,0 +1,382 @@
+# Point file reading and writing
+#
+# Usage: python pointio.py [-s] text_file binary_file
+#
+#   Converts a text points file to the binary format.  -s sorts the
+#   points by (x,y) and marks the file as sorted.
+#
+# A text points file has one point per line, given as two coordinates
+# separated by white space:
+#
+#   x y
+#
+# readPoints() memory-maps the file and parses it in large chunks
+# straight into array('d') buffers, with a few bulk calls per chunk
+# rather than a Python loop per line, and no Points are made.  (Each
+# chunk's lines are split once to check their value counts.)  Blank
+# lines are skipped.  A malformed line raises a ValueError that gives
+# its line number.
+#
+# A binary points file is a 16-byte header followed by the points as
+# packed little-endian float64 x,y pairs:
+#
+#   bytes 0-3    magic b'PTSB'
+#   bytes 4-7    flags (uint32): bit 0 is set if the points are sorted
+#                by increasing x, and by increasing y for equal x
+#   bytes 8-15   number of points (uint64)
+#
+# readBinaryPoints() memory-maps the file and returns views of the
+# x and y coordinates in the mapping itself, so nothing is parsed or
+# copied.
+
+
+import sys, mmap, struct
+from array import array
+
+import arrayhull
+
+
+chunkBytes = 1 << 23 # bytes parsed at a time
+
+binaryMagic  = b'PTSB'
+binaryHeader = struct.Struct( '<4sIQ' ) # magic, flags, number of points
+SORTED_FLAG  = 1
+
+numberNames = { 2: 'two', 3: 'three' } # for error messages
+
+
+
+# Read a text or binary points file
+#
+# Returns the x and y coordinates and whether the points are known to
+# be sorted by (x,y).  Only binary files can be marked as sorted.
+
+def openPoints( filename ):
+
+    with open( filename, 'rb' ) as f:
+        isBinary = f.read( len(binaryMagic) ) == binaryMagic
+
+    if isBinary:
+        return readBinaryPoints( filename )
+    else:
+        xs, ys = readPoints( filename )
+        return xs, ys, False
+
+
+
+# Read a points file, returning arrays of x and y coordinates
+#
+# With numCoords = 3, each line holds x, y and z, and three arrays are
+# returned.
+
+def readPoints( filename, numCoords=2 ):
+
+    coords = tuple( array( 'd' ) for k in range(numCoords) )
+
+    with open( filename, 'rb' ) as f:
+
+        size = f.seek( 0, 2 )
+        if size == 0:
+            return coords
+
+        with mmap.mmap( f.fileno(), 0, access=mmap.ACCESS_READ ) as mm:
+
+            pos = 0
+            lineNum = 1 # line number of the start of the chunk
+
+            while pos < size:
+
+                # Take a chunk that ends at a line break
+
+                end = mm.find( b'\n', pos+chunkBytes )
+                end = size if end < 0 else end+1
+
+                chunk = mm[pos:end]
+
+                parseChunk( chunk, lineNum, *coords )
+
+                lineNum += chunk.count( b'\n' )
+                pos = end
+
+    return coords
+
+
+
+# Read a text or binary points file a chunk at a time
+#
+# Yields (xs, ys) arrays of 'chunkPoints' points each (the last chunk
+# may be smaller), reading the file in blocks so that only one chunk
+# and one block are ever in memory.  Raises a ValueError if
+# 'chunkPoints' is less than 1.
+
+def iterPointChunks( filename, chunkPoints ):
+
+    if chunkPoints < 1:
+        raise ValueError( 'chunks must hold at least 1 point, not %d.' % chunkPoints )
+
+    return pointChunks( filename, chunkPoints ) # (so the check above is made before the first chunk is asked for)
+
+
+
+# The generator of iterPointChunks()
+
+def pointChunks( filename, chunkPoints ):
+
+    with open( filename, 'rb' ) as f:
+
+        if f.read( len(binaryMagic) ) == binaryMagic:
+
+            f.seek( 0 )
+            magic, flags, numPoints = binaryHeader.unpack( f.read( binaryHeader.size ) )
+
+            while True:
+                coords = array( 'd' )
+                coords.frombytes( f.read( 16*chunkPoints ) )
+                if len(coords) == 0:
+                    break
+                if sys.byteorder != 'little':
+                    coords.byteswap()
+                yield coords[0::2], coords[1::2]
+
+            return
+
+        f.seek( 0 )
+
+        xs = array( 'd' )
+        ys = array( 'd' )
+
+        lineNum = 1 # line number of the start of the next block
+        rest = b'' # partial line left over from the last block
+
+        while True:
+
+            block = f.read( chunkBytes )
+
+            if not block: # end of file
+                parseChunk( rest, lineNum, xs, ys )
+                break
+
+            # Parse up to the last line break and keep the rest
+
+            block = rest + block
+            cut = block.rfind( b'\n' ) + 1
+
+            rest = block[cut:]
+            block = block[:cut]
+
+            parseChunk( block, lineNum, xs, ys )
+            lineNum += block.count( b'\n' )
+
+            while len(xs) >= chunkPoints:
+                yield xs[:chunkPoints], ys[:chunkPoints]
+                del xs[:chunkPoints]
+                del ys[:chunkPoints]
+
+        while len(xs) > 0:
+            yield xs[:chunkPoints], ys[:chunkPoints]
+            del xs[:chunkPoints]
+            del ys[:chunkPoints]
+
+
+
+# Parse a chunk of whole lines, appending its coordinates to xs and ys
+# (and to zs, for 3D points)
+#
+# The whole chunk is split and converted at once, once every line that
+# is not blank is known to hold one value per coordinate (the counts
+# are taken with map(), not in a Python loop).  If a line holds
+# another number of values, or a value is not a number, the chunk is
+# parsed again line by line to find the bad line.
+
+def parseChunk( chunk, lineNum, *coords ):
+
+    if set( map( len, map( bytes.split, chunk.splitlines() ) ) ) - {0} == { len(coords) }:
+        tokens = chunk.split()
+        try:
+            values = array( 'd', map( float, tokens ) )
+        except ValueError:
+            pass
+        else:
+            for k, c in enumerate( coords ):
+                c.extend( values[k::len(coords)] )
+            return
+
+    parseLines( chunk, lineNum, *coords )
+
+
+
+# Parse a chunk one line at a time, raising a ValueError at the first
+# malformed line
+
+def parseLines( chunk, lineNum, *coords ):
+
+    for l, line in enumerate( chunk.split( b'\n' ) ):
+
+        tokens = line.split()
+
+        if len(tokens) == 0:
+            continue
+
+        if len(tokens) != len(coords):
+            raise ValueError( 'Line %d: point does not have %s coordinates.' % (lineNum+l, numberNames[len(coords)]) )
+
+        try:
+            values = [ float( t ) for t in tokens ]
+        except ValueError:
+            raise ValueError( 'Line %d: coordinate is not a number.' % (lineNum+l) )
+
+        for c, v in zip( coords, values ):
+            c.append( v )
+
+
+
+# Read a 3D points file, returning arrays of x, y and z coordinates
+#
+# The file is either a slice file, as read by readSlices() in
+# A3-Dynamic Programing/slices.py, or a text file with one point per
+# line given as three coordinates (an "xyz" file).  A slice file
+# starts with a line holding only the number of slices, and each slice
+# is the number of its vertices followed by their x y z lines.  All of
+# the slices' vertices are returned, in the order of the file.
+
+def readPoints3D( filename ):
+
+    with open( filename, 'rb' ) as f:
+        data = f.read()
+
+    lines = data.split( b'\n' )
+
+    firstLine = next( ( line for line in lines if line.strip() ), b'' )
+
+    if len( firstLine.split() ) != 1:
+        return readPoints( filename, 3 )
+
+    xs = array( 'd' )
+    ys = array( 'd' )
+    zs = array( 'd' )
+
+    l = 0 # index of the next line to read
+
+    def nextCount( what ): # read a line holding only a count
+        nonlocal l
+        while l < len(lines) and not lines[l].strip():
+            l += 1
+        if l == len(lines):
+            raise ValueError( 'Line %d: file ends before the %s.' % (l+1, what) )
+        try:
+            count = int( lines[l] )
+        except ValueError:
+            raise ValueError( 'Line %d: %s is not an integer.' % (l+1, what) )
+        l += 1
+        return count
+
+    numSlices = nextCount( 'number of slices' )
+
+    for s in range(numSlices):
+
+        numVerts = nextCount( 'vertex count of slice %d' % (s+1) )
+
+        if l + numVerts > len(lines):
+            raise ValueError( 'Line %d: file ends in slice %d.' % (len(lines), s+1) )
+
+        numBefore = len(xs)
+
+        parseLines( b'\n'.join( lines[l:l+numVerts] ), l+1, xs, ys, zs )
+
+        if len(xs) - numBefore != numVerts:
+            raise ValueError( 'Line %d: slice %d has a blank line among its vertices.' % (l+1, s+1) )
+
+        l += numVerts
+
+    return xs, ys, zs
+
+
+
+# Read a binary points file
+#
+# Returns the x and y coordinates as memoryviews into the memory-mapped
+# file, and whether the points are marked as sorted.  The mapping stays
+# open for as long as the views are in use.
+
+def readBinaryPoints( filename ):
+
+    with open( filename, 'rb' ) as f:
+
+        header = f.read( binaryHeader.size )
+        if len(header) < binaryHeader.size:
+            raise ValueError( 'binary points file is too short for its header.' )
+
+        magic, flags, numPoints = binaryHeader.unpack( header )
+        if magic != binaryMagic:
+            raise ValueError( 'not a binary points file.' )
+
+        size = f.seek( 0, 2 )
+        if size != binaryHeader.size + 16*numPoints:
+            raise ValueError( 'binary points file should hold %d points but has %d bytes.' % (numPoints,size) )
+
+        if numPoints == 0:
+            return array( 'd' ), array( 'd' ), bool( flags & SORTED_FLAG )
+
+        mm = mmap.mmap( f.fileno(), 0, access=mmap.ACCESS_READ )
+
+    if sys.byteorder == 'little':
+        coords = memoryview( mm )[binaryHeader.size:].cast( 'd' )
+    else:
+        coords = array( 'd', mm[binaryHeader.size:] ) # copy, to swap bytes
+        coords.byteswap()
+
+    return coords[0::2], coords[1::2], bool( flags & SORTED_FLAG )
+
+
+
+# Write points to a binary points file
+
+def writeBinaryPoints( filename, xs, ys, isSorted=False ):
+
+    coords = array( 'd', [0.0] ) * (2*len(xs))
+    coords[0::2] = array( 'd', xs )
+    coords[1::2] = array( 'd', ys )
+
+    if sys.byteorder != 'little':
+        coords.byteswap()
+
+    with open( filename, 'wb' ) as f:
+        f.write( binaryHeader.pack( binaryMagic, SORTED_FLAG if isSorted else 0, len(xs) ) )
+        coords.tofile( f )
+
+
+
+# Convert a text points file to a binary one
+
+def main():
+
+    args = sys.argv[1:]
+
+    doSort = False
+    if args and args[0] == '-s':
+        doSort = True
+        args = args[1:]
+
+    if len(args) != 2:
+        print( 'Usage: %s [-s] text_file binary_file' % sys.argv[0] )
+        sys.exit(1)
+
+    try:
+        xs, ys = readPoints( args[0] )
+    except ValueError as e:
+        print( '%s: %s' % (args[0], e) )
+        sys.exit(1)
+
+    if doSort:
+        order = arrayhull.sortedOrder( arrayhull.PointStore( xs, ys ) )
+        xs = array( 'd', (xs[i] for i in order) )
+        ys = array( 'd', (ys[i] for i in order) )
+
+    writeBinaryPoints( args[1], xs, ys, doSort )
+
+    print( 'Wrote %d points to %s' % (len(xs), args[1]) )
+
+
+
+if __name__ == '__main__':
+    main()
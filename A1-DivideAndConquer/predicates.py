@@ -0,0 +1,248 @@
+# Robust orientation predicate
+#
+# Whether three points make a left turn, a right turn, or are
+# collinear is the sign of the determinant
+#
+#   | ax-cx  ay-cy |
+#   | bx-cx  by-cy |  =  (ax-cx)*(by-cy) - (bx-cx)*(ay-cy)
+#
+# Computed in floating point, this sign can be wrong when the points
+# are nearly collinear, and different tests on the same points can
+# then disagree, which breaks the hull algorithms.
+#
+# orient() first computes the determinant in floating point, as
+# before, and also bounds its rounding error.  The bound is Shewchuk's
+# (3 + 16 eps) eps (|detLeft| + |detRight|), where detLeft and
+# detRight are the two products and eps = 2^-53 (J. R. Shewchuk,
+# "Adaptive Precision Floating-Point Arithmetic and Fast Robust
+# Geometric Predicates", 1997).  If the determinant is farther from
+# zero than that, its sign is right.  Only otherwise is it computed
+# again exactly, in integers, which is rare on typical data.
+#
+# Inner loops over many points can first compare the determinant with
+# one bound for the whole point set, from staticBound(), and only work
+# out each determinant's own bound when that comparison fails.
+#
+# orient3dSign() does the same in 3D, for the side of a plane through
+# three points that a fourth point is on, with Shewchuk's bound
+# (7 + 56 eps) eps for that determinant.
+
+
+import sys
+from array import array
+
+
+LEFT_TURN  = 1
+RIGHT_TURN = 2
+COLLINEAR  = 3
+
+eps = sys.float_info.epsilon / 2 # 2^-53, the unit roundoff
+
+errBound = (3 + 16*eps) * eps # relative error bound of the determinant
+
+errBound3 = (7 + 56*eps) * eps # the same for the 3D determinant
+
+
+
+# Determine whether three points make a left or right turn
+
+def orient( ax, ay, bx, by, cx, cy ):
+
+    detLeft  = (ax-cx) * (by-cy)
+    detRight = (bx-cx) * (ay-cy)
+
+    det = detLeft - detRight
+    bound = errBound * (abs(detLeft) + abs(detRight))
+
+    if det > bound:
+        return LEFT_TURN
+    elif det < -bound:
+        return RIGHT_TURN
+    else:
+        return exactOrient( ax, ay, bx, by, cx, cy )
+
+
+
+# Return the sign (-1, 0 or 1) of the determinant
+#
+# Like orient(), this is exact but only computes in integers when the
+# floating-point determinant is too close to zero.
+
+def orientSign( ax, ay, bx, by, cx, cy ):
+
+    detLeft  = (ax-cx) * (by-cy)
+    detRight = (bx-cx) * (ay-cy)
+
+    det = detLeft - detRight
+    bound = errBound * (abs(detLeft) + abs(detRight))
+
+    if det > bound:
+        return 1
+    elif det < -bound:
+        return -1
+    else:
+        return exactSign( ax, ay, bx, by, cx, cy )
+
+
+
+# Return a bound on the rounding error of every determinant of points
+# with coordinates in xs and ys
+#
+# Every coordinate difference is at most the larger side D of the
+# bounding box, so |detLeft| + |detRight| is at most 2 D^2 (with a
+# little slack for rounding).  A determinant that is farther from
+# zero than this has the right sign without computing the bound of
+# each determinant.
+
+def staticBound( xs, ys ):
+
+    if len(xs) == 0:
+        return 0.0
+
+    d = max( max(xs) - min(xs), max(ys) - min(ys) )
+
+    return errBound * 2 * d * d * (1 + 1e-12)
+
+
+
+# Return the side of the plane through a, b and c that d is on
+#
+# Returns the sign (-1, 0 or 1) of the triple product
+#
+#   ((b-a) x (c-a)) . (d-a)
+#
+# which is 1 if d is on the side that the normal of a, b, c (in
+# right-handed order) points to, that is, if a, b, c are CCW as seen
+# from d.  Like orientSign(), this is exact.
+
+def orient3dSign( ax, ay, az, bx, by, bz, cx, cy, cz, dx, dy, dz ):
+
+    ux = bx-ax; uy = by-ay; uz = bz-az
+    vx = cx-ax; vy = cy-ay; vz = cz-az
+    wx = dx-ax; wy = dy-ay; wz = dz-az
+
+    det = ( wx * (uy*vz - uz*vy) +
+            wy * (uz*vx - ux*vz) +
+            wz * (ux*vy - uy*vx) )
+
+    permanent = ( abs(wx) * (abs(uy*vz) + abs(uz*vy)) +
+                  abs(wy) * (abs(uz*vx) + abs(ux*vz)) +
+                  abs(wz) * (abs(ux*vy) + abs(uy*vx)) )
+
+    bound = errBound3 * permanent
+
+    if det > bound:
+        return 1
+    elif det < -bound:
+        return -1
+    else:
+        return exactSign3( ax, ay, az, bx, by, bz, cx, cy, cz, dx, dy, dz )
+
+
+
+# Return a bound on the rounding error of every orient3dSign()
+# determinant of points with coordinates in xs, ys and zs
+#
+# As in staticBound(), every coordinate difference is at most the
+# largest side D of the bounding box, so the permanent is at most
+# 6 D^3.
+
+def staticBound3( xs, ys, zs ):
+
+    if len(xs) == 0:
+        return 0.0
+
+    d = max( max(xs) - min(xs), max(ys) - min(ys), max(zs) - min(zs) )
+
+    return errBound3 * 6 * d * d * d * (1 + 1e-12)
+
+
+
+# Return the sign (-1, 0 or 1) of the determinant, computed exactly
+#
+# Every float is an integer over a power of two.  Scaling all six
+# coordinates by the largest of these denominators makes them all
+# integers and scales the determinant by a positive number, so its
+# sign can be found with Python's exact integer arithmetic.
+
+def exactSign( ax, ay, bx, by, cx, cy ):
+
+    ratios = [ v.as_integer_ratio() for v in (ax, ay, bx, by, cx, cy) ]
+
+    scale = max( den for num, den in ratios )
+
+    ax, ay, bx, by, cx, cy = [ num * (scale // den) for num, den in ratios ]
+
+    det = (ax-cx) * (by-cy) - (bx-cx) * (ay-cy)
+
+    return (det > 0) - (det < 0)
+
+
+
+# Return the sign of orient3dSign()'s triple product, computed exactly
+# (as in exactSign())
+
+def exactSign3( *coords ):
+
+    ratios = [ v.as_integer_ratio() for v in coords ]
+
+    scale = max( den for num, den in ratios )
+
+    ax, ay, az, bx, by, bz, cx, cy, cz, dx, dy, dz = [ num * (scale // den) for num, den in ratios ]
+
+    ux = bx-ax; uy = by-ay; uz = bz-az
+    vx = cx-ax; vy = cy-ay; vz = cz-az
+    wx = dx-ax; wy = dy-ay; wz = dz-az
+
+    det = ( wx * (uy*vz - uz*vy) +
+            wy * (uz*vx - ux*vz) +
+            wz * (ux*vy - uy*vx) )
+
+    return (det > 0) - (det < 0)
+
+
+
+# Determine whether three points make a left or right turn, exactly
+
+def exactOrient( ax, ay, bx, by, cx, cy ):
+
+    sign = exactSign( ax, ay, bx, by, cx, cy )
+
+    if sign > 0:
+        return LEFT_TURN
+    elif sign < 0:
+        return RIGHT_TURN
+    else:
+        return COLLINEAR
+
+
+
+# Classify many triples of points at once
+#
+# The arguments are sequences of the coordinates of the a, b and c
+# points of each triple.  Returns an array('B') of LEFT_TURN,
+# RIGHT_TURN or COLLINEAR for each triple.  This is orient() written
+# out in one loop over all of the triples, so no function is called
+# for a triple unless the filter cannot decide it.
+
+def orientBatch( axs, ays, bxs, bys, cxs, cys ):
+
+    turns = array( 'B' )
+    append = turns.append
+
+    for ax, ay, bx, by, cx, cy in zip( axs, ays, bxs, bys, cxs, cys ):
+
+        detLeft  = (ax-cx) * (by-cy)
+        detRight = (bx-cx) * (ay-cy)
+
+        det = detLeft - detRight
+        bound = errBound * (abs(detLeft) + abs(detRight))
+
+        if det > bound:
+            append( LEFT_TURN )
+        elif det < -bound:
+            append( RIGHT_TURN )
+        else:
+            append( exactOrient( ax, ay, bx, by, cx, cy ) )
+
+    return turns
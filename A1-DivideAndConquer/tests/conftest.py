@@ -0,0 +1,6 @@
+# The scripts of this directory import each other as top-level
+# modules, so the tests run with it on the path.
+
+import os, sys
+
+sys.path.insert( 0, os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ) )
@@ -0,0 +1,106 @@
+# Tests of the array-backed hull on repeated and collinear points
+
+
+import random
+from array import array
+
+import arrayhull
+
+
+# Return the hull of some (x,y) pairs by Andrew's monotone chain, in
+# CCW order from the leftmost (lowest) point, with no vertex collinear
+# with its neighbours
+
+def referenceHull( points ):
+
+    points = sorted( set( points ) )
+
+    if len(points) < 3:
+        return points
+
+    def cross( o, a, b ):
+        return (a[0]-o[0]) * (b[1]-o[1]) - (a[1]-o[1]) * (b[0]-o[0])
+
+    def chain( points ):
+        result = []
+        for p in points:
+            while len(result) >= 2 and cross( result[-2], result[-1], p ) <= 0:
+                result.pop()
+            result.append( p )
+        return result
+
+    lower = chain( points )
+    upper = chain( reversed( points ) )
+
+    return lower[:-1] + upper[:-1]
+
+
+
+# Return the hull built by arrayhull.buildHull() as (x,y) pairs
+
+def arrayHull( points, builder=arrayhull.buildHull ):
+
+    store = arrayhull.storeFromPairs( points )
+    order = arrayhull.dropDuplicates( store, arrayhull.sortedOrder( store ) )
+
+    builder( store, order )
+
+    return [ (store.xs[i], store.ys[i]) for i in store.hullFrom( order[0] ) ]
+
+
+
+def test_collinear_base_case():
+
+    assert arrayHull( [ (0,0), (1,1), (2,2) ] ) == [ (0,0), (2,2) ]
+
+
+def test_all_points_collinear():
+
+    points = [ (i, 2*i+1) for i in range(50) ]
+
+    assert arrayHull( points ) == [ (0,1), (49,99) ]
+
+
+def test_integer_grid():
+
+    points = [ (x,y) for x in range(20) for y in range(20) ]
+
+    for builder in ( arrayhull.buildHull, arrayhull.buildHullIterative ):
+        assert arrayHull( points, builder ) == [ (0,0), (19,0), (19,19), (0,19) ]
+
+
+def test_random_small_integer_points():
+
+    rand = random.Random( 0 )
+
+    for trial in range(300):
+        points = [ (rand.randint(0,6), rand.randint(0,6)) for i in range( rand.randint(3,40) ) ]
+        if len( set( points ) ) < 2:
+            continue
+        assert arrayHull( points ) == referenceHull( points ), points
+
+
+def test_drop_duplicates():
+
+    store = arrayhull.storeFromPairs( [ (1,1), (0,0), (1,1), (0,0), (2,0) ] )
+    order = arrayhull.dropDuplicates( store, arrayhull.sortedOrder( store ) )
+
+    assert [ (store.xs[i], store.ys[i]) for i in order ] == [ (0,0), (1,1), (2,0) ]
+
+
+def test_drop_duplicates_returns_order_without_repeats():
+
+    store = arrayhull.storeFromPairs( [ (0,0), (1,0), (0,1) ] )
+    order = arrayhull.sortedOrder( store )
+
+    assert arrayhull.dropDuplicates( store, order ) is order
+
+
+def test_hull_coords_with_repeats():
+
+    xs = array( 'd', [ 0, 0, 1, 1, 0.5, 0, 1 ] )
+    ys = array( 'd', [ 0, 1, 0, 1, 0.5, 0, 1 ] )
+
+    hxs, hys = arrayhull.hullCoords( xs, ys )
+
+    assert list( zip( hxs, hys ) ) == [ (0,0), (1,0), (1,1), (0,1) ]
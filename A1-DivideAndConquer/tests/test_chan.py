@@ -0,0 +1,66 @@
+# Tests of Chan's output-sensitive hull on unsorted points
+
+
+import math, random
+
+import arrayhull, chan
+
+from test_arrayhull import referenceHull
+
+
+# Return the hull built by chan.chanHull() as (x,y) pairs, checking
+# that it is also linked into the store
+
+def chanHull( points ):
+
+    store = arrayhull.storeFromPairs( points )
+
+    verts = chan.chanHull( store )
+
+    if len(verts) > 1:
+        assert store.hullFrom( verts[0] ) == verts
+
+    return [ (store.xs[i], store.ys[i]) for i in verts ]
+
+
+
+def test_small_inputs():
+
+    assert chanHull( [] ) == []
+    assert chanHull( [ (1,2) ] * 5 ) == [ (1,2) ]
+    assert chanHull( [ (3,0), (1,0), (2,0) ] * 20 ) == [ (1,0), (3,0) ]
+
+
+# Shuffled points of many groups, with repeats across groups
+
+def test_shuffled_with_repeats():
+
+    rand = random.Random( 1 )
+
+    for n in (20, 100, 1000):
+        for k in (1, 3, 20, 1000):
+            points = [ (rand.randint( 0, k ), rand.randint( 0, k )) for i in range(n) ]
+            points += points[:n//4]
+            rand.shuffle( points )
+            assert chanHull( points ) == referenceHull( points )
+
+
+# A hull of more than the first guesses of m points
+
+def test_large_hull():
+
+    points = [ (round( 1e6*math.cos( 2*math.pi*i/600 ) ), round( 1e6*math.sin( 2*math.pi*i/600 ) )) for i in range(600) ]
+    random.Random( 2 ).shuffle( points )
+
+    assert chanHull( points ) == referenceHull( points )
+
+
+# Only the given indices are used
+
+def test_subset():
+
+    store = arrayhull.storeFromPairs( [ (0,0), (10,10), (1,0), (0,1), (1,1), (-10,5) ] )
+
+    verts = chan.chanHull( store, [ 4, 2, 0, 3 ] )
+
+    assert verts == [ 0, 2, 4, 3 ]
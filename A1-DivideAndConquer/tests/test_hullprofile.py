@@ -0,0 +1,80 @@
+# Tests of the hull merge profiler
+
+
+import os, sys, json, subprocess
+
+import pytest
+
+import arrayhull, hullprofile
+
+
+mainScript = os.path.join( os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ), 'main.py' )
+
+
+
+# The instrumented copies keep arrayhull.py's line numbers
+
+def test_line_numbers():
+
+    namespace = dict( vars( arrayhull ) )
+    hullprofile.compileInstrumented( namespace )
+
+    for name in hullprofile.profiledFunctions:
+        original = getattr( arrayhull, name ).__code__
+        copy = namespace[name].__code__
+        assert copy.co_filename == original.co_filename
+        assert copy.co_firstlineno == original.co_firstlineno
+        assert { line for _, _, line in copy.co_lines() } - {None} <= { line for _, _, line in original.co_lines() }
+
+
+# A renamed local leaves nothing to count, which is an error
+
+def test_missing_counters( monkeypatch ):
+
+    def baseHull( store, order, lo, hi ):
+        side = arrayhull.turn( store.xs, store.ys, order[lo], order[lo+1], order[lo+2] )
+
+    monkeypatch.setattr( arrayhull, 'baseHull', baseHull )
+
+    with pytest.raises( RuntimeError, match='baseHull.*turns' ):
+        hullprofile.compileInstrumented( dict( vars( arrayhull ) ) )
+
+
+# The profiled build makes the same hull as buildHull()
+
+def test_profiled_hull():
+
+    store = arrayhull.storeFromPairs( (x,y) for x in range(20) for y in range(20) )
+    order = arrayhull.sortedOrder( store )
+
+    prof = hullprofile.Profile()
+    hullprofile.profile( store, order, prof )
+
+    assert [ (store.xs[i],store.ys[i]) for i in store.hullFrom( order[0] ) ] == [ (0,0), (19,0), (19,19), (0,19) ]
+
+    assert prof.depths[0]['calls'] == 1
+    assert all( stats['turns'] > 0 and stats['walkSteps'] > 0 for stats in prof.depths[:-1] )
+
+
+# main.py -p on a grid, with collinear points
+
+def test_main_profile_grid( tmp_path ):
+
+    inFile = tmp_path / 'grid.txt'
+    inFile.write_text( ''.join( '%d %d\n' % (x,y) for x in range(20) for y in range(20) ) )
+
+    for reportName in ('rep.txt', 'rep.json'):
+
+        reportFile = tmp_path / reportName
+
+        process = subprocess.run( [ sys.executable, mainScript, '-p', str(reportFile), str(inFile) ],
+                                  capture_output=True, text=True, timeout=60 )
+
+        assert process.returncode == 0, process.stderr
+        assert reportFile.exists()
+
+    report = json.loads( (tmp_path / 'rep.json').read_text() )
+
+    assert set( report['stages'] ) == { 'read', 'sort' }
+    assert report['depths'][0]['calls'] == 1
+    assert (tmp_path / 'rep.txt').read_text().startswith( 'read ' )
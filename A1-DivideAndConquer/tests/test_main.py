@@ -0,0 +1,80 @@
+# Tests of main.py's headless modes
+
+
+import os, sys, subprocess
+
+import pytest
+
+
+mainScript = os.path.join( os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ), 'main.py' )
+
+
+
+# Run main.py headless on some lines of points, returning the process
+# and the lines of its output file
+
+def runMain( tmp_path, lines, *options ):
+
+    inFile = tmp_path / 'points.txt'
+    outFile = tmp_path / 'hull.txt'
+
+    inFile.write_text( ''.join( line + '\n' for line in lines ) )
+
+    process = subprocess.run( [ sys.executable, mainScript ] + list(options) + [ '-o', str(outFile), str(inFile) ],
+                              capture_output=True, text=True, timeout=60 )
+
+    output = outFile.read_text().split( '\n' )[:-1] if outFile.exists() else None
+
+    return process, output
+
+
+
+def test_repeated_and_collinear_points( tmp_path ):
+
+    lines = [ '%d %d' % (x,y) for x in range(5) for y in range(5) ] * 2
+
+    process, output = runMain( tmp_path, lines )
+
+    assert process.returncode == 0
+    assert output == [ '0.0 0.0', '4.0 0.0', '4.0 4.0', '0.0 4.0' ]
+
+
+def test_misaligned_rows_are_reported( tmp_path ):
+
+    process, output = runMain( tmp_path, [ '1 2 3', '4', '5 6' ] ) # printf '1 2 3\n4\n5 6\n'
+
+    assert process.returncode == 1
+    assert 'Line 1: point does not have two coordinates.' in process.stdout
+
+
+def test_zero_chunk_size_is_rejected( tmp_path ):
+
+    process, output = runMain( tmp_path, [ '0 0', '1 0', '0 1' ], '-c', '0' )
+
+    assert process.returncode == 1
+    assert 'chunk must be at least 1 point' in process.stdout
+
+
+# -j, -c and -os run headless and write to stdout without -o
+
+@pytest.mark.parametrize( 'options', [ ['-j','2'], ['-c','2'], ['-os'] ] )
+def test_builder_flags_imply_headless( tmp_path, options ):
+
+    inFile = tmp_path / 'points.txt'
+    inFile.write_text( '0 0\n2 0\n1 1\n0 2\n2 2\n' )
+
+    process = subprocess.run( [ sys.executable, mainScript ] + options + [ str(inFile) ],
+                              capture_output=True, text=True, timeout=60 )
+
+    assert process.returncode == 0
+    assert process.stdout.split( '\n' )[:-1] == [ '0.0 0.0', '2.0 0.0', '2.0 2.0', '0.0 2.0' ]
+
+
+@pytest.mark.parametrize( 'options', [ ['-j','2','-os'], ['-c','10','-j','2'], ['-os','-c','10'], ['-p','report.json','-c','10'] ] )
+def test_builder_flags_are_exclusive( tmp_path, options ):
+
+    process, output = runMain( tmp_path, [ '0 0', '1 0', '0 1' ], *options )
+
+    assert process.returncode == 1
+    assert 'only one of -j, -c, -os and -p' in process.stdout
+    assert output is None
@@ -0,0 +1,116 @@
+# Tests of the online hull
+
+
+import math, random
+
+import onlinehull
+from main import Point
+
+
+
+# Return the hull of some (x,y) pairs by Andrew's monotone chain, in
+# CCW order from the leftmost (lowest) point, with no vertex collinear
+# with its neighbours
+
+def referenceHull( points ):
+
+    points = sorted( set( points ) )
+
+    if len(points) < 3:
+        return points
+
+    def cross( o, a, b ):
+        return (a[0]-o[0]) * (b[1]-o[1]) - (a[1]-o[1]) * (b[0]-o[0])
+
+    def chain( points ):
+        result = []
+        for p in points:
+            while len(result) >= 2 and cross( result[-2], result[-1], p ) <= 0:
+                result.pop()
+            result.append( p )
+        return result
+
+    lower = chain( points )
+    upper = chain( reversed( points ) )
+
+    return lower[:-1] + upper[:-1]
+
+
+
+# Return the hull by following the CCW pointers from its first vertex
+
+def pointerHull( hull ):
+
+    verts = hull.hull()
+
+    if len(verts) < 2:
+        return [ (p.x, p.y) for p in verts ]
+
+    start = verts[0]
+    walk = [ start ]
+
+    p = start.ccwPoint
+    while p is not start:
+        walk.append( p )
+        p = p.ccwPoint
+
+    return [ (p.x, p.y) for p in walk ]
+
+
+
+# The hull matches the reference after each insertion
+
+def test_insertions():
+
+    rand = random.Random( 3 )
+
+    for k in (1, 3, 20, 1000):
+
+        hull = onlinehull.OnlineHull()
+        points = []
+
+        for i in range(200):
+            points.append( (rand.randint( 0, k ), rand.randint( 0, k )) )
+            hull.insert( Point( points[-1] ) )
+            assert [ (p.x, p.y) for p in hull.hull() ] == referenceHull( points )
+            assert pointerHull( hull ) == referenceHull( points )
+            assert len(hull) == len( referenceHull( points ) )
+
+
+# Every point on a circle stays on the hull
+
+def test_circle():
+
+    rand = random.Random( 4 )
+
+    points = [ (math.cos( 2*math.pi*i/2000 ), math.sin( 2*math.pi*i/2000 )) for i in range(2000) ]
+    rand.shuffle( points )
+
+    hull = onlinehull.OnlineHull()
+
+    for p in points:
+        assert hull.insert( Point( p ) )
+
+    assert [ (p.x, p.y) for p in hull.hull() ] == referenceHull( points )
+    assert hull.contains( 0, 0 ) and not hull.contains( 1, 1 )
+
+
+# A chain keeps its points in order through insertions and removals
+
+def test_chain():
+
+    chain = onlinehull.Chain()
+
+    points = [ Point( (x, x % 7) ) for x in range(100) ]
+    for p in random.Random( 5 ).sample( points, len(points) ):
+        chain.insert( p )
+
+    for p in points[::3]:
+        chain.remove( p )
+
+    kept = [ p for i, p in enumerate( points ) if i % 3 != 0 ]
+
+    assert chain.points() == kept
+    assert len(chain) == len(kept)
+    assert chain.around( points[4] ) == (points[2], points[4], points[5])
+    assert chain.around( Point( (4.5, 0) ) ) == (points[4], None, points[5])
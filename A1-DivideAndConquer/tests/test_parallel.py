@@ -0,0 +1,27 @@
+# Tests of arrayhull.buildHullParallel()
+
+
+import multiprocessing, random
+
+from array import array
+
+import arrayhull
+
+
+
+def test_spawn_with_memoryview_coordinates():
+
+    rand = random.Random( 1 )
+
+    xs = array( 'd', [ rand.random() for i in range(2000) ] )
+    ys = array( 'd', [ rand.random() for i in range(2000) ] )
+
+    store = arrayhull.PointStore( memoryview(xs), memoryview(ys) ) # as a zero-copy loader would give
+    order = arrayhull.sortedOrder( store )
+
+    arrayhull.buildHullParallel( store, order, 2, mpContext=multiprocessing.get_context( 'spawn' ) )
+
+    serial = arrayhull.PointStore( xs, ys )
+    arrayhull.buildHull( serial, order )
+
+    assert store.hullFrom( order[0] ) == serial.hullFrom( order[0] )
@@ -0,0 +1,63 @@
+from array import array
+
+import pointindex, main
+
+
+# Points of a 10 x 10 grid
+
+def gridIndex():
+
+    xs = array( 'd', ( col for row in range(10) for col in range(10) ) )
+    ys = array( 'd', ( row for row in range(10) for col in range(10) ) )
+
+    return pointindex.GridIndex( xs, ys )
+
+
+# Nearest point and rectangle queries
+
+def test_queries():
+
+    index = gridIndex()
+
+    assert index.nearest( 3.2, 4.1, 1 ) == 43
+    assert index.nearest( 30, 40, 1 ) is None
+    assert sorted( index.inRectangle( 1.5, 1.5, 3.5, 2.5 ) ) == [ 22, 23 ]
+
+
+# Highlights are held by the index
+
+def test_highlight():
+
+    index = gridIndex()
+
+    assert not index.isHighlighted( 5 )
+
+    index.setHighlight( 5, True )
+    index.setHighlight( 7, True )
+    index.setHighlight( 7, False )
+    index.setHighlight( 9, False )
+
+    assert index.isHighlighted( 5 )
+    assert not index.isHighlighted( 7 )
+    assert index.highlighted == { 5 }
+
+
+# A Point in no grid keeps its own highlight, and one in a grid has it
+# kept by the grid
+
+def test_point_highlight():
+
+    p = main.Point( (1,2) )
+
+    assert not p.highlight
+    p.highlight = True
+    assert p.highlight
+
+    q = main.Point( (3,4) )
+    q.index = 12
+    q.grid = gridIndex()
+
+    q.highlight = True
+    assert q.grid.highlighted == { 12 }
+    q.highlight = False
+    assert not q.highlight
@@ -0,0 +1,77 @@
+# Tests of reading point files
+
+
+from array import array
+
+import pytest
+
+import pointio
+
+
+
+def test_parse_chunk():
+
+    xs = array( 'd' )
+    ys = array( 'd' )
+
+    pointio.parseChunk( b'1 2\n3.5 -4\n', 1, xs, ys )
+
+    assert list( xs ) == [ 1, 3.5 ]
+    assert list( ys ) == [ 2, -4 ]
+
+
+# Blank lines do not send a chunk to the line-by-line parser
+
+def test_parse_chunk_with_blank_lines( monkeypatch ):
+
+    def parseLines( *args ):
+        raise AssertionError( 'parsed line by line' )
+
+    monkeypatch.setattr( pointio, 'parseLines', parseLines )
+
+    xs = array( 'd' )
+    ys = array( 'd' )
+
+    pointio.parseChunk( b'1 2\n\n  \n3 4\n', 1, xs, ys )
+
+    assert list( xs ) == [ 1, 3 ]
+    assert list( ys ) == [ 2, 4 ]
+
+
+def test_parse_chunk_rejects_misaligned_rows():
+
+    xs = array( 'd' )
+    ys = array( 'd' )
+
+    with pytest.raises( ValueError, match='Line 1: point does not have two coordinates' ):
+        pointio.parseChunk( b'1 2 3\n4\n5 6\n', 1, xs, ys )
+
+
+def test_read_points_rejects_misaligned_rows( tmp_path ):
+
+    filename = tmp_path / 'points.txt'
+    filename.write_bytes( b'1 2 3\n4\n5 6\n' )
+
+    with pytest.raises( ValueError, match='Line 1:' ):
+        pointio.readPoints( str( filename ) )
+
+
+@pytest.mark.parametrize( 'chunkPoints', [ 0, -1 ] )
+def test_iter_point_chunks_rejects_empty_chunks( tmp_path, chunkPoints ):
+
+    filename = tmp_path / 'points.txt'
+    filename.write_bytes( b'1 2\n3 4\n' )
+
+    with pytest.raises( ValueError, match='at least 1 point' ):
+        pointio.iterPointChunks( str( filename ), chunkPoints )
+
+
+def test_iter_point_chunks( tmp_path ):
+
+    filename = tmp_path / 'points.txt'
+    filename.write_bytes( b''.join( b'%d %d\n' % (i, -i) for i in range(10) ) )
+
+    chunks = list( pointio.iterPointChunks( str( filename ), 4 ) )
+
+    assert [ len(xs) for xs, ys in chunks ] == [ 4, 4, 2 ]
+    assert [ x for xs, ys in chunks for x in xs ] == list( range(10) )
@@ -0,0 +1,305 @@
+# Triangle strip benchmarks
+#
+# Usage: python bench.py benchmark [n ...]
+#
+# Benchmarks, each run on the triangles of data/10000 and on a
+# synthetic mesh of about n triangles (default n = 100000 1000000):
+#
+#   adjacency  times finding the adjacent triangles with the old
+#              formatted-string edge keys and with
+#              trimesh.findAdjacency().  The synthetic mesh is a grid
+#              of squares, each cut into two triangles.  The string
+#              keys are skipped above 'maxStringKeyTris' triangles,
+#              where they need several GB.  n = 10000000 needs about
+#              4 GB for trimesh.findAdjacency() alone.
+#   strips     times making a TriMesh and tristrips.buildTristrips(),
+#              and counts the strips
+#   queue      times buildTristrips() with the old heapq of valences
+#              (which pushes a new entry each time a valence drops and
+#              skips the stale ones) and with the bucket queue, and
+#              reports the largest number of entries in each
+
+
+import sys, os, time, heapq
+from array import array
+
+import trimesh, tristrips
+
+
+maxStringKeyTris = 2000000 # largest run of the string-keyed adjacency
+
+dataDir = os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), 'data' )
+
+
+
+# Time a function call, returning seconds
+
+def timed( f, *args ):
+
+    start = time.perf_counter()
+    f( *args )
+    return time.perf_counter() - start
+
+
+
+# Print a timing
+
+def report( benchmark, n, name, seconds, note='' ):
+
+    print( '%10d  %-28s %8.3f s  %s' % (n, name, seconds, note) )
+
+
+
+# Return the triangle vertices of a k x k grid of squares, two CCW
+# triangles per square, as a flat array('i') of 2*k*k*3 indices into
+# the (k+1)*(k+1) grid vertices
+
+def gridMesh( k ):
+
+    triVerts = array( 'i' )
+
+    for row in range(k):
+        for col in range(k):
+            v = row*(k+1) + col # lower-left corner of the square
+            triVerts.extend( (v, v+1, v+k+2, v, v+k+2, v+k+1) )
+
+    return triVerts
+
+
+
+# Find the adjacent triangles as readTriangles() did before
+# findAdjacency(), with edges keyed by formatted strings
+#
+# Returns a list of the adjacent triangle indices of each triangle.
+
+def stringKeyAdjacency( triVerts ):
+
+    tris = [ triVerts[3*k:3*k+3] for k in range( len(triVerts) // 3 ) ]
+
+    edges = {}
+
+    for t, verts in enumerate( tris ):
+        for i in range(3):
+            v0 = verts[i % 3]
+            v1 = verts[(i+1) % 3]
+            key = '%f-%f' % (v0,v1)
+            edges[key] = t
+
+    adjacent = []
+
+    for verts in tris:
+        adjTris = []
+        for i in range(3):
+            v1 = verts[i % 3] # find a reversed edge of an adjacent triangle
+            v0 = verts[(i+1) % 3]
+            key = '%f-%f' % (v0,v1)
+            if key in edges:
+                adjTris.append( edges[key] )
+        adjacent.append( adjTris )
+
+    return adjacent
+
+
+
+# Time both ways of finding adjacency on some triangles
+
+def timeAdjacency( name, triVerts, numVerts ):
+
+    numTris = len(triVerts) // 3
+
+    if numTris <= maxStringKeyTris:
+        report( 'adjacency', numTris, name + ' string keys', timed( stringKeyAdjacency, triVerts ) )
+
+    start = time.perf_counter()
+    adjacent, nonManifold = trimesh.findAdjacency( triVerts, numVerts )
+    seconds = time.perf_counter() - start
+
+    report( 'adjacency', numTris, name + ' findAdjacency', seconds, '(%d non-manifold edges)' % len(nonManifold) )
+
+
+
+# Return the mesh of data/10000, or None if it is missing
+
+def dataMesh():
+
+    filename = os.path.join( dataDir, '10000' )
+
+    if not os.path.exists( filename ):
+        return None
+
+    with open( filename, 'rb' ) as f:
+        return trimesh.readMesh( f )
+
+
+
+# Return the vertex coordinates of gridMesh( k )
+
+def gridCoords( k ):
+
+    xs = array( 'd', ( col for row in range(k+1) for col in range(k+1) ) )
+    ys = array( 'd', ( row for row in range(k+1) for col in range(k+1) ) )
+
+    return xs, ys
+
+
+
+# Time adjacency on data/10000 and on a grid of about n triangles
+
+def benchAdjacency( n ):
+
+    mesh = dataMesh()
+
+    if mesh is not None:
+        timeAdjacency( 'data/10000', mesh.triVerts, len(mesh.xs) )
+
+    k = max( 1, int( (n/2) ** 0.5 ) )
+
+    timeAdjacency( 'grid', gridMesh( k ), (k+1)*(k+1) )
+
+
+
+# Time strip building on data/10000 and on a grid of about n triangles
+
+def benchStrips( n ):
+
+    k = max( 1, int( (n/2) ** 0.5 ) )
+
+    for name, makeMesh in ( ('data/10000', dataMesh),
+                            ('grid', lambda: trimesh.TriMesh( *gridCoords( k ), gridMesh( k ) )) ):
+
+        start = time.perf_counter()
+        mesh = makeMesh()
+        seconds = time.perf_counter() - start
+
+        if mesh is None:
+            continue
+
+        report( 'strips', len(mesh), name + ' TriMesh', seconds )
+
+        start = time.perf_counter()
+        tristrips.buildTristrips( mesh )
+        seconds = time.perf_counter() - start
+
+        numStrips = sum( 1 for t in range( len(mesh) ) if mesh.prevTri[t] == trimesh.NONE )
+
+        report( 'strips', len(mesh), name + ' buildTristrips', seconds, '(%d strips)' % numStrips )
+
+
+
+# Build strips as buildTristrips() did before its bucket queue, with
+# a heapq of (valence, triangle) entries and valences found again each
+# time they are needed
+#
+# Returns the number of strips and the largest number of heap entries.
+
+def heapTristrips( mesh ):
+
+    NONE = trimesh.NONE
+
+    adjacent = mesh.adjacent
+    nextTri = mesh.nextTri
+    prevTri = mesh.prevTri
+
+    def findValence( mesh, t ): # neighbours with no strip links
+        return sum( 1 for adj in adjacent[3*t:3*t+3] if adj != NONE and nextTri[adj] == NONE and prevTri[adj] == NONE )
+
+    heap = [ (findValence( mesh, t ), t) for t in range( len(mesh) ) ]
+    heapq.heapify( heap )
+
+    count = 0
+    maxEntries = len(heap)
+
+    while heap:
+
+        valence, current = heapq.heappop( heap )
+
+        if nextTri[current] != NONE or prevTri[current] != NONE:
+            continue
+
+        while True:
+
+            best = NONE
+            bestValence = len(mesh)
+
+            for adj in adjacent[3*current:3*current+3]:
+                if adj != NONE and nextTri[adj] == NONE and prevTri[adj] == NONE:
+                    adjValence = findValence( mesh, adj )
+                    if adjValence < bestValence:
+                        bestValence = adjValence
+                        best = adj
+
+            if best == NONE:
+                break
+
+            nextTri[current] = best
+            prevTri[best] = current
+            current = best
+
+            for adj in adjacent[3*best:3*best+3]:
+                if adj != NONE and nextTri[adj] == NONE and prevTri[adj] == NONE:
+                    heapq.heappush( heap, (findValence( mesh, adj ), adj) )
+
+            maxEntries = max( maxEntries, len(heap) )
+
+        count += 1
+
+    return count, maxEntries
+
+
+
+# Time strip building with a heap and with a bucket queue on data/10000
+# and on a grid of about n triangles
+
+def benchQueue( n ):
+
+    k = max( 1, int( (n/2) ** 0.5 ) )
+
+    for name, makeMesh in ( ('data/10000', dataMesh),
+                            ('grid', lambda: trimesh.TriMesh( *gridCoords( k ), gridMesh( k ) )) ):
+
+        mesh = makeMesh()
+
+        if mesh is None:
+            continue
+
+        start = time.perf_counter()
+        numStrips, maxEntries = heapTristrips( mesh )
+        seconds = time.perf_counter() - start
+
+        report( 'queue', len(mesh), name + ' heapq', seconds, '(%d strips, at most %d heap entries)' % (numStrips, maxEntries) )
+
+        mesh = makeMesh()
+
+        start = time.perf_counter()
+        tristrips.buildTristrips( mesh )
+        seconds = time.perf_counter() - start
+
+        numStrips = sum( 1 for t in range( len(mesh) ) if mesh.prevTri[t] == trimesh.NONE )
+
+        report( 'queue', len(mesh), name + ' bucket queue', seconds, '(%d strips, at most %d queue entries)' % (numStrips, len(mesh)) )
+
+
+
+# Run the benchmark named on the command line
+
+def runBenchmarks():
+
+    args = sys.argv[1:]
+
+    if len(args) < 1 or args[0] not in benchmarks:
+        print( 'Usage: %s %s [n ...]' % (sys.argv[0], '|'.join(sorted(benchmarks))) )
+        sys.exit(1)
+
+    sizes = [ int(float(a)) for a in args[1:] ] or [ 100000, 1000000 ]
+
+    for n in sizes:
+        benchmarks[ args[0] ]( n )
+
+
+benchmarks = { 'adjacency': benchAdjacency,
+               'strips':    benchStrips,
+               'queue':     benchQueue }
+
+
+if __name__ == '__main__':
+    runBenchmarks()
@@ -0,0 +1,48 @@
+# Tests of finding adjacent triangles by packed edge keys
+
+
+from array import array
+
+from trimesh import findAdjacency, NONE
+
+
+
+# Two triangles joined across edge 1-2
+
+def test_shared_edge():
+
+    adjacent, nonManifold = findAdjacency( array( 'i', [ 0,1,2, 2,1,3 ] ), 4 )
+
+    assert list( adjacent ) == [ NONE, 1, NONE,  0, NONE, NONE ]
+    assert nonManifold == []
+
+
+# An edge on three triangles, and one on two triangles with the same
+# orientation, joins no triangles
+
+def test_non_manifold_edges():
+
+    adjacent, nonManifold = findAdjacency( array( 'i', [ 0,1,2, 1,0,3, 1,0,4 ] ), 5 )
+
+    assert list( adjacent ) == [ NONE ] * 9
+    assert nonManifold == [ (1,0) ]
+
+    adjacent, nonManifold = findAdjacency( array( 'i', [ 0,1,2, 0,1,3, 3,1,4 ] ), 5 )
+
+    assert list( adjacent ) == [ NONE, NONE, NONE,  NONE, 2, NONE,  1, NONE, NONE ]
+    assert nonManifold == [ (0,1) ]
+
+
+# Keys of large vertex indices (past 32 bits when packed) give the same
+# adjacency as small ones
+
+def test_large_vertex_indices():
+
+    small = array( 'i', [ 0,1,2, 2,1,3, 3,1,4, 4,1,0 ] )
+
+    numVerts = 3000000
+    large = array( 'i', ( numVerts-1-v for v in small ) )
+
+    assert (numVerts-1) * numVerts > 2**32
+
+    assert findAdjacency( large, numVerts ) == findAdjacency( small, 5 )
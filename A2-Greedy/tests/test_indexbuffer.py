@@ -0,0 +1,88 @@
+# Tests of writing strips as GL_TRIANGLE_STRIP index buffers
+
+
+import os
+
+import pytest
+
+import trimesh, tristrips, bench
+
+
+dataDir = os.path.join( os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ), 'data' )
+
+
+
+# Return a triangle's vertices starting from its smallest, keeping its
+# winding
+
+def canonical( tri ):
+
+    k = tri.index( min(tri) )
+
+    return tri[k:] + tri[:k]
+
+
+
+# Decode an index buffer as GL_TRIANGLE_STRIP with primitive restart
+#
+# Triangle k of each strip is drawn from indices k, k+1 and k+2, with
+# the first two swapped when k is odd.  Degenerate triangles (with a
+# repeated index) are left out.
+
+def decodeStrips( indices, restart ):
+
+    strips = [ [] ]
+
+    for i in indices:
+        if i == restart:
+            strips.append( [] )
+        else:
+            strips[-1].append( i )
+
+    tris = []
+
+    for strip in strips:
+        for k in range( len(strip) - 2 ):
+            a, b, c = strip[k:k+3]
+            if a != b and b != c and a != c:
+                tris.append( canonical( (a,b,c) if k % 2 == 0 else (b,a,c) ) )
+
+    return tris
+
+
+
+# Return the mesh of a data file, or of a grid of more than 0xFFFF
+# vertices
+
+def makeMesh( name ):
+
+    if name == 'grid':
+        return trimesh.TriMesh( *bench.gridCoords( 256 ), bench.gridMesh( 256 ) )
+
+    with open( os.path.join( dataDir, name ), 'rb' ) as f:
+        return trimesh.readMesh( f )
+
+
+
+# Decoding the buffer gives back exactly the mesh's triangles, with
+# their winding, whether the strips are restarted or stitched
+
+@pytest.mark.parametrize( 'name', [ '200', '1000', '10000', 'grid' ] )
+def test_index_buffer_draws_the_mesh( name ):
+
+    mesh = makeMesh( name )
+
+    tristrips.buildTristrips( mesh )
+
+    expected = sorted( canonical( tuple( mesh.triVerts[3*t:3*t+3] ) ) for t in range( len(mesh) ) )
+
+    for stitch in (False, True):
+
+        indices, restart = trimesh.indexBuffer( mesh, stitch )
+
+        assert indices.typecode == ('H' if len(mesh.xs) < 0xFFFF else 'I')
+
+        if stitch:
+            assert restart not in indices
+
+        assert sorted( decodeStrips( indices, restart ) ) == expected
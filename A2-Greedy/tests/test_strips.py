@@ -0,0 +1,95 @@
+# Tests of the strip builder's bucket queue and valences
+
+
+import os
+
+import pytest
+
+import trimesh, tristrips
+from trimesh import NONE
+
+
+dataDir = os.path.join( os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ), 'data' )
+
+
+
+# Return the mesh of a data file
+
+def dataMesh( name ):
+
+    with open( os.path.join( dataDir, name ), 'rb' ) as f:
+        return trimesh.readMesh( f )
+
+
+
+# Items move between buckets of every key, and pop comes from the
+# lowest non-empty bucket
+
+def test_bucket_queue():
+
+    queue = tristrips.BucketQueue( 8, 3 )
+
+    for item in range(8):
+        queue.push( item, item % 4 )
+
+    assert len(queue) == 8
+
+    queue.update( 3, 0 ) # 3 -> 0
+    queue.update( 4, 3 ) # 0 -> 3
+    queue.update( 5, 2 ) # 1 -> 2
+    queue.update( 6, 6 % 4 ) # unchanged
+    queue.remove( 0 )
+
+    assert 0 not in queue and 1 in queue
+
+    popped = [ queue.pop() for i in range(7) ]
+
+    assert popped == [ 3, 1, 5, 6, 2, 4, 7 ] # by key, and last pushed first within a key
+    assert len(queue) == 0
+    assert queue.pop() == NONE
+
+
+
+# A BucketQueue that checks, at each pop, that every queued triangle is
+# keyed by its valence as findValence() counts it
+
+class CheckedQueue(tristrips.BucketQueue):
+
+    mesh = None
+
+    def pop( self ):
+
+        for t in range( len(self.mesh) ):
+            if t in self:
+                assert self.keys[t] == tristrips.findValence( self.mesh, t )
+
+        return super().pop()
+
+
+
+# The valences kept up to date as triangles join strips match
+# findValence()
+
+@pytest.mark.parametrize( 'name', [ '200', '1000' ] )
+def test_incremental_valences( monkeypatch, name ):
+
+    mesh = dataMesh( name )
+
+    CheckedQueue.mesh = mesh
+    monkeypatch.setattr( tristrips, 'BucketQueue', CheckedQueue )
+
+    tristrips.buildTristrips( mesh )
+
+    assert all( mesh.isOnStrip )
+
+    # Each link joins adjacent triangles, and each triangle is on one strip
+
+    onStrips = []
+    for t in range( len(mesh) ):
+        if mesh.prevTri[t] == NONE:
+            strip = mesh.stripFrom( t )
+            for a, b in zip( strip, strip[1:] ):
+                assert b in mesh.adjacentTris( a ) and mesh.prevTri[b] == a
+            onStrips.extend( strip )
+
+    assert sorted( onStrips ) == list( range( len(mesh) ) )
@@ -0,0 +1,390 @@
+# Array-backed triangle mesh
+#
+# A TriMesh holds the mesh that tristrips.py builds strips on as a few
+# typed arrays instead of a Triangle object per triangle: vertex
+# coordinates in array('d') buffers, and the vertices, adjacent
+# triangles and strip links of each triangle in array('i') buffers
+# (and whether it is on a strip in a bytearray).
+# A triangle costs 33 bytes plus its share of the vertices instead of
+# a Python object with a __dict__, three tuples and a list.
+#
+# A triangle is referred to by its index into the mesh.  A link of
+# NONE means that there is no such triangle (like a None pointer on a
+# Triangle).  Things that are only needed to draw the mesh, such as
+# centroids, are computed when they are asked for.
+
+
+import operator
+from array import array
+from collections import deque
+from itertools import chain, repeat
+from fractions import Fraction
+
+
+NONE = -1 # link to no triangle
+
+
+
+# TriMesh
+#
+# 'xs' and 'ys' are the vertex coordinates and 'triVerts' holds the
+# three vertex indices of each triangle in turn, CCW.  The adjacent
+# triangles are found with findAdjacency(), and the strip links start
+# out as NONE, with no triangle on a strip.
+
+class TriMesh(object):
+
+    def __init__( self, xs, ys, triVerts ):
+
+        if len(xs) != len(ys):
+            raise ValueError( 'x and y coordinate counts differ (%d and %d)' % (len(xs),len(ys)) )
+
+        self.xs = xs # vertex coordinates
+        self.ys = ys
+
+        self.triVerts = triVerts # 3 vertices of each triangle
+
+        self.adjacent, self.nonManifold = findAdjacency( triVerts, len(xs) ) # 3 adjacent triangles of each triangle
+
+        numTris = len(triVerts) // 3
+
+        self.nextTri = array( 'i', [NONE] ) * numTris # next triangle on each triangle's strip
+        self.prevTri = array( 'i', [NONE] ) * numTris # previous triangle on each triangle's strip
+
+        self.isOnStrip = bytearray( numTris ) # whether each triangle is on a strip
+
+
+    def __len__(self):
+        return len(self.nextTri)
+
+
+    def __repr__(self):
+        return 'TriMesh(%d vertices, %d triangles)' % (len(self.xs), len(self))
+
+
+    # Return the triangles adjacent to triangle t
+
+    def adjacentTris( self, t ):
+
+        return [ a for a in self.adjacent[3*t:3*t+3] if a != NONE ]
+
+
+    # Return the vertex coordinates of triangle t as three (x,y) tuples
+
+    def corners( self, t ):
+
+        return [ (self.xs[v], self.ys[v]) for v in self.triVerts[3*t:3*t+3] ]
+
+
+    # Return the centroid of triangle t
+
+    def centroid( self, t ):
+
+        a, b, c = self.triVerts[3*t:3*t+3]
+
+        return ( (self.xs[a] + self.xs[b] + self.xs[c]) / 3,
+                 (self.ys[a] + self.ys[b] + self.ys[c]) / 3 )
+
+
+    # Return the triangles of the strip starting at triangle t
+
+    def stripFrom( self, t ):
+
+        strip = []
+
+        while t != NONE:
+            strip.append( t )
+            t = self.nextTri[t]
+
+        return strip
+
+
+
+# Determine whether three points make a left or right turn
+#
+# The floating-point determinant is used if it is farther from zero
+# than its rounding error can be (Shewchuk's bound, as in
+# A1-DivideAndConquer/predicates.py).  Otherwise it is computed again
+# exactly with Fractions, so a nearly degenerate triangle is never
+# mistaken for a degenerate one, or the reverse.
+
+LEFT_TURN  = 1
+RIGHT_TURN = 2
+COLLINEAR  = 3
+
+turnErrBound = (3 + 16*2.0**-53) * 2.0**-53 # relative error bound of the determinant
+
+def turn( a, b, c ):
+
+    detLeft  = (a[0]-c[0]) * (b[1]-c[1])
+    detRight = (b[0]-c[0]) * (a[1]-c[1])
+
+    det = detLeft - detRight
+
+    if abs(det) <= turnErrBound * (abs(detLeft) + abs(detRight)): # too close to call
+        a, b, c = [ (Fraction(p[0]), Fraction(p[1])) for p in (a,b,c) ]
+        det = (a[0]-c[0]) * (b[1]-c[1]) - (b[0]-c[0]) * (a[1]-c[1])
+
+    if det > 0:
+        return LEFT_TURN
+    elif det < 0:
+        return RIGHT_TURN
+    else:
+        return COLLINEAR
+
+
+
+# Find the triangles adjacent to each triangle
+#
+# 'triVerts' holds the three vertex indices of each triangle in turn,
+# CCW, and every vertex index is less than 'numVerts'.  Triangle k is
+# adjacent to triangle j across its edge v0->v1 if triangle j has the
+# reversed edge v1->v0.
+#
+# Returns (adjacent, nonManifold).  'adjacent' is an array('i') with
+# three entries per triangle: the index of the triangle across each of
+# its edges (v0->v1, v1->v2, v2->v0), or NONE if there is none.
+# 'nonManifold' lists the (v0,v1) edges that are on two triangles in
+# the same direction, which happens if an edge is on three or more
+# triangles or the triangles on it are not consistently oriented.
+# Such an edge has no triangle joined across it in either direction.
+#
+# Each directed edge v0->v1 is keyed by the integer v0*numVerts + v1,
+# and one dict maps each key to its triangle.  The keys are made and
+# looked up with map() and itertools rather than in a Python loop.
+
+def findAdjacency( triVerts, numVerts ):
+
+    numTris = len(triVerts) // 3
+
+    firsts  = triVerts[0::3]
+    seconds = triVerts[1::3]
+    thirds  = triVerts[2::3]
+
+    sides = ( (firsts, seconds), (seconds, thirds), (thirds, firsts) ) # the three edges of every triangle
+
+    def edgeKeys( v0s, v1s ):
+        return map( operator.add, map( operator.mul, v0s, repeat( numVerts ) ), v1s )
+
+    edges = dict( zip( chain.from_iterable( edgeKeys( v0s, v1s ) for v0s, v1s in sides ),
+                       chain.from_iterable( repeat( range(numTris), 3 ) ) ) )
+
+    # Look up each reversed edge
+
+    adjacent = array( 'i', [NONE] ) * (3*numTris)
+
+    for i, (v0s, v1s) in enumerate( sides ):
+        adjacent[i::3] = array( 'i', map( edges.get, edgeKeys( v1s, v0s ), repeat( NONE ) ) )
+
+    if len(edges) == 3*numTris: # no edge is repeated
+        return adjacent, []
+
+    # Find the repeated edges (the dict kept the last triangle of each)
+    # and cut the adjacencies across them
+
+    nonManifold = set()
+
+    for v0s, v1s in sides:
+        for k, key in enumerate( edgeKeys( v0s, v1s ) ):
+            if edges[key] != k:
+                nonManifold.add( key )
+
+    for i, (v0s, v1s) in enumerate( sides ):
+        for k, (v0, v1) in enumerate( zip( v0s, v1s ) ):
+            if v0*numVerts + v1 in nonManifold or v1*numVerts + v0 in nonManifold:
+                adjacent[3*k+i] = NONE
+
+    return adjacent, sorted( divmod( key, numVerts ) for key in nonManifold )
+
+
+
+# Read a mesh from a file (see data/format)
+#
+# Degenerate triangles (with collinear vertices) are left out.  Errors
+# in the file are printed with their line numbers, and None is
+# returned if there are any.
+
+def readMesh( f ):
+
+    errorsFound = False
+
+    lines = f.readlines()
+
+    # Read the vertices
+
+    numVerts = int( lines[0] )
+
+    xs = array( 'd' )
+    ys = array( 'd' )
+
+    for l, line in enumerate( lines[1:numVerts+1] ):
+        v = line.split()
+        if len(v) != 2:
+            print( 'Line %d: vertex does not have two coordinates.' % (l+2) )
+            errorsFound = True
+        else:
+            xs.append( float(v[0]) )
+            ys.append( float(v[1]) )
+
+    # Read the triangles, checking that their vertices are valid
+
+    numTris = int( lines[numVerts+1] )
+
+    triVerts = array( 'i' )
+
+    for l, line in enumerate( lines[numVerts+2:] ):
+        tvs = [ int(v) for v in line.split() ]
+        if len(tvs) != 3:
+            print( 'Line %d: triangle does not have three vertices.' % (l+2+numVerts) )
+            errorsFound = True
+        else:
+            for v in tvs:
+                if v < 0 or v >= numVerts:
+                    print( 'Line %d: Vertex index is not in range [0,%d].' % (l+2+numVerts,numVerts-1) )
+                    errorsFound = True
+            triVerts.extend( tvs )
+
+    print( 'Read %d points and %d triangles' % (numVerts,numTris) )
+
+    if errorsFound:
+        return None
+
+    # Leave out degenerate triangles
+
+    kept = array( 'i' )
+
+    for t in range( len(triVerts) // 3 ):
+        a, b, c = triVerts[3*t:3*t+3]
+        if turn( (xs[a],ys[a]), (xs[b],ys[b]), (xs[c],ys[c]) ) != COLLINEAR:
+            kept.extend( (a, b, c) )
+
+    mesh = TriMesh( xs, ys, kept )
+
+    for v0, v1 in mesh.nonManifold:
+        print( 'Edge %d-%d is non-manifold (on more than two triangles, or on two with the same orientation); no triangles are joined across it.' % (v0,v1) )
+
+    return mesh
+
+
+
+# Return the vertex indices of the strip starting at triangle t, as
+# drawn with GL_TRIANGLE_STRIP
+#
+# Triangle k of the strip is drawn from indices k, k+1 and k+2, with
+# the first two swapped when k is odd, so every triangle keeps its CCW
+# order.  Each triangle adds one index, its vertex that is not on the
+# edge it shares with the triangle before.  The next triangle must
+# share an edge with the last two indices.  If it instead shares the
+# edge that joins the new vertex to the third-last index, that index
+# is repeated before the new vertex (a "swap"), which adds a
+# degenerate triangle.
+
+def stripIndices( mesh, t ):
+
+    triVerts = mesh.triVerts
+
+    strip = mesh.stripFrom( t )
+
+    a, b, c = triVerts[3*t:3*t+3]
+
+    if len(strip) == 1:
+        return [ a, b, c ]
+
+    # Start with the vertex that is not on the edge shared with the
+    # second triangle
+
+    second = triVerts[3*strip[1]:3*strip[1]+3]
+    for i in range(3):
+        if a not in second:
+            break
+        a, b, c = b, c, a
+
+    indices = [ a, b, c ]
+
+    for k in range( 1, len(strip) ):
+
+        t = strip[k]
+        u = indices[-2]
+        v = indices[-1]
+
+        w = sum( triVerts[3*t:3*t+3] ) - u - v # vertex not on the shared edge u-v
+
+        if k+1 < len(strip) and v not in triVerts[3*strip[k+1]:3*strip[k+1]+3]: # the next triangle shares edge u-w
+            indices.append( u )
+
+        indices.append( w )
+
+    return indices
+
+
+
+# Return an index buffer of all of the strips of a mesh
+#
+# The indices are unsigned 16-bit if every vertex index fits below
+# 0xFFFF, and 32-bit otherwise.  The strips are separated by a
+# primitive restart index (0xFFFF or 0xFFFFFFFF), or if 'stitch' is
+# True, are joined into one strip by repeating the last index of each
+# strip and the first of the next, which adds degenerate triangles.
+# Another repeat is added if needed so that each strip starts at an
+# even index and keeps its triangles' CCW order.
+#
+# Returns (indices, restart), where 'indices' is an array.
+
+def indexBuffer( mesh, stitch=False ):
+
+    if len(mesh.xs) < 0xFFFF:
+        indices = array( 'H' )
+        restart = 0xFFFF
+    else:
+        indices = array( 'I' )
+        restart = 0xFFFFFFFF
+
+    for t in range( len(mesh) ):
+
+        if mesh.prevTri[t] != NONE: # not the first triangle of a strip
+            continue
+
+        strip = stripIndices( mesh, t )
+
+        if len(indices) > 0:
+            if not stitch:
+                indices.append( restart )
+            else:
+                if len(indices) % 2 == 1:
+                    indices.append( indices[-1] )
+                indices.append( indices[-1] )
+                indices.append( strip[0] )
+
+        indices.extend( strip )
+
+    return indices, restart
+
+
+
+# Return the average cache miss ratio (ACMR) of an index buffer: the
+# number of vertices that miss a FIFO post-transform vertex cache of
+# 'cacheSize' entries, per triangle
+#
+# This is 3 with no vertex reuse.  The strips of a large regular mesh
+# approach 1, and a cache-optimized indexed list about 0.5 to 0.7.
+
+def cacheMissRatio( indices, numTris, cacheSize, restart=None ):
+
+    cache = deque()
+    isCached = set()
+
+    misses = 0
+
+    for i in indices:
+
+        if i == restart:
+            continue
+
+        if i not in isCached:
+            misses += 1
+            cache.append( i )
+            isCached.add( i )
+            if len(cache) > cacheSize:
+                isCached.discard( cache.popleft() )
+
+    return misses / max( numTris, 1 )
@@ -1,26 +1,48 @@
 # Triangle strips
 #
-# Usage: python tristrips.py file_of_triangles
+# Usage: python tristrips.py [-o outfile] [-s] file_of_triangles
+#
+#   -o runs headless: no window is opened and the strips are written
+#      to 'outfile' as a binary index buffer for GL_TRIANGLE_STRIP
+#      (see trimesh.indexBuffer()): little-endian unsigned 16-bit
+#      indices if there are fewer than 65535 vertices, else 32-bit,
+#      with the strips separated by primitive restart indices (0xFFFF
+#      or 0xFFFFFFFF).  The vertex cache miss ratio of the buffer is
+#      printed.
+#   -s joins the strips with degenerate triangles instead of restart
+#      indices
 #
 # You can press ESC in the window to exit.
 #
 # You'll need Python 3 and must install these packages:
 #
 #   PyOpenGL, GLFW
+#
+# (These are not needed with -o, or when this file is imported as a module.)
 
 
 import sys, os, math, random
-import heapq
+from array import array
+
+from trimesh import NONE, LEFT_TURN, turn
+import trimesh
+
+
+# Headless runs never import OpenGL or GLFW and never call display()
+
+headless = __name__ != '__main__' or '-o' in sys.argv[1:]
+
+if not headless:
 
-try: # PyOpenGL
+  try: # PyOpenGL
     from OpenGL.GL import *
-except:
+  except:
     print( 'Error: PyOpenGL has not been installed.' )
     sys.exit(0)
 
-try: # GLFW
+  try: # GLFW
     import glfw
-except:
+  except:
     print( 'Error: GLFW has not been installed.' )
     sys.exit(0)
 
@@ -39,7 +61,14 @@ maxY = None
 
 r  = 0.008 # point radius as fraction of window size
 
-allVerts = [] # all triangle vertices
+mesh = None # the TriMesh of all triangles
+
+highlight1 = None # for each triangle, whether to highlight it in colour 1
+highlight2 = None # for each triangle, whether to highlight it in colour 2
+
+triColours = None # colour of each triangle (see stripColours())
+
+cacheSizes = (16, 32) # FIFO vertex cache sizes of the miss ratios printed by -o
 
 lastKey = None  # last key pressed
 
@@ -73,121 +102,113 @@ colour = Colour()
 
 
 
-# Triangle
+# Draw triangle t
 #
-# A Triangle stores its three vertices and pointers to any adjacent triangles.
-#
-# For debugging, you can set the 'highlight1' and 'highlight2' flags
-# of a triangle.  This will cause the triangle to be highlighted when
-# it's drawn.
+# For debugging, you can set highlight1[t] or highlight2[t].  This
+# will cause the triangle to be highlighted when it's drawn.
 
+def drawTriangle( t ):
 
-class Triangle(object):
+    corners = mesh.corners( t )
 
-    nextID = 0
+    # Highlight with yellow fill
 
-    def __init__( self, verts ):
+    if highlight1[t] or highlight2[t]:
 
-        self.verts   = verts # 3 vertices.  Each is an index into the 'allVerts' global.
-        self.adjTris = [] # adjacent triangles
-        self.isOnStrip = False  #not being used
+        if highlight1[t]:
+            glColor3f( 0.9, 0.9, 0.4 ) # dark yellow
+        else:
+            glColor3f( 1, 1, 0.8 ) # light yellow
 
-        self.nextTri = None  # next triangle on strip
-        self.prevTri = None  # previous triangle on strip
+        glPolygonMode( GL_FRONT_AND_BACK, GL_LINE )
+        glBegin( GL_POLYGON )
+        for x, y in corners:
+            glVertex2f( x, y )
+        glEnd()
 
-        self.highlight1 = False # to cause drawing to highlight this triangle in colour 1
-        self.highlight2 = False # to cause drawing to highlight this triangle in colour 2
+    # Outline the triangle
 
-        self.centroid = ( sum( [allVerts[i][0] for i in self.verts] ) / len(self.verts),
-                          sum( [allVerts[i][1] for i in self.verts] ) / len(self.verts) )
+    if showTriangleBackground:
+        c = triColours[t]
+        glPolygonMode( GL_FRONT_AND_BACK, GL_FILL )
+        glColor3f( c[0], c[1], c[2] )
+        glBegin( GL_POLYGON )
+        for x, y in corners:
+            glVertex2f( x, y )
+        glEnd()
 
-        self.colour = colour.nextColour()
+    if outlineTriangles:
+        glPolygonMode( GL_FRONT_AND_BACK, GL_LINE )
+        glColor3f( 0, 0, 0 )
+        glBegin( GL_LINE_LOOP )
+        for x, y in corners:
+            glVertex2f( x, y )
+        glEnd()
 
 
-        self.valence = None
-    
-        self.id = Triangle.nextID
-        Triangle.nextID += 1
 
+# Draw edges from triangle t to the next and previous triangle on its strip
 
-    # String representation of this triangle
-    
-    def __repr__(self):
-        return 'tri-%d' % self.id
+def drawPointers( t ):
 
+    if showTriangleBackground:
+        glColor3f( 1,1,1 )
+    else:
+        glColor3f( 0,0,0 )
 
-    # Draw this triangle
-    
-    def draw(self):
+    nextTri = mesh.nextTri[t]
+    prevTri = mesh.prevTri[t]
 
-        # Highlight with yellow fill
+    centroid = mesh.centroid( t )
 
-        if self.highlight1 or self.highlight2:
+    if showForwardLinks and nextTri != NONE:
+        other = mesh.centroid( nextTri )
+        drawSegment( centroid[0], centroid[1], other[0], other[1] )
 
-            if self.highlight1:
-                glColor3f( 0.9, 0.9, 0.4 ) # dark yellow
-            else:
-                glColor3f( 1, 1, 0.8 ) # light yellow
+    if not showForwardLinks and prevTri != NONE:
+        other = mesh.centroid( prevTri )
+        drawSegment( centroid[0], centroid[1], other[0], other[1] )
 
-            glPolygonMode( GL_FRONT_AND_BACK, GL_LINE )
-            glBegin( GL_POLYGON )
-            for i in self.verts:
-                glVertex2f( allVerts[i][0], allVerts[i][1] )
-            glEnd()
+    if nextTri == NONE and prevTri == NONE: # no links.  Draw a dot.
+        glPolygonMode( GL_FRONT_AND_BACK, GL_FILL )
+        glBegin( GL_POLYGON )
+        for i in range(100):
+            theta = 3.14159 * i/50.0
+            glVertex2f( centroid[0] + 0.5 * r * math.cos(theta), centroid[1] + 0.5 * r * math.sin(theta) ) 
+        glEnd()
 
-        # Outline the triangle
 
-        if showTriangleBackground:
-            glPolygonMode( GL_FRONT_AND_BACK, GL_FILL )
-            glColor3f( self.colour[0], self.colour[1], self.colour[2] )
-            glBegin( GL_POLYGON )
-            for i in self.verts:
-                glVertex2f( allVerts[i][0], allVerts[i][1] )
-            glEnd()
 
-        if outlineTriangles:
-            glPolygonMode( GL_FRONT_AND_BACK, GL_LINE )
-            glColor3f( 0, 0, 0 )
-            glBegin( GL_LINE_LOOP )
-            for i in self.verts:
-                glVertex2f( allVerts[i][0], allVerts[i][1] )
-            glEnd()
+# Determine whether triangle t contains a point
 
+def containsPoint( t, pt ):
 
-    # Draw edges to next and previous triangle on the strip
+    a, b, c = mesh.corners( t )
 
-    def drawPointers(self):
+    return (turn( a, b, pt ) == LEFT_TURN and
+            turn( b, c, pt ) == LEFT_TURN and
+            turn( c, a, pt ) == LEFT_TURN)
 
-        if showTriangleBackground:
-            glColor3f( 1,1,1 )
-        else:
-            glColor3f( 0,0,0 )
 
-        if showForwardLinks and self.nextTri:
-            drawSegment( self.centroid[0], self.centroid[1], 
-                         self.nextTri.centroid[0], self.nextTri.centroid[1] )
 
-        if not showForwardLinks and self.prevTri:
-            drawSegment( self.centroid[0], self.centroid[1], 
-                         self.prevTri.centroid[0], self.prevTri.centroid[1] )
+# Give each strip one colour
+#
+# Returns the colour of each triangle.  The colours are only needed
+# for drawing, so they are made on the first display, after the strips
+# have been built.
 
-        if not self.nextTri and not self.prevTri: # no links.  Draw a dot.
-            glPolygonMode( GL_FRONT_AND_BACK, GL_FILL )
-            glBegin( GL_POLYGON )
-            for i in range(100):
-                theta = 3.14159 * i/50.0
-                glVertex2f( self.centroid[0] + 0.5 * r * math.cos(theta), self.centroid[1] + 0.5 * r * math.sin(theta) ) 
-            glEnd()
+def stripColours():
 
+    colours = [ None ] * len(mesh)
 
-    # Determine whether this triangle contains a point
-    
-    def containsPoint( self, pt ):
+    for t in range( len(mesh) ):
+        if mesh.prevTri[t] == NONE: # start of a strip
+            c = colour.nextColour()
+            for s in mesh.stripFrom( t ):
+                colours[s] = c
+
+    return colours
 
-        return (turn( allVerts[self.verts[0]], allVerts[self.verts[1]], pt ) == LEFT_TURN and
-                turn( allVerts[self.verts[1]], allVerts[self.verts[2]], pt ) == LEFT_TURN and
-                turn( allVerts[self.verts[2]], allVerts[self.verts[0]], pt ) == LEFT_TURN)
-      
 
 
 
@@ -202,86 +223,164 @@ def drawSegment( x0,y0, x1,y1 ):
       
       
 
-# Determine whether three points make a left or right turn
+# BucketQueue
+#
+# A priority queue of items 0 ... numItems-1 with small integer keys
+# 0 ... maxKey.  Each key has a bucket, a doubly linked list of the
+# items with that key, threaded through the 'nextItem' and 'prevItem'
+# arrays.  Pushing, removing and changing the key of an item take O(1)
+# time, and popping takes O(maxKey).  An item is in the queue at most
+# once, so the queue never holds stale entries.
 
-LEFT_TURN  = 1
-RIGHT_TURN = 2
-COLLINEAR  = 3
+class BucketQueue(object):
 
-def turn( a, b, c ):
+    def __init__( self, numItems, maxKey ):
 
-    det = (a[0]-c[0]) * (b[1]-c[1]) - (b[0]-c[0]) * (a[1]-c[1])
+        self.heads = array( 'i', [NONE] ) * (maxKey+1) # first item of each bucket
 
-    if det > 0:
-        return LEFT_TURN
-    elif det < 0:
-        return RIGHT_TURN
-    else:
-        return COLLINEAR
+        self.nextItem = array( 'i', [NONE] ) * numItems # next item in the same bucket
+        self.prevItem = array( 'i', [NONE] ) * numItems # previous item in the same bucket
+
+        self.keys = array( 'b', [-1] ) * numItems # key of each item, or -1 if not in the queue
+
+        self.size = 0
+
+
+    def __len__(self):
+        return self.size
+
+
+    def __repr__(self):
+        return 'BucketQueue(%d items, bucket sizes %s)' % (self.size, [ self.keys.count(k) for k in range( len(self.heads) ) ])
+
+
+    def __contains__( self, item ):
+        return self.keys[item] >= 0
+
+
+    # Add an item that is not in the queue
+
+    def push( self, item, key ):
+
+        head = self.heads[key]
+
+        self.nextItem[item] = head
+        self.prevItem[item] = NONE
+        if head != NONE:
+            self.prevItem[head] = item
+
+        self.heads[key] = item
+        self.keys[item] = key
+        self.size += 1
+
+
+    # Remove an item that is in the queue
+
+    def remove( self, item ):
+
+        nextItem = self.nextItem[item]
+        prevItem = self.prevItem[item]
+
+        if prevItem != NONE:
+            self.nextItem[prevItem] = nextItem
+        else:
+            self.heads[ self.keys[item] ] = nextItem
+
+        if nextItem != NONE:
+            self.prevItem[nextItem] = prevItem
+
+        self.keys[item] = -1
+        self.size -= 1
+
+
+    # Change the key of an item that is in the queue
+
+    def update( self, item, key ):
 
+        if self.keys[item] != key:
+            self.remove( item )
+            self.push( item, key )
 
-# Build a set of triangle strips that cover all of the given
-# triangles.  The goal is to make the strips as long as possible
+
+    # Remove and return an item with the smallest key, or NONE if the
+    # queue is empty
+
+    def pop( self ):
+
+        for head in self.heads:
+            if head != NONE:
+                self.remove( head )
+                return head
+
+        return NONE
+
+
+
+# Build a set of triangle strips that cover all of the triangles of a
+# TriMesh.  The goal is to make the strips as long as possible
 # (i.e. to have the fewest strip that cover all triangles).
 #
 # Follow the instructions in A2.txt.
 #
-# When adding a new triangle to an existing strip, copy the strip's colour to
-# the new triangle, so that all triangles on a strip have the same colour.
-#
 # This function does not return anything.  The strips are formed by
-# modifying the 'nextTri' and 'prevTri' pointers in each triangle.
+# modifying the mesh's 'nextTri' and 'prevTri' links of each triangle,
+# and each triangle's 'isOnStrip' flag is set.  Triangles are drawn in
+# the colour of their strip (see stripColours()).
 
-def buildTristrips(triangles):
+def buildTristrips(mesh):
     count = 0  #track the number of strips generated
 
-    #precompute a min heap containing the valance of all the triangles (takes O(nlogn))
-    heap = precomputeValences(triangles)
+    adjacent = mesh.adjacent
+    nextTri = mesh.nextTri
+    prevTri = mesh.prevTri
+    isOnStrip = mesh.isOnStrip
+
+    #count the neighbours of each triangle that are not on a strip (its valence), and put every triangle
+    #not yet on a strip in a bucket queue by its valence (0 to 3), in O(n)
+    valences = precomputeValences(mesh)
+    queue = BucketQueue(len(mesh), 3)
+    for tri in reversed(range(len(mesh))): #pushed in reverse so that triangles with equal valence are popped in index order
+        if not isOnStrip[tri]:
+            queue.push(tri, valences[tri])
+
+    #put a triangle on a strip: take it out of the queue, and decrement the valence of each neighbour,
+    #moving the queued ones to the bucket of their new valence. this is a true decrease-key, so nothing goes stale
+    def addToStrip(tri):
+        isOnStrip[tri] = 1
+        if tri in queue:
+            queue.remove(tri)
+        for adj_tri in adjacent[3*tri:3*tri+3]:
+            if adj_tri != NONE:
+                valences[adj_tri] -= 1
+                if adj_tri in queue:
+                    queue.update(adj_tri, valences[adj_tri])
     
     #iterate through all triangles to start new strips
-    while heap:
-
-        #pop the min valance triangle
-        valence, _, current_tri = heapq.heappop(heap)
-
-        #skip triangles that are already part of a strip, this is needed as there is no direct efficient removal from a heap 
-        if current_tri.nextTri is not None or current_tri.prevTri is not None:
-            continue
+    while len(queue) > 0:
 
-        #start a new strip with the selected triangle
-        strip_colour = current_tri.colour  #assign a colour to the strip
+        #start a new strip with a min valance triangle
+        current_tri = queue.pop()
+        addToStrip(current_tri)
 
         while True:
-            next_tri = None
-            min_adjacent = len(triangles)  #initialize to a large number to find the minimum, number of adjacents < len(triangles), this inequality is trivial
+            next_tri = NONE
+            min_adjacent = len(mesh)  #initialize to a large number to find the minimum, number of adjacents < len(mesh), this inequality is trivial
 
             #iterate over adjacent triangles to find the next one for the strip
-            for adj_tri in current_tri.adjTris:
-                #make sure the adjacent triangle that will be added to the strip is not apart of a strip already
-                if adj_tri.nextTri == None and adj_tri.prevTri == None:
-                    #calculate valence of the adjacent triangle
-                    adj_count = findValence(adj_tri)
-                    #prioritize triangles with fewer adjacent non-strip triangles (min valence)
-                    if adj_count < min_adjacent:
-                        min_adjacent = adj_count
-                        next_tri = adj_tri
-
-            if next_tri:
+            for adj_tri in adjacent[3*current_tri:3*current_tri+3]:
+                #make sure the adjacent triangle that will be added to the strip is not apart of a strip already, and
+                #prioritize triangles with fewer adjacent non-strip triangles (min valence)
+                if adj_tri != NONE and not isOnStrip[adj_tri] and valences[adj_tri] < min_adjacent:
+                    min_adjacent = valences[adj_tri]
+                    next_tri = adj_tri
+
+            if next_tri != NONE:
                 #link the current triangle with the next one
-                current_tri.nextTri = next_tri
-                next_tri.prevTri = current_tri
-                next_tri.colour = strip_colour  #copy the strip's colour to the next triangle for single coloured strips
+                nextTri[current_tri] = next_tri
+                prevTri[next_tri] = current_tri
+                addToStrip(next_tri)
                 current_tri = next_tri  #move to the next triangle in the strip
 
-                #update the valence of adjacent triangles and push unprocessed ones into the heap
-                for adj_tri in next_tri.adjTris:
-                    if adj_tri.nextTri == None and adj_tri.prevTri == None:
-                        #recalculate the valence since it lost a neighbor
-                        adj_valence = findValence(adj_tri)
-                        #push the updated adjacent triangle into the heap. the old version with the higher valence stays, 
-                        #but it'll get skipped later since the heap will pop the new, lower-valence one first (properties of min heap)
-                        heapq.heappush(heap, (adj_valence, id(adj_tri), adj_tri))
-
             else:
                 break #stop when no more adjacent triangles can be added
 
@@ -289,21 +388,16 @@ def buildTristrips(triangles):
 
     print( 'Generated %d tristrips' % count )
 
-#method for finding the valence of a triangle
-def findValence(triangle):
+#method for finding the valence of a triangle (the number of its neighbours not on a strip)
+def findValence(mesh, triangle):
     count = 0
-    for tri in triangle.adjTris:
-        if tri.nextTri == None and tri.prevTri == None:
+    for tri in mesh.adjacent[3*triangle:3*triangle+3]:
+        if tri != NONE and not mesh.isOnStrip[tri]:
             count += 1
     return count
-#methods to precompute the varences and place them into a min heap for efficient minimal valence strip starting
-def precomputeValences(triangles):
-    heap = []
-    for tri in triangles:
-        if tri.nextTri == None and tri.prevTri == None:
-            valence = findValence(tri)
-            heapq.heappush(heap, (valence, id(tri), tri))
-    return heap
+#method to find the valence of every triangle, which buildTristrips then keeps up to date as triangles join strips
+def precomputeValences(mesh):
+    return array('b', [findValence(mesh, tri) for tri in range(len(mesh))])
 
 
 windowLeft   = None
@@ -316,7 +410,7 @@ windowBottom = None
 
 def display( wait=False ):
 
-    global lastKey, windowLeft, windowRight, windowBottom, windowTop
+    global lastKey, windowLeft, windowRight, windowBottom, windowTop, triColours
     
     # Handle any events that have occurred
 
@@ -349,14 +443,17 @@ def display( wait=False ):
 
     # Draw triangles
 
-    for tri in allTriangles:
-        tri.draw()
+    if triColours is None:
+        triColours = stripColours()
+
+    for t in range( len(mesh) ):
+        drawTriangle( t )
 
     # Draw pointers.  Do this *after* the triangles (above) so that the
     # triangle drawing doesn't overlay the pointers.
 
-    for tri in allTriangles:
-        tri.drawPointers()
+    for t in range( len(mesh) ):
+        drawPointers( t )
 
     # Show window
 
@@ -423,126 +520,27 @@ def mouseButtonCallback( window, btn, action, keyModifiers ):
         wx = (x-0)/float(windowWidth)  * (windowRight-windowLeft) + windowLeft
         wy = (windowHeight-y)/float(windowHeight) * (windowTop-windowBottom) + windowBottom
 
-        selectedTri = None
-        for tri in allTriangles:
-            if tri.containsPoint( [wx, wy] ):
-                selectedTri = tri
+        selectedTri = NONE
+        for t in range( len(mesh) ):
+            if containsPoint( t, [wx, wy] ):
+                selectedTri = t
                 break
 
         # print triangle, toggle its highlight1, and toggle the highlight2s of its adjacent triangles
 
-        if selectedTri:
-            selectedTri.highlight1 = not selectedTri.highlight1
-            print( '%s with adjacent %s' % (selectedTri, repr(selectedTri.adjTris)) )
-            for t in selectedTri.adjTris:
-                t.highlight2 = not t.highlight2
-
+        if selectedTri != NONE:
+            highlight1[selectedTri] = not highlight1[selectedTri]
+            adjTris = mesh.adjacentTris( selectedTri )
+            print( 'tri-%d with adjacent [%s]' % (selectedTri, ', '.join( 'tri-%d' % t for t in adjTris )) )
+            for t in adjTris:
+                highlight2[t] = not highlight2[t]
 
-# Read triangles from a file
 
-def readTriangles( f ):
-
-    global allVerts
-    
-    errorsFound = False
-    
-    lines = f.readlines()
-
-    # Read the vertices
-    
-    numVerts = int( lines[0] )
-    allVerts = [ [float(c) for c in line.split()] for line in lines[1:numVerts+1] ]
-
-    # Check that the vertices are valid
-
-    for l,v in enumerate(allVerts):
-        if len(v) != 2:
-            print( 'Line %d: vertex does not have two coordinates.' % (l+2) )
-            errorsFound = True
-
-    # Read the triangles
-
-    numTris = int( lines[numVerts+1] )
-    triVerts =  [ [int(v) for v in line.split()] for line in lines[numVerts+2:] ]
-
-    # Check that the triangle vertices are valid
-
-    for l,tvs in enumerate(triVerts):
-        if len(tvs) != 3:
-            print( 'Line %d: triangle does not have three vertices.' % (l+2+numVerts) )
-            errorsFound = True
-        else:
-            for v in tvs:
-                if v < 0 or v >= numVerts:
-                    print( 'Line %d: Vertex index is not in range [0,%d].' % (l+2+numVerts,numVerts-1) )
-                    errorsFound = True
-
-    # Build triangles
-
-    tris = []
-
-    for tvs in triVerts:
-        theseVerts = tvs
-        if turn( allVerts[tvs[0]], allVerts[tvs[1]], allVerts[tvs[2]] ) != COLLINEAR:
-          tris.append( Triangle( tvs ) ) # (don't include degenerate triangles)
-
-    # For each triangle, find and record its adjacent triangles
-    #
-    # This would normally take O(n^2) time if done by brute force, so
-    # we'll exploit Python's hashed dictionary keys.
-
-    if False:
-
-        for tri in tris: # brute force
-            adjTris = []
-            for i in range(3):
-                v0 = tri.verts[i % 3]
-                v1 = tri.verts[(i+1) % 3]
-                for tri2 in tris:
-                    for j in range(3):
-                        if v1 == tri2.verts[j % 3] and v0 == tri2.verts[(j+1) % 3]:
-                            adjTris.append( tri2 )
-                    if len(adjTris) == 3:
-                        break
-            tri.adjTris = adjTris
-
-    else: # hashing
-      
-        edges = {}
-
-        for tri in tris:
-            for i in range(3):
-                v0 = tri.verts[i % 3]
-                v1 = tri.verts[(i+1) % 3]
-                key = '%f-%f' % (v0,v1)
-                edges[key] = tri
-
-        for tri in tris:
-            adjTris = []
-            for i in range(3):
-                v1 = tri.verts[i % 3] # find a reversed edge of an adjacent triangle
-                v0 = tri.verts[(i+1) % 3]
-                key = '%f-%f' % (v0,v1)
-                if key in edges:
-                    adjTris.append( edges[key] )
-                if len(adjTris) == 3:
-                    break
-            tri.adjTris = adjTris
-
-    print( 'Read %d points and %d triangles' % (numVerts,numTris) )
-
-    if errorsFound:
-        return []
-    else:
-        return tris
-
-        
-    
 # Initialize GLFW and run the main event loop
 
 def main():
 
-    global window, allTriangles, minX, maxX, minY, maxY, r
+    global window, mesh, highlight1, highlight2, minX, maxX, minY, maxY, r
     
     # Check command-line args
 
@@ -550,12 +548,22 @@ def main():
         print( 'Usage: %s filename' % sys.argv[0] )
         sys.exit(1)
 
+    outFile = None
+    stitch = False
+
     args = sys.argv[1:]
     while len(args) > 1:
-        # if args[0] == '-x':
-        #     pass
+        if args[0] == '-o':
+            outFile = args[1]
+            args = args[1:]
+        elif args[0] == '-s':
+            stitch = True
         args = args[1:]
 
+    if outFile is not None:
+        runHeadless( args[0], outFile, stitch )
+        return
+
     # Set up window
   
     if not glfw.init():
@@ -575,20 +583,23 @@ def main():
     glfw.set_window_size_callback( window, windowReshapeCallback )
     glfw.set_mouse_button_callback( window, mouseButtonCallback )
 
-    # Read the triangles.  This also fills in the global 'allVerts'.
+    # Read the triangles
 
     with open( args[0], 'rb' ) as f:
-        allTriangles = readTriangles( f )
+        mesh = trimesh.readMesh( f )
 
-    if allTriangles == []:
+    if mesh is None or len(mesh) == 0:
         return
 
+    highlight1 = bytearray( len(mesh) )
+    highlight2 = bytearray( len(mesh) )
+
     # Get bounding box of points
 
-    minX = min( p[0] for p in allVerts )
-    maxX = max( p[0] for p in allVerts )
-    minY = min( p[1] for p in allVerts )
-    maxY = max( p[1] for p in allVerts )
+    minX = min( mesh.xs )
+    maxX = max( mesh.xs )
+    minY = min( mesh.ys )
+    maxY = max( mesh.ys )
 
     # Adjust point radius in proportion to bounding box
     
@@ -599,7 +610,7 @@ def main():
 
     # Run the code
     
-    buildTristrips( allTriangles )
+    buildTristrips( mesh )
 
     display( wait=True )
     
@@ -615,6 +626,43 @@ def main():
     
 
 
+# Build the strips of a file without a window, and write them out as
+# an index buffer
+
+def runHeadless( inFile, outFile, stitch=False ):
+
+    try:
+        with open( inFile, 'rb' ) as f:
+            mesh = trimesh.readMesh( f )
+    except (IOError, ValueError, IndexError) as e:
+        print( '%s: %s' % (inFile, e) )
+        sys.exit(1)
+
+    if mesh is None:
+        sys.exit(1)
+
+    buildTristrips( mesh )
+
+    indices, restart = trimesh.indexBuffer( mesh, stitch )
+
+    if sys.byteorder == 'big':
+        indices.byteswap()
+
+    with open( outFile, 'wb' ) as f:
+        indices.tofile( f )
+
+    if sys.byteorder == 'big':
+        indices.byteswap()
+
+    print( 'Wrote %d indices (%d-bit, %s) for %d triangles to %s' %
+           (len(indices), 8*indices.itemsize, 'stitched' if stitch else 'primitive restart', len(mesh), outFile) )
+
+    for cacheSize in cacheSizes:
+        print( 'Vertex cache miss ratio with a %d-entry FIFO cache: %.3f' %
+               (cacheSize, trimesh.cacheMissRatio( indices, len(mesh), cacheSize, restart )) )
+
+
+
 if __name__ == '__main__':
     main()
 